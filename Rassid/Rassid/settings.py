@@ -59,6 +59,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'common.middleware.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -146,6 +147,18 @@ CELERY_BEAT_SCHEDULE = {
     "update_flights_every_1m": {
         "task": "flights.tasks.update_flights_task",
         "schedule": 60
+    },
+    "flush_notification_digests_every_15m": {
+        "task": "notifications.tasks.flush_notification_digests",
+        "schedule": 900
+    },
+    "prune_flight_changes_daily": {
+        "task": "flights.tasks.prune_flight_changes",
+        "schedule": 60 * 60 * 24
+    },
+    "deliver_webhooks_every_10s": {
+        "task": "notifications.tasks.deliver_webhooks",
+        "schedule": 10
     }
 }
 
@@ -155,6 +168,16 @@ CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 
+# Set CACHE_URL (e.g. redis://localhost:6379/2) wherever Celery runs: the
+# worker rebuilds the public departures fragments and bumps the version keys
+# (dashboard, gate index, changes feed head) that the web processes read, so
+# they must share one cache. Without it each process keeps its own.
+CACHE_URL = os.getenv('CACHE_URL')
+if CACHE_URL:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': CACHE_URL}}
+else:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
 
 AVIATIONSTACK_API_KEY = os.getenv("AVIATIONSTACK_API_KEY")
 
@@ -186,4 +209,95 @@ LOGOUT_REDIRECT_URL = 'login'
 
 # Stripe Configuration
 STRIPE_PUBLIC_KEY = os.getenv('STRIPE_PUBLIC_KEY')
-STRIPE_SECRET_KEY = os.getenv('STRIPE_SECRET_KEY')
\ No newline at end of file
+STRIPE_SECRET_KEY = os.getenv('STRIPE_SECRET_KEY')
+
+# Notification channels
+# Each channel maps to a backend class in notifications.services.backends.
+NOTIFICATION_BACKENDS = {
+    'email': os.getenv('EMAIL_NOTIFICATION_BACKEND', 'notifications.services.backends.EmailBackend'),
+    'sms': os.getenv('SMS_NOTIFICATION_BACKEND', 'notifications.services.backends.LocalSMSBackend'),
+}
+
+# Messages per provider call and sustained sends per second, per channel.
+# A rate_per_second of None sends without a limit.
+NOTIFICATION_CHANNEL_LIMITS = {
+    'email': {'batch_size': 50, 'rate_per_second': 20},
+    'sms': {'batch_size': 100, 'rate_per_second': 10},
+}
+
+SMS_API_URL = os.getenv('SMS_API_URL')
+SMS_API_KEY = os.getenv('SMS_API_KEY')
+SMS_SENDER_ID = os.getenv('SMS_SENDER_ID', 'RASSID')
+
+
+# A passenger notification that repeats the last one sent to the same
+# recipient about the same flight is dropped if it comes within this many seconds.
+NOTIFICATION_DEDUPE_TTL = 6 * 60 * 60
+
+# Per-recipient sliding window; extra messages are deferred into a digest.
+NOTIFICATION_RATE_LIMIT = {'max_messages': 5, 'window_seconds': 900}
+
+# Live tracker updates (Server-Sent Events).
+# Celery writes most flight updates, so events go through Redis by default.
+# InMemoryBroker only reaches streams in the publishing process and is for
+# runserver without a Redis broker.
+LIVE_UPDATES_BROKER = os.getenv(
+    'LIVE_UPDATES_BROKER',
+    'passengers.services.live_updates.RedisBroker' if CELERY_BROKER_URL.startswith('redis')
+    else 'passengers.services.live_updates.InMemoryBroker',
+)
+LIVE_UPDATES_REDIS_URL = os.getenv('LIVE_UPDATES_REDIS_URL', 'redis://localhost:6379/1')
+# Streams close after this long and the browser reconnects on its own.
+# Serve the stream URL from the ASGI app (Rassid.asgi) in production: under
+# WSGI every open tracker page holds a worker thread for this whole time.
+LIVE_UPDATES_MAX_SECONDS = 300
+
+# KKIA maps API and the floor POI cache in front of it.
+# Entries are fresh for `ttl` seconds, then served stale for up to `stale_ttl`
+# more while a background refresh runs. Set MAP_POI_CACHE_DIR to keep them
+# on disk across restarts.
+MAP_API_URL = os.getenv('MAP_API_URL', 'https://mapsapi.kkia.sa/api/public/v1/buildings')
+MAP_POI_CACHE = {
+    'ttl': 60 * 60 * 6,
+    'stale_ttl': 60 * 60 * 24 * 7,
+    'timeout': 10,
+    'disk_path': os.getenv('MAP_POI_CACHE_DIR'),
+}
+
+# Flight changes feed (/api/flights/changes/).
+# Long-polls hold a worker for up to FLIGHT_CHANGES_MAX_WAIT seconds.
+FLIGHT_CHANGES_MAX_WAIT = 25
+FLIGHT_CHANGES_RETENTION_DAYS = 7
+
+# Outbound webhooks. Each run batches up to batch_size changes per delivery
+# and sends them on `workers` threads, one at a time and in order per
+# endpoint; a failed delivery is retried after backoff_seconds * 2^(attempt - 1)
+# until max_attempts. Endpoints must be public https URLs unless
+# allow_private_targets is set (local development only).
+WEBHOOKS = {
+    'workers': 8,
+    'timeout': 5,
+    'batch_size': 200,
+    'max_attempts': 6,
+    'backoff_seconds': 30,
+    'allow_private_targets': False,
+}
+
+# JSON for the API goes through orjson when it is installed (pip install orjson).
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'common.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+# Compress JSON and HTML responses of at least min_size bytes: brotli when
+# the client accepts it and the brotli package is installed, otherwise gzip.
+# Only brotli_content_types may use brotli; pages with CSRF tokens stay on
+# gzip, which pads its output against BREACH.
+RESPONSE_COMPRESSION = {
+    'min_size': 1024,
+    'content_types': ['application/json', 'text/html'],
+    'brotli_quality': 5,
+    'brotli_content_types': ['application/json'],
+}
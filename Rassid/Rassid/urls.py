@@ -26,7 +26,7 @@ from django.conf import settings
 urlpatterns = [
     path('admin/', admin.site.urls),
     path("api/airports/", include("airports.urls")),
-    path("api/flights/", include("flights.urls")),
+    path("api/flights/", include("flights.api_urls")),
     path("api/users/", include("users.urls")),
     path("api/passengers/", include("passengers.urls")),
     path("api/notifications/", include("notifications.urls")),
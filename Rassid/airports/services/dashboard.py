@@ -0,0 +1,101 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+
+from airports.models import Airport, AirportSubscription, SubscriptionRequest
+from flights.models import Flight
+from tickets.models import Ticket
+from notifications.services.rollups import delivery_totals
+
+User = get_user_model()
+
+DASHBOARD_CACHE_TTL = 60
+
+
+def _version_key(airport_id):
+    return f"airport_dashboard_version:{airport_id}"
+
+
+def invalidate_dashboard(airport_id):
+    """Bump the airport's dashboard version so every cached payload for it is skipped."""
+    if not airport_id:
+        return
+    try:
+        cache.incr(_version_key(airport_id))
+    except ValueError:
+        cache.set(_version_key(airport_id), 2, None)
+
+
+def get_dashboard_payload(user):
+    airport_id = user.airport_id
+    version = cache.get(_version_key(airport_id), 1)
+    key = f"airport_dashboard:{airport_id}:v{version}:{user.pk}"
+
+    payload = cache.get(key)
+    if payload is None:
+        payload = build_dashboard_payload(user)
+        cache.set(key, payload, DASHBOARD_CACHE_TTL)
+    return payload
+
+
+def build_dashboard_payload(user):
+    my_airport = get_object_or_404(Airport, id=user.airport_id)
+    now = timezone.now()
+    today = timezone.localdate()
+
+    flight_counts = Flight.objects.filter(origin=my_airport).aggregate(
+        total=Count('id'),
+        today=Count('id', filter=Q(scheduledDeparture__date=today)),
+    )
+
+    upcoming_flights = list(
+        Flight.objects.filter(origin=my_airport, scheduledDeparture__gte=now)
+        .select_related('destination')
+        .order_by('scheduledDeparture')[:5]
+    )
+
+    tickets = Ticket.objects.filter(airport=my_airport).select_related('createdBy')
+    total_tickets = tickets.count()
+    # Incoming (from operators) - Exclude tickets created by me (airport admin)
+    incoming_tickets = list(tickets.exclude(createdBy=user).order_by('-createdAt')[:5])
+    # Outgoing (my requests) - Created by me
+    my_tickets = list(Ticket.objects.filter(createdBy=user).order_by('-createdAt')[:5])
+
+    employees = User.objects.filter(role='operator', airport_id=my_airport.id)
+    employees_count = employees.count()
+    employees_preview = list(employees[:5])
+
+    sent_logs, failed_logs = delivery_totals('email_log', user.email)
+    total_logs = sent_logs + failed_logs
+    success_rate = int((sent_logs / total_logs) * 100) if total_logs > 0 else 0
+
+    active_subscription = AirportSubscription.objects.filter(airport=my_airport, status='active').first()
+
+    if active_subscription and active_subscription.max_employees > 0:
+        usage_percent = int((employees_count / active_subscription.max_employees) * 100)
+    else:
+        usage_percent = 0
+
+    payment_history = list(SubscriptionRequest.objects.filter(
+        admin_email=user.email,
+        airport_code=my_airport.code
+    ).order_by('-created_at'))
+
+    return {
+        'airport': my_airport,
+        'total_flights': flight_counts['total'],
+        'today_flights': flight_counts['today'],
+        'incoming_tickets': incoming_tickets,
+        'my_tickets': my_tickets,
+        'total_tickets': total_tickets,
+        'upcoming_flights': upcoming_flights,
+        'employees': employees_preview,
+        'employees_count': employees_count,
+        'usage_percent': usage_percent,
+        'active_subscription': active_subscription,
+        'payments': payment_history,
+        'notification_success_rate': f"{success_rate}%",
+        'notification_failed_count': failed_logs,
+    }
@@ -0,0 +1,30 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from airports.models import Airport, AirportSubscription, SubscriptionRequest
+from airports.services.dashboard import invalidate_dashboard
+from flights.models import Flight
+from tickets.models import Ticket
+
+User = get_user_model()
+
+@receiver([post_save, post_delete], sender=Flight)
+def flight_changed(sender, instance, **kwargs):
+    invalidate_dashboard(instance.origin_id)
+
+@receiver([post_save, post_delete], sender=Ticket)
+def ticket_changed(sender, instance, **kwargs):
+    invalidate_dashboard(instance.airport_id)
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, instance, **kwargs):
+    invalidate_dashboard(instance.airport_id)
+
+@receiver([post_save, post_delete], sender=AirportSubscription)
+def subscription_changed(sender, instance, **kwargs):
+    invalidate_dashboard(instance.airport_id)
+
+@receiver([post_save, post_delete], sender=SubscriptionRequest)
+def subscription_request_changed(sender, instance, **kwargs):
+    airport_id = Airport.objects.filter(code=instance.airport_code).values_list('id', flat=True).first()
+    invalidate_dashboard(airport_id)
@@ -1,3 +1,62 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from airports.models import Airport
+from airports.services.dashboard import _version_key, get_dashboard_payload
+from flights.models import Flight
+from tickets.models import Ticket
+
+User = get_user_model()
+
+
+class AirportDashboardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.airport = Airport.objects.create(name="Origin", code="AD1", city="City")
+        self.destination = Airport.objects.create(name="Destination", code="AD2", city="City")
+        self.user = User.objects.create_user(email='admin@ad1.test', role='airport_admin', airport_id=self.airport.id)
+
+    def add_flight(self, number):
+        now = timezone.now()
+        return Flight.objects.create(
+            flightNumber=number, status='Scheduled', airlineCode='AD', origin=self.airport, destination=self.destination,
+            scheduledDeparture=now + timedelta(hours=2), scheduledArrival=now + timedelta(hours=4),
+        )
+
+    def test_warm_cache_runs_no_queries(self):
+        get_dashboard_payload(self.user)
+        with self.assertNumQueries(0):
+            get_dashboard_payload(self.user)
+
+    def test_flight_and_ticket_writes_force_a_recompute(self):
+        self.assertEqual(get_dashboard_payload(self.user)['total_flights'], 0)
+        version = cache.get(_version_key(self.airport.id), 1)
+
+        self.add_flight('AD100')
+        self.assertGreater(cache.get(_version_key(self.airport.id)), version)
+        self.assertEqual(get_dashboard_payload(self.user)['total_flights'], 1)
+
+        Ticket.objects.create(airport=self.airport, createdBy=self.user, title="Gate", category='Other', priority='Low')
+        self.assertEqual(get_dashboard_payload(self.user)['total_tickets'], 1)
+
+    def test_other_airports_keep_their_cache(self):
+        other = Airport.objects.create(name="Other", code="AD3", city="City")
+        other_admin = User.objects.create_user(email='admin@ad3.test', role='airport_admin', airport_id=other.id)
+        get_dashboard_payload(other_admin)
+
+        self.add_flight('AD200')
+        with self.assertNumQueries(0):
+            get_dashboard_payload(other_admin)
+
+    def test_view_serves_the_fresh_payload(self):
+        self.client.force_login(self.user)
+        url = reverse('airport_dashboard')
+        self.assertEqual(self.client.get(url).context['total_flights'], 0)
 
-# Create your tests here.
+        self.add_flight('AD300')
+        self.assertEqual(self.client.get(url).context['total_flights'], 1)
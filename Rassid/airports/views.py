@@ -87,82 +87,8 @@ def dashboard(request):
     if request.user.role != 'airport_admin' or not request.user.airport_id:
         return redirect('public_home')
 
-    my_airport = get_object_or_404(Airport, id=request.user.airport_id)
-    today = timezone.now().date()
-    now = timezone.now()
-
-    employees = User.objects.filter(role='operator', airport_id=request.user.airport_id)
-
-    total_flights = Flight.objects.filter(origin=my_airport).count()
-    today_flights = Flight.objects.filter(
-        origin=my_airport, 
-        scheduledDeparture__date=today
-    ).count()
-
-    # Incoming (from operators) - Exclude tickets created by me (airport admin)
-    incoming_tickets = Ticket.objects.filter(airport=my_airport).exclude(createdBy=request.user).order_by('-createdAt')[:5]
-    
-    # Outgoing (my requests) - Created by me
-    my_tickets = Ticket.objects.filter(createdBy=request.user).order_by('-createdAt')[:5]
-
-    # Calculate total tickets for context
-    tickets = Ticket.objects.filter(airport=my_airport)
-    total_tickets = tickets.count()
-
-    upcoming_flights = Flight.objects.filter(
-        origin=my_airport,
-        scheduledDeparture__gte=now
-    ).order_by('scheduledDeparture')[:5]
-
-    try:
-        from notifications.models import EmailLog
-        email_logs = EmailLog.objects.filter(recipient=request.user.email)
-        total_logs = email_logs.count()
-        failed_logs = email_logs.filter(status='Failed').count()
-        
-        if total_logs > 0:
-            success_rate = int(((total_logs - failed_logs) / total_logs) * 100)
-        else:
-            success_rate = 0 # Default if no logs
-            
-        notification_success_rate = f"{success_rate}%"
-        notification_failed_count = failed_logs
-    except ImportError:
-        notification_success_rate = "0%"
-        notification_failed_count = 0
-
-    active_subscription = AirportSubscription.objects.filter(airport=my_airport, status='active').first()
-    
-    # Calculate usage percent
-    employees_count = employees.count()
-    if active_subscription and active_subscription.max_employees > 0:
-        usage_percent = int((employees_count / active_subscription.max_employees) * 100)
-    else:
-        usage_percent = 0
-    
-    payment_history = SubscriptionRequest.objects.filter(
-        admin_email=request.user.email,
-        airport_code=my_airport.code
-    ).order_by('-created_at')
-
-    context = {
-        'airport': my_airport,
-        'total_flights': total_flights,
-        'today_flights': today_flights,
-        'incoming_tickets': incoming_tickets,
-        'my_tickets': my_tickets,
-        'total_tickets': total_tickets,
-        'upcoming_flights': upcoming_flights,
-        'employees': employees,
-        'employees_count': employees_count,
-        'usage_percent': usage_percent,
-        'active_subscription': active_subscription, 
-        'tickets': tickets,
-        'payments': payment_history,
-        'notification_success_rate': notification_success_rate,
-        'notification_failed_count': notification_failed_count,
-        'active_subscription': active_subscription,
-    }
+    from .services.dashboard import get_dashboard_payload
+    context = get_dashboard_payload(request.user)
     
     return render(request, "airports/dashboard.html", context)
 
@@ -586,7 +512,8 @@ def payment_success(request, request_id):
              EmailLog.objects.create(
                 recipient=sub_req.admin_email,
                 subject="Account/Subscription Activated",
-                status="Sent"
+                status="Sent",
+                airport=airport
             )
         except:
             pass
@@ -618,6 +545,8 @@ def sync_flights_data(request):
     try:
         data = flights_api.fetch_flights(airport_code=airport.code)
         flights_api.save_flights_to_db(data)
+        from public.services.departures import refresh_public_departures
+        refresh_public_departures()
         messages.success(request, f"Successfully synced flights for {airport.code}.")
     except Exception as e:
         messages.error(request, f"Error syncing flights: {str(e)}")
@@ -658,33 +587,23 @@ def flight_reports(request):
         
     airport = get_object_or_404(Airport, id=request.user.airport_id)
     
-    from flights.models import FlightStatusHistory, GateAssignment, Flight
-    from django.db.models import Count, Avg, F, DurationField, ExpressionWrapper
+    from flights.models import AirportFlightStats, Flight
     
-    my_flights = Flight.objects.filter(origin=airport)
-    total_updates = FlightStatusHistory.objects.filter(flight__in=my_flights).count()
+    stats = AirportFlightStats.objects.filter(airport=airport).first()
+    total_updates = stats.totalUpdates if stats else 0
     
-    gate_assignments = GateAssignment.objects.filter(flight__in=my_flights, releasedAt__isnull=False)
-    if gate_assignments.exists():
-        avg_duration = gate_assignments.annotate(
-            duration=ExpressionWrapper(F('releasedAt') - F('assignedAt'), output_field=DurationField())
-        ).aggregate(Avg('duration'))['duration__avg']
-        
-        if avg_duration:
-            total_seconds = int(avg_duration.total_seconds())
-            hours = total_seconds // 3600
-            minutes = (total_seconds % 3600) // 60
-            avg_gate_time = f"{hours}h {minutes}m"
-        else:
-            avg_gate_time = "0h 0m"
+    if stats and stats.gateDurationCount:
+        total_seconds = int(stats.gateDurationSeconds / stats.gateDurationCount)
+        hours = total_seconds // 3600
+        minutes = (total_seconds % 3600) // 60
+        avg_gate_time = f"{hours}h {minutes}m"
     else:
         avg_gate_time = "N/A"
 
     try:
-        from notifications.models import EmailLog
-        email_logs = EmailLog.objects.filter(recipient=request.user.email)
-        total_logs = email_logs.count()
-        failed_logs = email_logs.filter(status='Failed').count()
+        from notifications.services.rollups import delivery_totals
+        sent_logs, failed_logs = delivery_totals('email_log', request.user.email)
+        total_logs = sent_logs + failed_logs
         if total_logs > 0:
             success_rate = int(((total_logs - failed_logs) / total_logs) * 100)
         else:
@@ -692,9 +611,14 @@ def flight_reports(request):
     except:
         success_rate = 0
         
-    most_changed_flights = my_flights.annotate(
-        changes_count=Count('flightstatushistory')
-    ).order_by('-changes_count')[:5]
+    top_ids = [flight_id for flight_id, _ in (stats.topChangedFlights if stats else [])][:5]
+    flights_by_id = Flight.objects.select_related('destination').in_bulk(top_ids)
+    most_changed_flights = []
+    for flight_id in top_ids:
+        flight = flights_by_id.get(flight_id)
+        if flight:
+            flight.changes_count = flight.changeCount
+            most_changed_flights.append(flight)
 
     context = {
         'airport': airport,
@@ -713,24 +637,20 @@ def notification_insights(request):
         
     try:
         from notifications.models import EmailLog
-        from django.utils import timezone
+        from notifications.services.rollups import daily_series
         
         logs = EmailLog.objects.filter(recipient=request.user.email).order_by('-sent_at')[:50]
         
-        today = timezone.now().date()
+        today = timezone.localdate()
+        series = daily_series('email_log', request.user.email, today - timedelta(days=6), today)
         dates = []
         delivery_rates = []
         failed_counts = []
         
         for i in range(6, -1, -1):
             date = today - timedelta(days=i)
-            day_logs = EmailLog.objects.filter(
-                recipient=request.user.email, 
-                sent_at__date=date
-            )
-            total = day_logs.count()
-            failed = day_logs.filter(status='Failed').count()
-            sent = total - failed
+            sent, failed = series.get(date, (0, 0))
+            total = sent + failed
             
             rate = int((sent / total) * 100) if total > 0 else 0
             
@@ -0,0 +1,134 @@
+from datetime import datetime, time
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.pagination import CursorPagination
+
+from common.serializers import requested_fields
+
+
+class ApiCursorPagination(CursorPagination):
+    """
+    Keyset pagination ordered by the view's cursor_ordering, so each page is
+    an index range scan however deep the client has paged.
+    """
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = ('-id',)
+
+    def get_ordering(self, request, queryset, view):
+        return getattr(view, 'cursor_ordering', self.ordering)
+
+
+def parse_when(value):
+    """A datetime from an ISO datetime or a plain date (midnight, local time)."""
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(value)
+        parsed = datetime.combine(day, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def parse_list(value):
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+class QueryFilterBackend(BaseFilterBackend):
+    """
+    Filters declared on the view as filter_params:
+    {query_param: lookup} or {query_param: (lookup, parser)}.
+    Parsers turn the raw string into the lookup value; a bad value is a 400.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        filters = {}
+        for param, spec in getattr(view, 'filter_params', {}).items():
+            raw = request.query_params.get(param)
+            if raw in (None, ''):
+                continue
+            lookup, parser = spec if isinstance(spec, tuple) else (spec, None)
+            try:
+                filters[lookup] = parser(raw) if parser else raw
+            except (ValueError, TypeError):
+                raise ValidationError({param: f"Invalid value: {raw}"})
+        return queryset.filter(**filters) if filters else queryset
+
+
+class AirportScopedMixin:
+    """
+    Viewset mixin limiting every query to the requesting user's airport.
+
+    airport_field is the lookup from the model to the airport id, e.g.
+    'origin_id' or 'flight__origin_id'. Platform superadmins see every
+    airport and may narrow with ?airport_id=. Users without an airport see
+    nothing. Writes are rejected when the row would belong to another airport.
+
+    list_select_related / list_prefetch_related are applied to every query,
+    and prefetches named in sparse_prefetches are skipped when ?fields=
+    leaves out the serializer field that needs them.
+    """
+    airport_field = None
+    list_select_related = ()
+    list_prefetch_related = ()
+    sparse_prefetches = {}
+
+    def is_platform_user(self):
+        user = self.request.user
+        return user.is_superuser or user.role == 'superadmin'
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.is_platform_user():
+            airport_id = self.request.query_params.get('airport_id')
+            if airport_id:
+                if not airport_id.isdigit():
+                    raise ValidationError({'airport_id': "Must be an integer."})
+                queryset = queryset.filter(**{self.airport_field: int(airport_id)})
+        elif self.request.user.airport_id:
+            queryset = queryset.filter(**{self.airport_field: self.request.user.airport_id})
+        else:
+            queryset = queryset.none()
+
+        if self.list_select_related:
+            queryset = queryset.select_related(*self.list_select_related)
+        requested = requested_fields(self.request)
+        prefetches = [
+            lookup for lookup in self.list_prefetch_related
+            if requested is None or self.sparse_prefetches.get(lookup) in requested
+        ]
+        if prefetches:
+            queryset = queryset.prefetch_related(*prefetches)
+        return queryset
+
+    def new_row_airport_id(self, validated_data):
+        # Follow airport_field through the validated objects, e.g. flight -> origin_id
+        parts = self.airport_field.split('__')
+        value = validated_data.get(parts[0].removesuffix('_id'))
+        for part in parts[1:]:
+            value = getattr(value, part, None)
+        return getattr(value, 'pk', value)
+
+    def check_airport(self, serializer, partial=False):
+        if self.is_platform_user():
+            return
+        airport_id = self.new_row_airport_id(serializer.validated_data)
+        # A partial update that does not touch the airport link keeps the row where it is
+        if airport_id is None and partial:
+            return
+        if airport_id != self.request.user.airport_id:
+            raise ValidationError("You can only write records for your own airport.")
+
+    def perform_create(self, serializer):
+        self.check_airport(serializer)
+        super().perform_create(serializer)
+
+    def perform_update(self, serializer):
+        self.check_airport(serializer, partial=True)
+        super().perform_update(serializer)
@@ -0,0 +1,80 @@
+import re
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:
+    # Optional; without it responses are only gzipped
+    brotli = None
+
+ACCEPT_ENCODING = re.compile(r'\s*([a-z*]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?', re.IGNORECASE)
+
+
+def accepted_encodings(header):
+    """Encodings the client accepts, ignoring those sent with q=0."""
+    accepted = set()
+    for part in header.split(','):
+        match = ACCEPT_ENCODING.match(part)
+        if not match:
+            continue
+        try:
+            quality = float(match.group(2)) if match.group(2) else 1.0
+        except ValueError:
+            continue
+        if quality > 0:
+            accepted.add(match.group(1).lower())
+    return accepted
+
+
+class CompressionMiddleware:
+    """
+    Brotli (when installed and accepted) or gzip for JSON and HTML responses
+    of at least RESPONSE_COMPRESSION['min_size'] bytes. Streaming responses,
+    like the live flight updates stream, are left alone so they are not buffered.
+
+    Brotli has no padding, so it is limited to brotli_content_types (JSON);
+    HTML carries CSRF tokens and always takes the padded gzip path (BREACH).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        config = settings.RESPONSE_COMPRESSION
+        self.min_size = config['min_size']
+        self.content_types = tuple(config['content_types'])
+        self.brotli_quality = config['brotli_quality']
+        self.brotli_content_types = tuple(config['brotli_content_types'])
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type not in self.content_types:
+            return response
+        # Whatever the outcome below, caches must key on Accept-Encoding
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < self.min_size:
+            return response
+
+        accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if brotli is not None and 'br' in accepted and content_type in self.brotli_content_types:
+            compressed, encoding = brotli.compress(response.content, quality=self.brotli_quality), 'br'
+        elif 'gzip' in accepted or '*' in accepted:
+            # Random padding in the gzip header mitigates BREACH on HTML with tokens
+            compressed, encoding = compress_string(response.content, max_random_bytes=100), 'gzip'
+        else:
+            return response
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
@@ -0,0 +1,48 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:
+    # Optional speed-up; without it everything goes through the json module
+    orjson = None
+
+_drf_default = encoders.JSONEncoder().default
+_django_default = DjangoJSONEncoder().default
+
+
+def _escape_separators(content):
+    # Keep the output a strict JavaScript subset, as DRF's renderer does
+    return content.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+def dumps(data):
+    """
+    Compact UTF-8 JSON bytes for plain views, with DjangoJSONEncoder's
+    handling of dates, decimals and lazy strings. Uses orjson when installed.
+    """
+    if orjson is not None:
+        return _escape_separators(orjson.dumps(
+            data, default=_django_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+        ))
+    return json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that serializes with orjson when it is installed, for the
+    same output several times faster on large lists. Indented output (the
+    browsable API, ?indent=) and installs without orjson use DRF's encoder.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        return _escape_separators(orjson.dumps(
+            data, default=_drf_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+        ))
@@ -0,0 +1,22 @@
+class SparseFieldsMixin:
+    """
+    Serializer mixin that drops every field not named in the request's
+    ?fields=a,b,c parameter. Unknown names are ignored.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = requested_fields(self.context.get('request'))
+        if requested:
+            for name in set(self.fields) - requested:
+                self.fields.pop(name)
+
+
+def requested_fields(request):
+    """The set of names in ?fields=, or None when the parameter is absent."""
+    if request is None:
+        return None
+    raw = request.query_params.get('fields') if hasattr(request, 'query_params') else request.GET.get('fields')
+    if not raw:
+        return None
+    return {name.strip() for name in raw.split(',') if name.strip()}
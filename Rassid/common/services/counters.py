@@ -0,0 +1,51 @@
+from django.core.cache import cache
+
+COUNTER_TTL = 60 * 60
+
+_counters = {}
+
+
+def _key(name):
+    return f"counter:{name}"
+
+
+def register(name, queryset_factory):
+    """
+    Register a named counter. queryset_factory returns the queryset whose
+    count() is the counter's value; it is only called on a cache miss.
+    """
+    _counters[name] = queryset_factory
+
+
+def get(name):
+    value = cache.get(_key(name))
+    if value is None:
+        value = _counters[name]().count()
+        cache.set(_key(name), value, COUNTER_TTL)
+    return value
+
+
+def invalidate(*names):
+    cache.delete_many([_key(name) for name in names])
+
+
+def adjust(name, delta):
+    """Shift a cached counter by delta. A missing key is left to be recomputed on the next read."""
+    try:
+        cache.incr(_key(name), delta)
+    except ValueError:
+        pass
+
+
+def _pending_requests():
+    from airports.models import SubscriptionRequest
+    return SubscriptionRequest.objects.filter(status='pending')
+
+
+def _unresolved_messages():
+    from public.models import ContactSubmission
+    return ContactSubmission.objects.filter(is_resolved=False)
+
+
+register('pending_requests', _pending_requests)
+register('unresolved_messages', _unresolved_messages)
@@ -0,0 +1,32 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from airports.models import SubscriptionRequest
+from common.services import counters
+from public.models import ContactSubmission
+
+# A new row can only add to a counter, so creations adjust it in place.
+# Edits may move a row in or out of the counted set, so they drop the value.
+
+@receiver(post_save, sender=SubscriptionRequest)
+def subscription_request_saved(sender, instance, created, **kwargs):
+    if created:
+        if instance.status == 'pending':
+            counters.adjust('pending_requests', 1)
+    else:
+        counters.invalidate('pending_requests')
+
+@receiver(post_delete, sender=SubscriptionRequest)
+def subscription_request_deleted(sender, instance, **kwargs):
+    counters.invalidate('pending_requests')
+
+@receiver(post_save, sender=ContactSubmission)
+def contact_submission_saved(sender, instance, created, **kwargs):
+    if created:
+        if not instance.is_resolved:
+            counters.adjust('unresolved_messages', 1)
+    else:
+        counters.invalidate('unresolved_messages')
+
+@receiver(post_delete, sender=ContactSubmission)
+def contact_submission_deleted(sender, instance, **kwargs):
+    counters.invalidate('unresolved_messages')
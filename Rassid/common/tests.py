@@ -1,3 +1,77 @@
-from django.test import TestCase
+import gzip
+import json
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from unittest import skipUnless
 
-# Create your tests here.
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+
+from common.middleware.compression import CompressionMiddleware, accepted_encodings, brotli
+from common.renderers import FastJSONRenderer, dumps
+
+COMPRESSION = {
+    'min_size': 200, 'content_types': ['application/json', 'text/html'], 'brotli_quality': 5,
+    'brotli_content_types': ['application/json'],
+}
+
+
+@override_settings(RESPONSE_COMPRESSION=COMPRESSION)
+class CompressionMiddlewareTests(SimpleTestCase):
+    def respond(self, response, accept='gzip'):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=accept)
+        return CompressionMiddleware(lambda r: response)(request)
+
+    def test_large_json_is_gzipped(self):
+        body = json.dumps([{'flightNumber': f"SV{i}"} for i in range(100)]).encode()
+        response = self.respond(HttpResponse(body, content_type='application/json'))
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), body)
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_html_is_never_brotli(self):
+        body = b'<p>' + b'x' * 500 + b'</p>'
+        response = self.respond(HttpResponse(body, content_type='text/html'), accept='br, gzip')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), body)
+
+    @skipUnless(brotli, "brotli is not installed")
+    def test_json_prefers_brotli(self):
+        body = json.dumps([{'flightNumber': f"SV{i}"} for i in range(100)]).encode()
+        response = self.respond(HttpResponse(body, content_type='application/json'), accept='gzip, br')
+
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), body)
+
+    def test_small_or_other_responses_are_untouched(self):
+        small = self.respond(HttpResponse(b'{"ok":true}', content_type='application/json'))
+        csv = self.respond(HttpResponse(b'a,b\n' * 200, content_type='text/csv'))
+        stream = self.respond(StreamingHttpResponse(iter([b'x' * 500]), content_type='text/html'))
+        refused = self.respond(HttpResponse(b'<p>' * 200, content_type='text/html'), accept='gzip;q=0')
+
+        for response in (small, csv, stream, refused):
+            self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_accept_encoding_parsing(self):
+        self.assertEqual(accepted_encodings('gzip, deflate, br;q=0'), {'gzip', 'deflate'})
+        self.assertEqual(accepted_encodings(''), set())
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    def test_matches_json_renderer(self):
+        data = {
+            'when': datetime(2026, 1, 1, 8, 30, tzinfo=dt_timezone.utc),
+            'fare': Decimal('12.50'),
+            'city': 'الرياض ',
+            'gate': None,
+        }
+        self.assertEqual(json.loads(FastJSONRenderer().render(data)), json.loads(JSONRenderer().render(data)))
+        self.assertNotIn(' '.encode(), FastJSONRenderer().render(data))
+        self.assertIn(b'\n', FastJSONRenderer().render(data, 'application/json; indent=2'))
+
+    def test_dumps(self):
+        self.assertEqual(json.loads(dumps({'fare': Decimal('1.50')})), {'fare': '1.50'})
@@ -0,0 +1,10 @@
+from django.urls import path, include, re_path
+from . import views
+from .urls import router
+
+# The operator pages in urls.py also match "flights/", which hid the API list
+# when both were mounted under /api/flights/
+urlpatterns = [
+    re_path(r"^changes/?$", views.flight_changes, name="api_flight_changes"),
+    path("", include(router.urls)),
+]
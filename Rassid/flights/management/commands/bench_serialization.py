@@ -0,0 +1,117 @@
+import gzip
+import statistics
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from airports.models import Airport
+from common.middleware.compression import brotli
+from common.renderers import FastJSONRenderer, orjson
+from flights.models import Flight, GateAssignment
+from flights.serializers import FlightSerializer
+from flights.services.compact import column_names, compact_rows
+
+
+def timed(fn, repeat):
+    """(median seconds, last result) over repeat calls of fn."""
+    runs = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        runs.append(time.perf_counter() - started)
+    return statistics.median(runs), result
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed N flights with gates and compare FlightSerializer against the "
+        "compact row mode: query + serialize time, JSON render time and "
+        "response size raw, gzipped and brotli-compressed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--flights', type=int, default=2000)
+        parser.add_argument('--repeat', type=int, default=5,
+                            help="Runs per measurement; the median is reported.")
+        parser.add_argument('--keep', action='store_true',
+                            help="Keep the seeded rows instead of rolling them back.")
+
+    def handle(self, *args, **options):
+        repeat = max(options['repeat'], 1)
+        renderers = [('json', JSONRenderer())]
+        if orjson is not None:
+            renderers.append(('orjson', FastJSONRenderer()))
+
+        with transaction.atomic():
+            origin = self.seed(options['flights'])
+            flights = Flight.objects.filter(origin=origin).order_by('scheduledDeparture', 'id')
+
+            modes = [
+                ('FlightSerializer', lambda: FlightSerializer(
+                    flights.prefetch_related('gateassignment_set'), many=True
+                ).data),
+                ('compact rows', lambda: {'columns': column_names(), 'results': compact_rows(flights)}),
+            ]
+            results = []
+            for name, build in modes:
+                build_time, data = timed(build, repeat)
+                for renderer_name, renderer in renderers:
+                    render_time, body = timed(lambda: renderer.render(data), repeat)
+                    results.append((name, renderer_name, build_time, render_time, body))
+
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+        self.stdout.write(f"Flights: {options['flights']} (median of {repeat} runs)")
+        self.stdout.write(
+            f"{'Mode':<18}{'Renderer':<10}{'Serialize':>12}{'Render':>10}{'Total':>10}"
+            f"{'Bytes':>11}{'Gzip':>10}{'Brotli':>10}"
+        )
+        for name, renderer_name, build_time, render_time, body in results:
+            br = str(len(brotli.compress(body, quality=5))) if brotli is not None else '-'
+            self.stdout.write(
+                f"{name:<18}{renderer_name:<10}{build_time * 1000:>10.1f}ms{render_time * 1000:>8.1f}ms"
+                f"{(build_time + render_time) * 1000:>8.1f}ms{len(body):>11}{len(gzip.compress(body, 6)):>10}{br:>10}"
+            )
+        if orjson is None:
+            self.stdout.write("orjson is not installed; FastJSONRenderer falls back to the json module.")
+        if brotli is None:
+            self.stdout.write("brotli is not installed; responses are gzipped only.")
+
+    def seed(self, count):
+        origin, _ = Airport.objects.get_or_create(code='BN1', defaults={'name': 'Benchmark Origin', 'city': 'Bench'})
+        destination, _ = Airport.objects.get_or_create(code='BN2', defaults={'name': 'Benchmark Destination', 'city': 'Bench'})
+        now = timezone.now()
+        run_id = uuid.uuid4().hex[:4].upper()
+
+        # bulk_create skips the change feed and notification signals
+        flights = Flight.objects.bulk_create([
+            Flight(
+                flightNumber=f"BN{run_id}{i}",
+                status='Scheduled' if i % 5 else 'Delayed',
+                scheduledDeparture=now + timedelta(minutes=5 * i),
+                scheduledArrival=now + timedelta(minutes=5 * i + 120),
+                airlineCode='BN',
+                origin=origin,
+                destination=destination,
+            )
+            for i in range(count)
+        ])
+        gates = GateAssignment.objects.bulk_create([
+            GateAssignment(
+                flight=flight, gateCode=f"A{i % 20 + 1}", terminal=str(i % 3 + 1),
+                boardingOpenTime=flight.scheduledDeparture - timedelta(minutes=45),
+                boardingCloseTime=flight.scheduledDeparture - timedelta(minutes=15),
+            )
+            for i, flight in enumerate(flights)
+        ])
+        for flight, gate in zip(flights, gates):
+            flight.currentGate = gate
+        Flight.objects.bulk_update(flights, ['currentGate'], batch_size=500)
+        return origin
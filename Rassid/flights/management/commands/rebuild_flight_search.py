@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from flights.services.search import fts_available, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the flight search index from the flights and airports tables."
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            self.stdout.write("No search index on this database backend; nothing to rebuild.")
+            return
+        count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} flights."))
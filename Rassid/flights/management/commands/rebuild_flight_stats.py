@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from flights.services.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild AirportFlightStats and Flight.changeCount from history and gate tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--airport', type=int, action='append', dest='airports',
+                            help="Airport id to rebuild (repeatable). Defaults to all airports.")
+
+    def handle(self, *args, **options):
+        count = rebuild_stats(options['airports'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt flight stats for {count} airports."))
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_stats(apps, schema_editor):
+    Flight = apps.get_model('flights', 'Flight')
+    GateAssignment = apps.get_model('flights', 'GateAssignment')
+    AirportFlightStats = apps.get_model('flights', 'AirportFlightStats')
+
+    stats = {}
+
+    def stats_for(airport_id):
+        if airport_id not in stats:
+            stats[airport_id] = AirportFlightStats(airport_id=airport_id, topChangedFlights=[])
+        return stats[airport_id]
+
+    flights = Flight.objects.annotate(n=Count('flightstatushistory')).values_list('pk', 'origin_id', 'n')
+    top = {}
+    for flight_id, airport_id, n in flights.iterator():
+        if n:
+            Flight.objects.filter(pk=flight_id).update(changeCount=n)
+            stats_for(airport_id).totalUpdates += n
+            top.setdefault(airport_id, []).append([flight_id, n])
+
+    for airport_id, ranked in top.items():
+        ranked.sort(key=lambda item: (-item[1], item[0]))
+        stats_for(airport_id).topChangedFlights = ranked[:10]
+
+    released = GateAssignment.objects.filter(releasedAt__isnull=False).values_list(
+        'flight__origin_id', 'assignedAt', 'releasedAt'
+    )
+    for airport_id, assigned_at, released_at in released.iterator():
+        row = stats_for(airport_id)
+        row.gateDurationSeconds += (released_at - assigned_at).total_seconds()
+        row.gateDurationCount += 1
+
+    AirportFlightStats.objects.bulk_create(stats.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airports', '0006_alter_airport_id_alter_airportsubscription_id_and_more'),
+        ('flights', '0004_alter_flight_id_alter_flightapiimport_id_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='flight',
+            name='changeCount',
+            field=models.PositiveIntegerField(default=0, help_text='Number of FlightStatusHistory rows, maintained incrementally.'),
+        ),
+        migrations.CreateModel(
+            name='AirportFlightStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('totalUpdates', models.PositiveIntegerField(default=0)),
+                ('gateDurationSeconds', models.FloatField(default=0)),
+                ('gateDurationCount', models.PositiveIntegerField(default=0)),
+                ('topChangedFlights', models.JSONField(default=list)),
+                ('updatedAt', models.DateTimeField(auto_now=True)),
+                ('airport', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='flight_stats', to='airports.airport')),
+            ],
+        ),
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airports', '0006_alter_airport_id_alter_airportsubscription_id_and_more'),
+        ('flights', '0005_airportflightstats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='flight',
+            index=models.Index(fields=['scheduledDeparture', 'id'], name='flight_departure_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:05
+
+import string
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute("PRAGMA compile_options")
+            if 'ENABLE_FTS5' not in {row[0] for row in cursor.fetchall()}:
+                return
+            cursor.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS flights_flightsearch "
+                "USING fts5(flight_number, flight_digits, city, code, tokenize='unicode61', prefix='1 2 3')"
+            )
+            # flight_digits: the number without its two- or three-letter airline prefix
+            cursor.execute(
+                'INSERT INTO flights_flightsearch (rowid, flight_number, flight_digits, city, code) '
+                'SELECT f.id, f."flightNumber", LTRIM(SUBSTR(f."flightNumber", 3), %s), COALESCE(a.city, \'\'), a.code '
+                'FROM flights_flight f JOIN airports_airport a ON a.id = f.destination_id',
+                [string.ascii_letters],
+            )
+        elif connection.vendor == 'postgresql':
+            # icontains compiles to UPPER(col) LIKE UPPER(%s); index that expression
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS flight_number_trgm_idx '
+                'ON flights_flight USING gin (UPPER("flightNumber") gin_trgm_ops)'
+            )
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS airport_city_trgm_idx '
+                'ON airports_airport USING gin (UPPER(city) gin_trgm_ops)'
+            )
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS airport_code_trgm_idx '
+                'ON airports_airport USING gin (UPPER(code) gin_trgm_ops)'
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute("DROP TABLE IF EXISTS flights_flightsearch")
+        elif connection.vendor == 'postgresql':
+            cursor.execute("DROP INDEX IF EXISTS flight_number_trgm_idx")
+            cursor.execute("DROP INDEX IF EXISTS airport_city_trgm_idx")
+            cursor.execute("DROP INDEX IF EXISTS airport_code_trgm_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airports', '0006_alter_airport_id_alter_airportsubscription_id_and_more'),
+        ('flights', '0006_flight_departure_keyset_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def set_current_gates(apps, schema_editor):
+    Flight = apps.get_model('flights', 'Flight')
+    GateAssignment = apps.get_model('flights', 'GateAssignment')
+    latest = GateAssignment.objects.filter(flight=models.OuterRef('pk')).order_by('-assignedAt', '-id')
+    Flight.objects.update(currentGate=models.Subquery(latest.values('pk')[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0007_flight_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='flight',
+            name='currentGate',
+            field=models.ForeignKey(blank=True, editable=False, help_text='Latest GateAssignment of this flight, maintained as assignments are written.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='flights.gateassignment'),
+        ),
+        migrations.RunPython(set_current_gates, migrations.RunPython.noop),
+    ]
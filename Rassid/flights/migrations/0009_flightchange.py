@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0008_flight_current_gate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FlightChange',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('airportId', models.IntegerField()),
+                ('flightId', models.IntegerField()),
+                ('kind', models.CharField(choices=[('flight', 'Flight'), ('gate', 'Gate'), ('status', 'Status'), ('delete', 'Delete')], max_length=10)),
+                ('createdAt', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['airportId', 'id'], name='flight_change_feed_idx')],
+            },
+        ),
+    ]
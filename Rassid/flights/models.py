@@ -12,10 +12,28 @@ class Flight(models.Model):
     destination = models.ForeignKey(Airport, on_delete=models.CASCADE, related_name='destination_flights')
 
     is_protected = models.BooleanField(default=False, help_text="If True, API updates will not overwrite this flight's data.")
+    changeCount = models.PositiveIntegerField(default=0, help_text="Number of FlightStatusHistory rows, maintained incrementally.")
+    currentGate = models.ForeignKey(
+        'GateAssignment', on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='+',
+        help_text="Latest GateAssignment of this flight, maintained as assignments are written."
+    )
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of the public departures board
+            models.Index(fields=['scheduledDeparture', 'id'], name='flight_departure_keyset_idx'),
+        ]
 
     def __str__(self):
         return self.flightNumber
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Kept so saves that change nothing are not published to the changes feed
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
 
 class GateAssignment(models.Model):
     flight = models.ForeignKey(Flight, on_delete=models.CASCADE)
@@ -40,3 +58,45 @@ class FlightAPIImport(models.Model):
     providerName = models.CharField(max_length=50)
     rawPayload = models.TextField()
     importedAt = models.DateTimeField(auto_now_add=True)
+
+
+class AirportFlightStats(models.Model):
+    """
+    Running report counters for an airport's departures, updated as history
+    and gate rows are written. Rebuild with `manage.py rebuild_flight_stats`.
+    """
+    airport = models.OneToOneField(Airport, on_delete=models.CASCADE, related_name='flight_stats')
+    totalUpdates = models.PositiveIntegerField(default=0)
+    gateDurationSeconds = models.FloatField(default=0)
+    gateDurationCount = models.PositiveIntegerField(default=0)
+    # Bounded list of [flight_id, changeCount], highest first
+    topChangedFlights = models.JSONField(default=list)
+    updatedAt = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Stats for {self.airport.code}"
+
+
+class FlightChange(models.Model):
+    """
+    Append-only log of writes to an airport's flights, gates and status
+    history. The id is the changes feed's sequence number.
+    """
+    KIND_CHOICES = (
+        ('flight', 'Flight'),
+        ('gate', 'Gate'),
+        ('status', 'Status'),
+        ('delete', 'Delete'),
+    )
+    id = models.BigAutoField(primary_key=True)
+    # Plain ids rather than foreign keys, so deleting a flight (or an airport,
+    # mid-cascade) can still append its tombstone; old rows are pruned
+    airportId = models.IntegerField()
+    flightId = models.IntegerField()
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    createdAt = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['airportId', 'id'], name='flight_change_feed_idx'),
+        ]
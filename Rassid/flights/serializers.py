@@ -1,18 +1,19 @@
 from rest_framework import serializers
+from common.serializers import SparseFieldsMixin
 from .models import Flight, GateAssignment, FlightStatusHistory
 
-class GateAssignmentSerializer(serializers.ModelSerializer):
+class GateAssignmentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = GateAssignment
         fields = "__all__"
 
-class FlightStatusHistorySerializer(serializers.ModelSerializer):
+class FlightStatusHistorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = FlightStatusHistory
         fields = "__all__"
 
-class FlightSerializer(serializers.ModelSerializer):
-    gate_assignments = GateAssignmentSerializer(many=True, read_only=True)
+class FlightSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    gate_assignments = GateAssignmentSerializer(many=True, read_only=True, source='gateassignment_set')
 
     class Meta:
         model = Flight
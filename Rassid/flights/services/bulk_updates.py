@@ -0,0 +1,184 @@
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from airports.models import Airport
+from flights.models import Flight, FlightStatusHistory, GateAssignment
+from flights.services import changes, gate_index, operator_board, stats
+
+
+class BulkUpdateError(Exception):
+    pass
+
+
+def parse_time(value):
+    """Accept datetimes or the strings a datetime-local input / JSON body sends."""
+    if not value:
+        return None
+    if isinstance(value, str):
+        parsed = parse_datetime(value)
+        if parsed is None:
+            raise BulkUpdateError(f"Invalid date/time: {value}")
+        value = parsed
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def apply_flight_updates(airport_id, flight_ids, status=None, gate=None):
+    """
+    Apply one status and/or gate change to many of an airport's flights in a
+    single transaction.
+
+    gate is a dict with gateCode, terminal and optional boardingOpenTime /
+    boardingCloseTime. History and gate rows are written with bulk_create,
+    so the per-row signal work (stats, tracker snapshots, live updates,
+    passenger notifications) is done here once for the whole batch.
+    Returns {'flights': n, 'status_changes': n, 'gate_assignments': n,
+    'gate_conflicts': [warning, ...]}.
+    """
+    if not status and not gate:
+        raise BulkUpdateError("Nothing to apply: choose a status or a gate.")
+    if gate and not (gate.get('gateCode') and gate.get('terminal')):
+        raise BulkUpdateError("A gate change needs both a gate code and a terminal.")
+    boarding_open = parse_time(gate.get('boardingOpenTime')) if gate else None
+    boarding_close = parse_time(gate.get('boardingCloseTime')) if gate else None
+
+    with transaction.atomic():
+        flights = list(
+            Flight.objects.select_for_update().filter(origin_id=airport_id, pk__in=flight_ids)
+        )
+        if not flights:
+            raise BulkUpdateError("None of the selected flights belong to your airport.")
+
+        history = []
+        if status:
+            for flight in flights:
+                if flight.status != status:
+                    history.append(FlightStatusHistory(flight=flight, oldStatus=flight.status, newStatus=status))
+                    flight.status = status
+                flight.is_protected = True
+            Flight.objects.bulk_update(flights, ['status', 'is_protected'])
+            history = FlightStatusHistory.objects.bulk_create(history)
+            stats.record_status_changes([h.flight_id for h in history])
+            changes.record(airport_id, [h.flight_id for h in history], 'status')
+
+        assignments = []
+        if gate:
+            assignments = GateAssignment.objects.bulk_create([
+                GateAssignment(
+                    flight=flight,
+                    gateCode=gate['gateCode'],
+                    terminal=gate['terminal'],
+                    boardingOpenTime=boarding_open,
+                    boardingCloseTime=boarding_close,
+                )
+                for flight in flights
+            ])
+            for flight, assignment in zip(flights, assignments):
+                flight.currentGate = assignment
+            Flight.objects.bulk_update(flights, ['currentGate'])
+            changes.record(airport_id, [flight.pk for flight in flights], 'gate')
+
+        transaction.on_commit(lambda: _after_commit(airport_id, flights, history, assignments))
+
+    conflicts = []
+    for flight in (flights if assignments else []):
+        overlapping = gate_index.flight_conflicts(flight)
+        if overlapping:
+            conflicts.append(f"{flight.flightNumber}: {gate_index.describe_conflicts(gate['gateCode'], overlapping)}")
+
+    return {
+        'flights': len(flights),
+        'status_changes': len(history),
+        'gate_assignments': len(assignments),
+        'gate_conflicts': conflicts,
+    }
+
+
+def apply_gate_plan(airport_id, rows):
+    """
+    Create the gate assignments of a reviewed planner proposal in one
+    transaction. rows are the planner's assignment dicts. A row is skipped
+    when its flight got a gate in the meantime or its window now overlaps
+    another flight at that gate.
+
+    The airport row is locked for the whole transaction and the gates are
+    re-read from the database under that lock, so two plans applied at the
+    same time cannot both take one gate.
+    Returns {'gate_assignments': n, 'skipped': [flightNumber, ...]}.
+    """
+    rows = {row['flight_id']: row for row in rows}
+
+    with transaction.atomic():
+        list(Airport.objects.select_for_update().filter(pk=airport_id).values_list('pk', flat=True))
+        # Not the cached index: it may predate a plan committed by another worker
+        index = gate_index.build_index(airport_id)
+        flights = list(
+            Flight.objects.select_for_update().filter(origin_id=airport_id, pk__in=rows)
+            .select_related('currentGate')
+        )
+        planned = []
+        skipped = []
+        for flight in flights:
+            row = rows[flight.pk]
+            holds_gate = flight.currentGate and not flight.currentGate.releasedAt
+            if holds_gate or not index.is_free(row['gateCode'], row['boardingOpenTime'], row['boardingCloseTime'], flight.pk):
+                skipped.append(flight.flightNumber)
+                continue
+            planned.append(flight)
+
+        assignments = GateAssignment.objects.bulk_create([
+            GateAssignment(
+                flight=flight,
+                gateCode=rows[flight.pk]['gateCode'],
+                terminal=rows[flight.pk]['terminal'],
+                boardingOpenTime=rows[flight.pk]['boardingOpenTime'],
+                boardingCloseTime=rows[flight.pk]['boardingCloseTime'],
+            )
+            for flight in planned
+        ])
+        for flight, assignment in zip(planned, assignments):
+            flight.currentGate = assignment
+        Flight.objects.bulk_update(planned, ['currentGate'])
+        changes.record(airport_id, [flight.pk for flight in planned], 'gate')
+
+        if assignments:
+            transaction.on_commit(lambda: _after_commit(airport_id, planned, [], assignments))
+
+    return {'gate_assignments': len(assignments), 'skipped': skipped}
+
+
+def _after_commit(airport_id, flights, history, assignments):
+    from airports.services.dashboard import invalidate_dashboard
+    from passengers.services.live_updates import publish_flight_event
+    from passengers.services.timeline import gate_entry, refresh_snapshot, status_entry
+
+    invalidate_dashboard(airport_id)
+    if history:
+        # Cancelled or landed flights drop out of the destination counts
+        operator_board.invalidate_destinations(airport_id)
+    if assignments:
+        gate_index.invalidate(airport_id)
+
+    for flight in flights:
+        refresh_snapshot(flight.pk)
+    for h in history:
+        publish_flight_event(h.flight_id, status_entry(h))
+    for g in assignments:
+        publish_flight_event(g.flight_id, gate_entry(g))
+
+    updates = [{'kind': 'status', 'history_id': h.pk} for h in history]
+    updates += [{'kind': 'gate', 'assignment_id': g.pk} for g in assignments]
+    if updates:
+        enqueue_notifications(updates)
+
+
+def enqueue_notifications(updates):
+    """Hand the whole batch to one Celery task; send inline if no broker is reachable."""
+    from notifications.tasks import send_flight_update_batch
+    try:
+        send_flight_update_batch.apply_async((updates,), retry=False)
+    except Exception as e:
+        print(f"Could not enqueue {len(updates)} flight update notifications ({e}); sending inline.")
+        send_flight_update_batch(updates)
@@ -0,0 +1,130 @@
+import math
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from airports.models import Airport
+from flights.models import Flight, FlightChange
+from flights.services.compact import column_names, compact_flights
+
+PAGE_SIZE = 500
+POLL_INTERVAL = 0.5
+TRACKED_FIELDS = (
+    'flightNumber', 'status', 'scheduledDeparture', 'scheduledArrival',
+    'airlineCode', 'origin_id', 'destination_id',
+)
+
+
+class CursorExpired(Exception):
+    pass
+
+
+def _head_key(airport_id):
+    return f"flight_changes_head:{airport_id}"
+
+
+def flight_changed(flight, created):
+    """True when a save created the flight or changed a field the feed publishes."""
+    if created:
+        return True
+    loaded = getattr(flight, '_loaded_values', None)
+    if loaded is None:
+        return True
+    for attname in TRACKED_FIELDS:
+        if attname not in loaded:
+            return True
+        field = Flight._meta.get_field(attname.removesuffix('_id'))
+        if field.to_python(getattr(flight, attname)) != field.to_python(loaded[attname]):
+            return True
+    return False
+
+
+def record(airport_id, flight_ids, kind):
+    """
+    Append one change per flight; wakes long-polling readers once committed.
+
+    The airport row stays locked until the surrounding transaction ends, so
+    the airport's changes commit in id order and a reader that has passed a
+    cursor can never see a lower id appear behind it.
+    """
+    if airport_id is None or not flight_ids:
+        return
+    with transaction.atomic():
+        list(Airport.objects.select_for_update().filter(pk=airport_id).values_list('pk', flat=True))
+        FlightChange.objects.bulk_create([
+            FlightChange(airportId=airport_id, flightId=flight_id, kind=kind) for flight_id in flight_ids
+        ])
+    transaction.on_commit(lambda: cache.set(_head_key(airport_id), time.time_ns(), None))
+
+
+def current_cursor(airport_id):
+    last = FlightChange.objects.filter(airportId=airport_id).order_by('-id').values_list('id', flat=True).first()
+    return last or 0
+
+
+def _read(airport_id, since, limit, kinds=None):
+    if since and since + 1 < (FlightChange.objects.order_by('id').values_list('id', flat=True).first() or 0):
+        raise CursorExpired()
+
+    rows = FlightChange.objects.filter(airportId=airport_id, id__gt=since)
+    if kinds:
+        rows = rows.filter(kind__in=kinds)
+    rows = list(rows.order_by('id').values_list('id', 'flightId', 'kind')[:limit + 1])
+    more = len(rows) > limit
+    events = rows[:limit]
+
+    latest_kind = {}
+    for _, flight_id, kind in events:
+        latest_kind[flight_id] = kind
+    deleted = sorted(fid for fid, kind in latest_kind.items() if kind == 'delete')
+    changed = [fid for fid, kind in latest_kind.items() if kind != 'delete']
+
+    return {
+        'cursor': str(events[-1][0] if events else since),
+        'more': more,
+        'columns': column_names(),
+        'flights': compact_flights(changed) if changed else [],
+        'deleted': deleted,
+    }
+
+
+def changes_since(airport_id, since, limit=PAGE_SIZE, kinds=None):
+    """
+    Flights changed after cursor since, each once in its current state,
+    plus the ids of deleted flights. kinds limits which change kinds count.
+    Raises CursorExpired when rows after since may already have been
+    pruned; the client then resyncs in full.
+    """
+    return _read(airport_id, since, limit, kinds)
+
+
+def wait_for_changes(airport_id, since, timeout):
+    """
+    Long-poll: return changes_since as soon as there is something after
+    since, or an empty page after timeout seconds. Between reads only the
+    cached head marker is checked, not the database.
+    """
+    if not math.isfinite(timeout):
+        raise ValueError("timeout must be a finite number of seconds")
+    deadline = time.monotonic() + timeout
+    head = cache.get(_head_key(airport_id))
+    while True:
+        page = _read(airport_id, since, PAGE_SIZE)
+        if page['flights'] or page['deleted'] or time.monotonic() >= deadline:
+            return page
+        while time.monotonic() < deadline:
+            time.sleep(POLL_INTERVAL)
+            latest = cache.get(_head_key(airport_id))
+            if latest != head:
+                head = latest
+                break
+
+
+def prune(retention_days=None):
+    days = retention_days or settings.FLIGHT_CHANGES_RETENTION_DAYS
+    deleted, _ = FlightChange.objects.filter(createdAt__lt=timezone.now() - timedelta(days=days)).delete()
+    return deleted
@@ -0,0 +1,44 @@
+from flights.models import Flight
+
+# (column, lookup) pairs of the compact flight row: one list per flight,
+# values in this order, so keys are sent once per response instead of per row
+COLUMNS = (
+    ('id', 'id'),
+    ('flightNumber', 'flightNumber'),
+    ('status', 'status'),
+    ('scheduledDeparture', 'scheduledDeparture'),
+    ('scheduledArrival', 'scheduledArrival'),
+    ('airlineCode', 'airlineCode'),
+    ('destination', 'destination__code'),
+    ('gateCode', 'currentGate__gateCode'),
+    ('terminal', 'currentGate__terminal'),
+    ('boardingOpenTime', 'currentGate__boardingOpenTime'),
+    ('boardingCloseTime', 'currentGate__boardingCloseTime'),
+)
+# The public board spans airports, so it also names the origin
+BOARD_COLUMNS = COLUMNS[:6] + (('origin', 'origin__code'),) + COLUMNS[6:]
+
+
+def column_names(columns=COLUMNS):
+    return [name for name, _ in columns]
+
+
+def compact_values(flights, columns=COLUMNS):
+    """
+    The flights queryset as .values() dicts holding just the compact columns,
+    read in one query without building model instances.
+    """
+    return flights.prefetch_related(None).values(*[lookup for _, lookup in columns])
+
+
+def to_rows(values, columns=COLUMNS):
+    lookups = [lookup for _, lookup in columns]
+    return [[value[lookup] for lookup in lookups] for value in values]
+
+
+def compact_rows(flights, columns=COLUMNS):
+    return to_rows(compact_values(flights, columns), columns)
+
+
+def compact_flights(flight_ids):
+    return compact_rows(Flight.objects.filter(pk__in=flight_ids).order_by('pk'))
@@ -142,4 +142,3 @@ def save_flights_to_db(flights_data):
                 # Unpack parsed
                 **parsed
             )
-    
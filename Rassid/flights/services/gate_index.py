@@ -0,0 +1,162 @@
+import bisect
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from flights.models import Flight
+
+# Occupancy assumed when only the boarding open time is known
+DEFAULT_BOARDING_MINUTES = 45
+# Departures older than this no longer hold a gate
+HISTORY_WINDOW = timedelta(days=1)
+# Seconds a process keeps its copy before re-reading the gates, in case a
+# write reached the database without bumping the version (e.g. a bulk update)
+MAX_AGE = 30
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+def _version_key(airport_id):
+    return f"gate_index_version:{airport_id}"
+
+
+def gate_key(gate_code):
+    return (gate_code or '').strip().upper()
+
+
+class GateIndex:
+    """
+    Boarding windows of one airport's current gate assignments, per gate.
+
+    Each gate keeps its intervals sorted by start together with a running
+    maximum of their ends, so "does anything overlap [start, end)" is one
+    bisect plus one comparison. Listing the overlapping flights only walks
+    back over intervals that can still overlap.
+    """
+
+    def __init__(self, intervals):
+        by_gate = defaultdict(list)
+        for gate_code, start, end, flight_id, flight_number in intervals:
+            by_gate[gate_key(gate_code)].append((start, end, flight_id, flight_number))
+
+        self.gates = {}
+        for gate, rows in by_gate.items():
+            rows.sort(key=lambda row: row[0])
+            max_ends = []
+            running = None
+            for row in rows:
+                running = row[1] if running is None or row[1] > running else running
+                max_ends.append(running)
+            self.gates[gate] = ([row[0] for row in rows], max_ends, rows)
+
+    def conflicts(self, gate_code, start, end, exclude_flight=None):
+        """Flights holding gate_code at any time in [start, end), as (start, end, flight_id, flightNumber)."""
+        entry = self.gates.get(gate_key(gate_code))
+        if entry is None or end <= start:
+            return []
+        starts, max_ends, rows = entry
+
+        i = bisect.bisect_left(starts, end)
+        found = []
+        # max_ends is non-decreasing, so once it drops to start nothing earlier overlaps
+        while i > 0 and max_ends[i - 1] > start:
+            i -= 1
+            row = rows[i]
+            if row[1] > start and row[2] != exclude_flight:
+                found.append(row)
+        found.reverse()
+        return found
+
+    def is_free(self, gate_code, start, end, exclude_flight=None):
+        if exclude_flight is not None:
+            # The excluded flight may be the only overlap, so the rows are needed
+            return not self.conflicts(gate_code, start, end, exclude_flight)
+        entry = self.gates.get(gate_key(gate_code))
+        if entry is None or end <= start:
+            return True
+        starts, max_ends, _ = entry
+        i = bisect.bisect_left(starts, end)
+        return i == 0 or max_ends[i - 1] <= start
+
+
+def boarding_window(open_time, close_time):
+    """(start, end) a gate is held for, or None when no boarding time is set."""
+    if not open_time:
+        return None
+    if not close_time or close_time <= open_time:
+        close_time = open_time + timedelta(minutes=DEFAULT_BOARDING_MINUTES)
+    return open_time, close_time
+
+
+def build_index(airport_id):
+    flights = Flight.objects.filter(
+        origin_id=airport_id,
+        scheduledDeparture__gte=timezone.now() - HISTORY_WINDOW,
+        currentGate__isnull=False,
+        currentGate__releasedAt__isnull=True,
+        currentGate__boardingOpenTime__isnull=False,
+    ).exclude(status__iexact='cancelled').exclude(status__iexact='landed').values_list(
+        'pk', 'flightNumber', 'currentGate__gateCode',
+        'currentGate__boardingOpenTime', 'currentGate__boardingCloseTime',
+    )
+
+    intervals = []
+    for flight_id, flight_number, gate_code, open_time, close_time in flights:
+        start, end = boarding_window(open_time, close_time)
+        intervals.append((gate_code, start, end, flight_id, flight_number))
+    return GateIndex(intervals)
+
+
+def get_index(airport_id):
+    """
+    The airport's index, kept in process memory and rebuilt when another
+    request or worker has bumped its version in the shared cache, or when
+    it is older than MAX_AGE seconds.
+    """
+    version = cache.get(_version_key(airport_id), 0)
+    cached = _indexes.get(airport_id)
+    if cached and cached[0] == version and time.monotonic() - cached[1] < MAX_AGE:
+        return cached[2]
+
+    index = build_index(airport_id)
+    with _lock:
+        _indexes[airport_id] = (version, time.monotonic(), index)
+    return index
+
+
+def invalidate(airport_id):
+    key = _version_key(airport_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+    _indexes.pop(airport_id, None)
+
+
+def gate_conflicts(airport_id, gate_code, open_time, close_time, exclude_flight=None):
+    window = boarding_window(open_time, close_time)
+    if window is None:
+        return []
+    return get_index(airport_id).conflicts(gate_code, *window, exclude_flight=exclude_flight)
+
+
+def flight_conflicts(flight):
+    """Other flights whose boarding window overlaps this flight's current gate."""
+    gate = flight.currentGate
+    if gate is None or gate.releasedAt:
+        return []
+    return gate_conflicts(flight.origin_id, gate.gateCode, gate.boardingOpenTime, gate.boardingCloseTime,
+                          exclude_flight=flight.pk)
+
+
+def describe_conflicts(gate_code, conflicts):
+    names = ", ".join(
+        f"{number} ({timezone.localtime(start):%H:%M}-{timezone.localtime(end):%H:%M})"
+        for start, end, _, number in conflicts
+    )
+    return f"Gate {gate_code} is already in use by {names}."
@@ -0,0 +1,146 @@
+import bisect
+import re
+import uuid
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from flights.models import GateAssignment
+from flights.services.gate_index import boarding_window, gate_key, get_index
+from flights.services.operator_board import upcoming_departures
+
+HORIZON_HOURS = 24
+# Boarding window proposed for a flight with no gate yet, relative to departure
+BOARDING_OPENS_BEFORE = timedelta(minutes=45)
+BOARDING_CLOSES_BEFORE = timedelta(minutes=15)
+# Minimum idle time between two flights at the same gate
+TURNAROUND = timedelta(minutes=10)
+PROPOSAL_TTL = 60 * 30
+
+GATE_ENTRY = re.compile(r'^\s*(\S+)[\s,:/]+(\S+)\s*$')
+
+
+def airport_gates(airport_id, extra=''):
+    """
+    (terminal, gateCode) pairs the airport has used before, plus any given in
+    extra as one "TERMINAL GATE" pair per line.
+    """
+    gates = {}
+    used = GateAssignment.objects.filter(flight__origin_id=airport_id).values_list('terminal', 'gateCode').distinct()
+    for terminal, gate_code in used:
+        gates.setdefault(gate_key(gate_code), (terminal, gate_code))
+    for line in (extra or '').splitlines():
+        match = GATE_ENTRY.match(line)
+        if match:
+            terminal, gate_code = match.groups()
+            gates.setdefault(gate_key(gate_code), (terminal, gate_code.upper()))
+    return sorted(gates.values())
+
+
+def _merge(intervals):
+    """Sorted, non-overlapping union of (start, end) intervals."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [tuple(interval) for interval in merged]
+
+
+class GateTimeline:
+    """One gate's occupied intervals, kept disjoint and sorted by start."""
+
+    def __init__(self, terminal, gate_code, intervals):
+        self.terminal = terminal
+        self.gate_code = gate_code
+        self.intervals = _merge(intervals)
+        self.starts = [start for start, _ in self.intervals]
+
+    def gap_before(self, start, end):
+        """
+        Idle time between the previous interval and start, or None if
+        [start, end) would overlap. A gate with nothing before start
+        returns timedelta.max so busier gates are preferred.
+        """
+        i = bisect.bisect_left(self.starts, start)
+        if i < len(self.intervals) and self.intervals[i][0] < end + TURNAROUND:
+            return None
+        if i == 0:
+            return timedelta.max
+        previous_end = self.intervals[i - 1][1]
+        if previous_end + TURNAROUND > start:
+            return None
+        return start - previous_end
+
+    def add(self, start, end):
+        i = bisect.bisect_left(self.starts, start)
+        self.starts.insert(i, start)
+        self.intervals.insert(i, (start, end))
+
+
+def plan_gates(airport_id, horizon_hours=HORIZON_HOURS, extra_gates=''):
+    """
+    Propose a gate for every upcoming departure in the next horizon_hours
+    that has no current gate, without overlapping the airport's existing
+    assignments or each other.
+
+    Flights are placed in order of boarding start, each on the free gate
+    whose previous flight left most recently (best fit), which keeps the
+    number of gates in use low. Returns {'assignments': [...], 'unassigned': [...]}.
+    """
+    now = timezone.now()
+    flights = upcoming_departures(airport_id).filter(
+        scheduledDeparture__gte=now + BOARDING_CLOSES_BEFORE,
+        scheduledDeparture__lte=now + timedelta(hours=horizon_hours),
+    ).exclude(
+        currentGate__isnull=False, currentGate__releasedAt__isnull=True
+    ).only('pk', 'flightNumber', 'scheduledDeparture').order_by('scheduledDeparture', 'id')
+
+    index = get_index(airport_id)
+    timelines = []
+    for terminal, gate_code in airport_gates(airport_id, extra_gates):
+        entry = index.gates.get(gate_key(gate_code))
+        busy = [(row[0], row[1]) for row in entry[2]] if entry else []
+        timelines.append(GateTimeline(terminal, gate_code, busy))
+
+    assignments = []
+    unassigned = []
+    for flight in flights:
+        start, end = boarding_window(
+            flight.scheduledDeparture - BOARDING_OPENS_BEFORE,
+            flight.scheduledDeparture - BOARDING_CLOSES_BEFORE,
+        )
+        best = None
+        best_gap = None
+        for timeline in timelines:
+            gap = timeline.gap_before(start, end)
+            if gap is not None and (best_gap is None or gap < best_gap):
+                best, best_gap = timeline, gap
+
+        row = {
+            'flight_id': flight.pk,
+            'flightNumber': flight.flightNumber,
+            'scheduledDeparture': flight.scheduledDeparture,
+            'boardingOpenTime': start,
+            'boardingCloseTime': end,
+        }
+        if best is None:
+            unassigned.append(row)
+            continue
+        best.add(start, end)
+        row.update(gateCode=best.gate_code, terminal=best.terminal)
+        assignments.append(row)
+
+    return {'assignments': assignments, 'unassigned': unassigned}
+
+
+def save_proposal(airport_id, plan):
+    token = uuid.uuid4().hex
+    cache.set(f"gate_plan:{airport_id}:{token}", plan, PROPOSAL_TTL)
+    return token
+
+
+def load_proposal(airport_id, token):
+    return cache.get(f"gate_plan:{airport_id}:{token}")
@@ -0,0 +1,72 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from passengers.models import PassengerFlight
+
+CHUNK_SIZE = 2000
+# Rows joined into each chunk handed to the server, to keep per-write overhead low
+ROWS_PER_WRITE = 500
+COLUMNS = ['flight', 'scheduled_departure', 'passenger', 'seat', 'booking_ref', 'ticket_status', 'email', 'phone', 'language']
+
+
+class Echo:
+    """File-like object whose write() returns the line instead of buffering it."""
+
+    def write(self, value):
+        return value
+
+
+def manifest_queryset(**filters):
+    return PassengerFlight.objects.filter(**filters).select_related('passenger', 'flight').only(
+        'seatNumber', 'bookingRef', 'ticketStatus',
+        'passenger__fullName', 'passenger__email', 'passenger__phone', 'passenger__preferredLanguage',
+        'flight__flightNumber', 'flight__scheduledDeparture',
+    ).order_by('flight__scheduledDeparture', 'flight_id', 'seatNumber', 'id')
+
+
+def manifest_rows(queryset):
+    """Yield one tuple per booking, reading the queryset in fixed-size chunks."""
+    for pf in queryset.iterator(chunk_size=CHUNK_SIZE):
+        passenger = pf.passenger
+        yield (
+            pf.flight.flightNumber,
+            pf.flight.scheduledDeparture,
+            passenger.fullName,
+            pf.seatNumber,
+            pf.bookingRef,
+            pf.ticketStatus,
+            passenger.email,
+            passenger.phone,
+            passenger.preferredLanguage,
+        )
+
+
+def _batched(lines):
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= ROWS_PER_WRITE:
+            yield ''.join(batch)
+            batch = []
+    if batch:
+        yield ''.join(batch)
+
+
+def stream_csv(queryset):
+    writer = csv.writer(Echo())
+    yield writer.writerow(COLUMNS)
+    yield from _batched(
+        writer.writerow((row[0], row[1].isoformat()) + row[2:]) for row in manifest_rows(queryset)
+    )
+
+
+def stream_json(queryset):
+    rows = manifest_rows(queryset)
+    yield '['
+    yield from _batched(
+        (',' if i else '') + json.dumps(dict(zip(COLUMNS, row)), cls=DjangoJSONEncoder, ensure_ascii=False)
+        for i, row in enumerate(rows)
+    )
+    yield ']'
@@ -0,0 +1,53 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, F
+from django.utils import timezone
+
+from flights.models import Flight
+
+PAGE_SIZE = 50
+FACET_CACHE_TTL = 300
+
+
+def upcoming_departures(airport_id):
+    """Departures an operator still works on: from an hour ago, not landed or cancelled."""
+    cutoff_time = timezone.now() - timedelta(hours=1)
+    return Flight.objects.filter(
+        origin_id=airport_id,
+        scheduledDeparture__gte=cutoff_time
+    ).exclude(status__iexact='landed').exclude(status__iexact='cancelled')
+
+
+def with_latest_gate(flights):
+    return flights.select_related('origin', 'destination').annotate(
+        gate_code=F('currentGate__gateCode'),
+        gate_terminal=F('currentGate__terminal'),
+    )
+
+
+def _facet_key(airport_id):
+    return f"operator_destinations:{airport_id}"
+
+
+def destinations_facet(airport_id):
+    """
+    Destinations of the airport's upcoming departures with flight counts, from
+    one grouped query. Cached per airport for a few minutes, or until one of
+    its flights changes.
+    """
+    key = _facet_key(airport_id)
+    facet = cache.get(key)
+    if facet is None:
+        facet = list(
+            upcoming_departures(airport_id)
+            .values('destination_id', 'destination__city', 'destination__code')
+            .annotate(flights=Count('id'))
+            .order_by('destination__city', 'destination__code')
+        )
+        cache.set(key, facet, FACET_CACHE_TTL)
+    return facet
+
+
+def invalidate_destinations(airport_id):
+    cache.delete(_facet_key(airport_id))
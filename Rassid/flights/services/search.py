@@ -0,0 +1,110 @@
+import re
+import string
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+# SQLite FTS5 table holding one row per flight, rowid = Flight.id.
+# Created by migration 0007; absent on other backends and on SQLite builds
+# without FTS5, where search falls back to LIKE (trigram-indexed on PostgreSQL).
+SEARCH_TABLE = 'flights_flightsearch'
+COLUMNS = {
+    'flight_number': 'flightNumber__icontains',
+    'city': 'destination__city__icontains',
+    'code': 'destination__code__icontains',
+}
+# FTS columns searched for each of COLUMNS. flight_digits holds the number
+# without its airline prefix, so "1234" prefix-matches SV1234.
+FTS_COLUMNS = {
+    'flight_number': ('flight_number', 'flight_digits'),
+    'city': ('city',),
+    'code': ('code',),
+}
+
+_available = None
+
+# The airline prefix is two characters (IATA) plus an optional third letter (ICAO)
+_INDEX_SQL = f"""
+    INSERT INTO {SEARCH_TABLE} (rowid, flight_number, flight_digits, city, code)
+    SELECT f.id, f."flightNumber", LTRIM(SUBSTR(f."flightNumber", 3), '{string.ascii_letters}'), COALESCE(a.city, ''), a.code
+    FROM flights_flight f JOIN airports_airport a ON a.id = f.destination_id
+"""
+
+
+def fts_available():
+    global _available
+    if _available is None:
+        _available = connection.vendor == 'sqlite' and SEARCH_TABLE in connection.introspection.table_names()
+    return _available
+
+
+def index_flights(flight_ids):
+    """(Re)write the search rows for the given flights."""
+    if not fts_available() or not flight_ids:
+        return
+    placeholders = ', '.join(['%s'] * len(flight_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})", list(flight_ids))
+        cursor.execute(f"{_INDEX_SQL} WHERE f.id IN ({placeholders})", list(flight_ids))
+
+
+def index_destination(airport_id):
+    """Refresh every flight bound for an airport after its city or code changes."""
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN (SELECT id FROM flights_flight WHERE destination_id = %s)",
+            [airport_id],
+        )
+        cursor.execute(f"{_INDEX_SQL} WHERE f.destination_id = %s", [airport_id])
+
+
+def remove_flights(flight_ids):
+    if not fts_available() or not flight_ids:
+        return
+    placeholders = ', '.join(['%s'] * len(flight_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})", list(flight_ids))
+
+
+def rebuild_index():
+    if not fts_available():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        cursor.execute(_INDEX_SQL)
+        return cursor.rowcount
+
+
+def match_expression(query, columns):
+    """
+    Turn free text into an FTS5 query: every word must prefix-match one of
+    the columns. Returns None when nothing searchable is left.
+    """
+    tokens = re.findall(r'\w+', query or '')
+    if not tokens:
+        return None
+    scope = '{' + ' '.join(columns) + '} : '
+    return ' AND '.join(f'{scope}"{token}" *' for token in tokens)
+
+
+def search_flights(queryset, query, columns=tuple(COLUMNS)):
+    """
+    Filter a Flight queryset to prefix matches on flight number (with or
+    without its airline code) and destination city/code, ordered by
+    departure time.
+    """
+    if fts_available():
+        expression = match_expression(query, [name for column in columns for name in FTS_COLUMNS[column]])
+        if expression is None:
+            return queryset.none()
+        matches = RawSQL(f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s", [expression])
+        queryset = queryset.filter(pk__in=matches)
+    else:
+        condition = Q()
+        for column in columns:
+            condition |= Q(**{COLUMNS[column]: query})
+        queryset = queryset.filter(condition)
+    return queryset.order_by('scheduledDeparture', 'id')
@@ -0,0 +1,111 @@
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Sum
+
+from airports.models import Airport
+from flights.models import AirportFlightStats, Flight, FlightStatusHistory, GateAssignment
+
+TOP_K = 10
+
+
+def _merge_top(top, counts):
+    """Merge {flight_id: changeCount} into a top-K list of [flight_id, count]."""
+    merged = {flight_id: count for flight_id, count in top}
+    merged.update(counts)
+    ranked = sorted(merged.items(), key=lambda item: (-item[1], item[0]))
+    return [[flight_id, count] for flight_id, count in ranked[:TOP_K]]
+
+
+def _locked_stats(airport_id):
+    stats, _ = AirportFlightStats.objects.select_for_update().get_or_create(airport_id=airport_id)
+    return stats
+
+
+def record_status_changes(flight_ids):
+    """
+    Count new FlightStatusHistory rows. flight_ids may repeat, one entry per row.
+    """
+    per_flight = Counter(flight_ids)
+    if not per_flight:
+        return
+
+    with transaction.atomic():
+        for flight_id, n in per_flight.items():
+            Flight.objects.filter(pk=flight_id).update(changeCount=F('changeCount') + n)
+
+        by_airport = defaultdict(dict)
+        updates = defaultdict(int)
+        rows = Flight.objects.filter(pk__in=per_flight).values_list('pk', 'origin_id', 'changeCount')
+        for flight_id, airport_id, change_count in rows:
+            by_airport[airport_id][flight_id] = change_count
+            updates[airport_id] += per_flight[flight_id]
+
+        for airport_id, counts in by_airport.items():
+            stats = _locked_stats(airport_id)
+            stats.totalUpdates += updates[airport_id]
+            stats.topChangedFlights = _merge_top(stats.topChangedFlights, counts)
+            stats.save()
+
+
+def record_gate_release(assignment):
+    """Add one released gate assignment to its airport's average gate time."""
+    if not assignment.releasedAt or not assignment.assignedAt:
+        return
+    duration = (assignment.releasedAt - assignment.assignedAt).total_seconds()
+    airport_id = Flight.objects.filter(pk=assignment.flight_id).values_list('origin_id', flat=True).first()
+    if airport_id is None:
+        return
+
+    with transaction.atomic():
+        stats = _locked_stats(airport_id)
+        stats.gateDurationSeconds += duration
+        stats.gateDurationCount += 1
+        stats.save()
+
+
+def rebuild_stats(airport_ids=None):
+    """Recompute every counter from the history and gate tables."""
+    airports = Airport.objects.all()
+    if airport_ids:
+        airports = airports.filter(pk__in=airport_ids)
+    airport_ids = list(airports.values_list('pk', flat=True))
+
+    flights = Flight.objects.filter(origin_id__in=airport_ids)
+    change_counts = dict(
+        flights.annotate(n=Count('flightstatushistory')).values_list('pk', 'n')
+    )
+
+    updates = dict(
+        FlightStatusHistory.objects.filter(flight__origin_id__in=airport_ids)
+        .values('flight__origin_id').annotate(n=Count('id'))
+        .values_list('flight__origin_id', 'n')
+    )
+
+    durations = {
+        row['flight__origin_id']: row
+        for row in GateAssignment.objects.filter(flight__origin_id__in=airport_ids, releasedAt__isnull=False)
+        .annotate(duration=ExpressionWrapper(F('releasedAt') - F('assignedAt'), output_field=DurationField()))
+        .values('flight__origin_id')
+        .annotate(total=Sum('duration'), n=Count('id'))
+    }
+
+    with transaction.atomic():
+        flight_rows = list(flights.only('pk', 'origin_id', 'changeCount'))
+        top = defaultdict(dict)
+        for flight in flight_rows:
+            flight.changeCount = change_counts.get(flight.pk, 0)
+            if flight.changeCount:
+                top[flight.origin_id][flight.pk] = flight.changeCount
+        Flight.objects.bulk_update(flight_rows, ['changeCount'], batch_size=500)
+
+        for airport_id in airport_ids:
+            duration = durations.get(airport_id)
+            stats = _locked_stats(airport_id)
+            stats.totalUpdates = updates.get(airport_id, 0)
+            stats.gateDurationSeconds = duration['total'].total_seconds() if duration and duration['total'] else 0
+            stats.gateDurationCount = duration['n'] if duration else 0
+            stats.topChangedFlights = _merge_top([], top[airport_id])
+            stats.save()
+
+    return len(airport_ids)
@@ -0,0 +1,75 @@
+from django.db.models import OuterRef, Subquery
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from airports.models import Airport
+from flights.models import Flight, FlightStatusHistory, GateAssignment
+from flights.services import changes, gate_index, operator_board, search, stats
+
+def _origin_id(flight_id):
+    return Flight.objects.filter(pk=flight_id).values_list('origin_id', flat=True).first()
+
+@receiver(post_save, sender=FlightStatusHistory)
+def history_written(sender, instance, created, **kwargs):
+    if created:
+        stats.record_status_changes([instance.flight_id])
+        changes.record(_origin_id(instance.flight_id), [instance.flight_id], 'status')
+
+@receiver(pre_save, sender=GateAssignment)
+def gate_before_save(sender, instance, **kwargs):
+    # Remember whether this save is the one that releases the gate
+    instance._was_released = False
+    if instance.pk and instance.releasedAt:
+        instance._was_released = GateAssignment.objects.filter(
+            pk=instance.pk, releasedAt__isnull=False
+        ).exists()
+
+@receiver(post_save, sender=GateAssignment)
+def gate_written(sender, instance, created, **kwargs):
+    if instance.releasedAt and not getattr(instance, '_was_released', False):
+        stats.record_gate_release(instance)
+
+@receiver(post_save, sender=GateAssignment)
+def point_current_gate(sender, instance, created, **kwargs):
+    if created:
+        # update() so the flight's own post_save work is not repeated
+        Flight.objects.filter(pk=instance.flight_id).update(currentGate=instance)
+    origin_id = _origin_id(instance.flight_id)
+    if origin_id is not None:
+        gate_index.invalidate(origin_id)
+        changes.record(origin_id, [instance.flight_id], 'gate')
+
+@receiver(post_delete, sender=GateAssignment)
+def gate_deleted(sender, instance, **kwargs):
+    # on_delete=SET_NULL has already cleared the pointer; fall back to the previous assignment
+    latest = GateAssignment.objects.filter(flight=OuterRef('pk')).order_by('-assignedAt', '-id')
+    Flight.objects.filter(pk=instance.flight_id, currentGate__isnull=True).update(
+        currentGate=Subquery(latest.values('pk')[:1])
+    )
+    origin_id = _origin_id(instance.flight_id)
+    if origin_id is not None:
+        gate_index.invalidate(origin_id)
+        changes.record(origin_id, [instance.flight_id], 'gate')
+
+@receiver(post_save, sender=Flight)
+def flight_written(sender, instance, created, **kwargs):
+    search.index_flights([instance.pk])
+    # Ingestion re-saves every flight each run; only real changes go to the
+    # feed or throw away the airport's gate index
+    if changes.flight_changed(instance, created):
+        if instance.currentGate_id:
+            # Status or schedule changes can free or move the flight's gate window
+            gate_index.invalidate(instance.origin_id)
+        operator_board.invalidate_destinations(instance.origin_id)
+        changes.record(instance.origin_id, [instance.pk], 'flight')
+    instance._loaded_values = {name: getattr(instance, name) for name in changes.TRACKED_FIELDS}
+
+@receiver(post_delete, sender=Flight)
+def flight_deleted(sender, instance, **kwargs):
+    search.remove_flights([instance.pk])
+    operator_board.invalidate_destinations(instance.origin_id)
+    changes.record(instance.origin_id, [instance.pk], 'delete')
+
+@receiver(post_save, sender=Airport)
+def airport_written(sender, instance, created, **kwargs):
+    if not created:
+        search.index_destination(instance.pk)
@@ -16,6 +16,16 @@ def update_flights_task(airport_code=None):
     # --- Automated Status Updates (Boarding/Final Call) ---
     check_and_update_flight_statuses(airport_code)
 
+    # Rebuild the cached public board and homepage widget from this run's writes
+    from public.services.departures import refresh_public_departures
+    refresh_public_departures()
+
+@shared_task(ignore_result=True)
+def prune_flight_changes():
+    """Drop changes-feed rows older than FLIGHT_CHANGES_RETENTION_DAYS."""
+    from .services.changes import prune
+    print(f"Pruned {prune()} flight change rows.")
+
 def check_and_update_flight_statuses(airport_code=None):
     from django.utils import timezone
     from datetime import timedelta
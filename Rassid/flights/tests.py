@@ -1,3 +1,440 @@
+import time
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from airports.models import Airport
+from flights.models import Flight, FlightChange, FlightStatusHistory, GateAssignment
+from flights.services import changes, gate_index, operator_board
+from flights.services.bulk_updates import BulkUpdateError, apply_flight_updates, apply_gate_plan
+from flights.services.search import fts_available, search_flights
+from flights.services.gate_planner import BOARDING_OPENS_BEFORE, TURNAROUND, GateTimeline, plan_gates
+
+User = get_user_model()
+
+
+class FlightTestData:
+    def make_airports(self):
+        self.airport = Airport.objects.create(name="Origin", code="FT1", city="City")
+        self.other_airport = Airport.objects.create(name="Other", code="FT2", city="City")
+        self.destination = Airport.objects.create(name="Destination", code="FT3", city="City")
+
+    def make_flight(self, number, origin=None, hours=2):
+        now = timezone.now()
+        return Flight.objects.create(
+            flightNumber=number, status='Scheduled', airlineCode=number[:2],
+            scheduledDeparture=now + timedelta(hours=hours), scheduledArrival=now + timedelta(hours=hours + 2),
+            origin=origin or self.airport, destination=self.destination,
+        )
+
+
+class FlightChangesFeedTests(FlightTestData, TestCase):
+    def setUp(self):
+        self.make_airports()
+        self.user = User.objects.create_user(email='admin@ft1.test', role='airport_admin', airport_id=self.airport.id)
+        self.client.force_login(self.user)
+        self.url = reverse('api_flight_changes')
+
+    def test_cursor_returns_each_flight_once_in_current_state(self):
+        start = changes.current_cursor(self.airport.id)
+        flight = self.make_flight('SV100')
+        flight.status = 'Delayed'
+        flight.save()
+        self.make_flight('XY200', origin=self.other_airport)
+
+        page = changes.changes_since(self.airport.id, start)
+        [row] = page['flights']
+        self.assertEqual(row[page['columns'].index('flightNumber')], 'SV100')
+        self.assertEqual(row[page['columns'].index('status')], 'Delayed')
+        self.assertFalse(page['more'])
+
+        # Nothing new after the returned cursor; an unchanged save records nothing
+        flight.refresh_from_db()
+        flight.save()
+        later = changes.changes_since(self.airport.id, int(page['cursor']))
+        self.assertEqual((later['flights'], later['deleted'], later['cursor']), ([], [], page['cursor']))
+
+    def test_pages_and_deletes(self):
+        start = changes.current_cursor(self.airport.id)
+        flights = [self.make_flight(f"SV{i}") for i in range(3)]
+        deleted_id = flights[0].pk
+        flights[0].delete()
+
+        first = changes.changes_since(self.airport.id, start, limit=2)
+        self.assertTrue(first['more'])
+        rest = changes.changes_since(self.airport.id, int(first['cursor']), limit=2)
+        self.assertFalse(rest['more'])
+        self.assertEqual(rest['deleted'], [deleted_id])
+
+    def test_kinds_filter(self):
+        start = changes.current_cursor(self.airport.id)
+        flight = self.make_flight('SV300')
+        GateAssignment.objects.create(flight=flight, gateCode='A1', terminal='1')
+
+        page = changes.changes_since(self.airport.id, start, kinds=['gate'])
+        self.assertEqual([row[0] for row in page['flights']], [flight.pk])
+        self.assertEqual(int(page['cursor']), FlightChange.objects.filter(kind='gate').get().id)
+        self.assertEqual(changes.changes_since(self.airport.id, start, kinds=['delete'])['flights'], [])
+
+    def test_pruned_cursor_expires(self):
+        self.make_flight('SV400')
+        self.make_flight('SV401')
+        since = FlightChange.objects.order_by('id').first().id
+        FlightChange.objects.update(createdAt=timezone.now() - timedelta(days=30))
+        self.make_flight('SV402')
+        self.assertEqual(changes.prune(retention_days=7), 2)
+
+        with self.assertRaises(changes.CursorExpired):
+            changes.changes_since(self.airport.id, since)
+        response = self.client.get(self.url, {'since': since})
+        self.assertEqual(response.status_code, 410)
+
+    def test_view_scopes_to_users_airport(self):
+        response = self.client.get(self.url)
+        cursor = response.json()['cursor']
+        self.make_flight('XY500', origin=self.other_airport)
+        self.make_flight('SV500')
+
+        page = self.client.get(self.url, {'since': cursor}).json()
+        self.assertEqual([row[1] for row in page['flights']], ['SV500'])
+
+    def test_wait_returns_at_once_when_changes_exist(self):
+        cursor = changes.current_cursor(self.airport.id)
+        self.make_flight('SV600')
+
+        started = time.monotonic()
+        page = self.client.get(self.url, {'since': cursor, 'wait': 5}).json()
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual(len(page['flights']), 1)
+
+    def test_wait_times_out_empty(self):
+        cursor = changes.current_cursor(self.airport.id)
+
+        started = time.monotonic()
+        page = self.client.get(self.url, {'since': cursor, 'wait': 0.6}).json()
+        self.assertGreaterEqual(time.monotonic() - started, 0.6)
+        self.assertEqual((page['flights'], page['deleted']), ([], []))
+
+    def test_non_finite_wait_is_rejected(self):
+        for wait in ('nan', 'inf', '-inf', 'soon'):
+            response = self.client.get(self.url, {'since': 0, 'wait': wait})
+            self.assertEqual(response.status_code, 400)
+        with self.assertRaises(ValueError):
+            changes.wait_for_changes(self.airport.id, 0, float('nan'))
+
+
+class GatePlannerTests(FlightTestData, TestCase):
+    def setUp(self):
+        self.make_airports()
+
+    def assign(self, flight, gate_code, start, end):
+        return GateAssignment.objects.create(
+            flight=flight, gateCode=gate_code, terminal='1', boardingOpenTime=start, boardingCloseTime=end
+        )
+
+    def test_gap_before_keeps_turnaround_on_both_sides(self):
+        ten = datetime(2026, 1, 1, 10, 0, tzinfo=timezone.get_current_timezone())
+        timeline = GateTimeline('1', 'A1', [(ten, ten + timedelta(minutes=30))])
+        after = ten + timedelta(minutes=30) + TURNAROUND
+
+        self.assertEqual(timeline.gap_before(after, after + timedelta(minutes=30)), TURNAROUND)
+        self.assertIsNone(timeline.gap_before(after - timedelta(minutes=1), after + timedelta(minutes=30)))
+        before_end = ten - TURNAROUND
+        self.assertEqual(timeline.gap_before(ten - timedelta(hours=1), before_end), timedelta.max)
+        self.assertIsNone(timeline.gap_before(ten - timedelta(hours=1), before_end + timedelta(minutes=1)))
+
+    def test_flight_goes_to_the_gate_freed_most_recently(self):
+        flight = self.make_flight('SV700', hours=6)
+        start = flight.scheduledDeparture - BOARDING_OPENS_BEFORE
+        self.assign(self.make_flight('SV701', hours=5), 'A1', start - timedelta(hours=1), start - timedelta(minutes=15))
+        self.assign(self.make_flight('SV702', hours=4), 'B1', start - timedelta(hours=2), start - timedelta(hours=1))
+
+        plan = plan_gates(self.airport.id)
+
+        [row] = plan['assignments']
+        self.assertEqual((row['flight_id'], row['gateCode']), (flight.pk, 'A1'))
+        self.assertEqual(plan['unassigned'], [])
+
+    def test_apply_skips_rows_that_now_conflict(self):
+        flights = [self.make_flight(f"SV71{i}", hours=6 + i) for i in range(3)]
+        plan = plan_gates(self.airport.id, extra_gates="1 A1\n1 B1\n1 C1")
+        rows = {row['flight_id']: row for row in plan['assignments']}
+        self.assertEqual(len(rows), 3)
+
+        # After planning: another flight takes the first row's gate, and the
+        # second flight is given a gate by hand
+        first = rows[flights[0].pk]
+        self.assign(self.make_flight('XY799', hours=6), first['gateCode'], first['boardingOpenTime'], first['boardingCloseTime'])
+        self.assign(flights[1], 'Z9', first['boardingOpenTime'], first['boardingCloseTime'])
+
+        # A stale cached index must not let the conflicting row through
+        with mock.patch.object(gate_index, 'get_index', return_value=gate_index.GateIndex([])):
+            result = apply_gate_plan(self.airport.id, plan['assignments'])
+
+        self.assertEqual(result['gate_assignments'], 1)
+        self.assertEqual(sorted(result['skipped']), ['SV710', 'SV711'])
+        flights[2].refresh_from_db()
+        self.assertEqual(flights[2].currentGate.gateCode, rows[flights[2].pk]['gateCode'])
+
+
+class FlightSearchTests(FlightTestData, TestCase):
+    def setUp(self):
+        self.make_airports()
+        self.make_flight('SV1234')
+        self.make_flight('XY900')
+
+    def search(self, query, **kwargs):
+        return list(search_flights(Flight.objects.all(), query, **kwargs).values_list('flightNumber', flat=True))
+
+    def test_prefixes_and_numeric_parts_match(self):
+        self.assertTrue(fts_available())
+        self.assertEqual(self.search('sv12'), ['SV1234'])
+        self.assertEqual(self.search('1234'), ['SV1234'])
+        self.assertEqual(self.search('12', columns=('flight_number',)), ['SV1234'])
+        self.assertEqual(self.search('cit'), ['SV1234', 'XY900'])
+        self.assertEqual(self.search('1234', columns=('city',)), [])
+
+        # Answered from the FTS index alone, no LIKE scan over flights
+        with CaptureQueriesContext(connection) as queries:
+            self.search('1234')
+        self.assertNotIn('LIKE', queries.captured_queries[-1]['sql'].upper())
+
+
+class DailyManifestExportTests(FlightTestData, TestCase):
+    def setUp(self):
+        self.make_airports()
+        self.user = User.objects.create_user(email='operator@ft1.test', role='operator', airport_id=self.airport.id)
+        self.client.force_login(self.user)
+        self.url = reverse('operator_export_daily_manifest')
+
+    def test_invalid_dates_are_rejected(self):
+        for day in ('2024-02-30', 'tomorrow'):
+            self.assertEqual(self.client.get(self.url, {'date': day}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'date': '2024-02-29'}).status_code, 200)
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+
+class AirportScopedApiTests(FlightTestData, TestCase):
+    url = '/api/flights/flights/'
+
+    def setUp(self):
+        self.make_airports()
+        self.user = User.objects.create_user(email='admin@ft1.test', role='airport_admin', airport_id=self.airport.id)
+        self.client.force_login(self.user)
+        self.own = [self.make_flight(f"SV{800 + i}", hours=2 + i) for i in range(5)]
+        self.foreign = self.make_flight('XY800', origin=self.other_airport)
+
+    def test_other_airports_are_invisible(self):
+        results = self.client.get(self.url).json()['results']
+        self.assertEqual({row['id'] for row in results}, {flight.pk for flight in self.own})
+        self.assertEqual(self.client.get(f"{self.url}{self.foreign.pk}/").status_code, 404)
+        self.assertEqual(self.client.patch(f"{self.url}{self.foreign.pk}/", {'status': 'Delayed'},
+                                           content_type='application/json').status_code, 404)
+
+    def test_writes_into_another_airport_are_rejected(self):
+        now = timezone.now()
+        data = {
+            'flightNumber': 'SV899', 'status': 'Scheduled', 'airlineCode': 'SV',
+            'scheduledDeparture': now + timedelta(hours=3), 'scheduledArrival': now + timedelta(hours=5),
+            'origin': self.other_airport.pk, 'destination': self.destination.pk,
+        }
+        self.assertEqual(self.client.post(self.url, data, content_type='application/json').status_code, 400)
+        self.assertFalse(Flight.objects.filter(flightNumber='SV899').exists())
+
+        # Moving one of our flights away is a write into the other airport too
+        response = self.client.patch(f"{self.url}{self.own[0].pk}/", {'origin': self.other_airport.pk},
+                                     content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+        data['origin'] = self.airport.pk
+        self.assertEqual(self.client.post(self.url, data, content_type='application/json').status_code, 201)
+
+    def test_cursor_pages_are_stable(self):
+        seen = []
+        response = self.client.get(self.url, {'page_size': 2}).json()
+        seen += [row['flightNumber'] for row in response['results']]
+        # A flight inserted before the cursor position does not shift later pages
+        self.make_flight('SV799', hours=1)
+        while response['next']:
+            response = self.client.get(response['next']).json()
+            seen += [row['flightNumber'] for row in response['results']]
+
+        self.assertEqual(seen, [flight.flightNumber for flight in self.own])
+
+    def test_sparse_fields_skip_the_gate_prefetch(self):
+        GateAssignment.objects.create(flight=self.own[0], gateCode='A1', terminal='1')
+
+        with CaptureQueriesContext(connection) as full:
+            row = self.client.get(self.url).json()['results'][0]
+        self.assertEqual(row['gate_assignments'][0]['gateCode'], 'A1')
+        self.assertTrue(any('flights_gateassignment' in q['sql'] for q in full.captured_queries))
+
+        with CaptureQueriesContext(connection) as sparse:
+            row = self.client.get(self.url, {'fields': 'id,flightNumber'}).json()['results'][0]
+        self.assertEqual(set(row), {'id', 'flightNumber'})
+        self.assertFalse(any('flights_gateassignment' in q['sql'] for q in sparse.captured_queries))
+
+
+class GateIndexTests(FlightTestData, TestCase):
+    def at(self, minutes):
+        return datetime(2026, 1, 1, 8, 0, tzinfo=timezone.get_current_timezone()) + timedelta(minutes=minutes)
+
+    def index(self):
+        # One long early window, two short ones inside it, one later window
+        return gate_index.GateIndex([
+            ('A1', self.at(0), self.at(60), 1, 'SV1'),
+            ('a1 ', self.at(10), self.at(20), 2, 'SV2'),
+            ('A1', self.at(30), self.at(40), 3, 'SV3'),
+            ('A1', self.at(100), self.at(110), 4, 'SV4'),
+        ])
+
+    def flights(self, gate_code, start, end, **kwargs):
+        return [row[2] for row in self.index().conflicts(gate_code, self.at(start), self.at(end), **kwargs)]
+
+    def test_windows_are_half_open(self):
+        self.assertEqual(self.flights('A1', 60, 100), [])
+        self.assertTrue(self.index().is_free('A1', self.at(60), self.at(100)))
+        self.assertEqual(self.flights('A1', 59, 101), [1, 4])
+        self.assertEqual(self.flights('A1', 110, 120), [])
+
+    def test_walk_back_finds_long_windows_behind_short_ones(self):
+        # SV2 and SV3 end before 45, but the running max end keeps the walk going to SV1
+        self.assertEqual(self.flights('A1', 45, 50), [1])
+        self.assertEqual(self.flights('A1', 15, 35), [1, 2, 3])
+        self.assertEqual(self.flights('A1', 45, 50, exclude_flight=1), [])
+
+    def test_is_free_agrees_with_conflicts(self):
+        index = self.index()
+        for start in range(-10, 120, 5):
+            for length in (5, 15, 50):
+                for exclude in (None, 1):
+                    window = (self.at(start), self.at(start + length))
+                    self.assertEqual(
+                        index.is_free('A1', *window, exclude_flight=exclude),
+                        not index.conflicts('A1', *window, exclude_flight=exclude),
+                        (start, length, exclude),
+                    )
+
+    def test_empty_windows_and_unknown_gates(self):
+        self.assertEqual(self.flights('A1', 50, 50), [])
+        self.assertEqual(self.flights('B7', 0, 200), [])
+
+    def test_copy_is_rebuilt_after_max_age(self):
+        self.make_airports()
+        flight = self.make_flight('SV900')
+        GateAssignment.objects.create(flight=flight, gateCode='A1', terminal='1', boardingOpenTime=self.at(0))
+        self.assertIn('A1', gate_index.get_index(self.airport.id).gates)
+
+        # Unchanged re-saves, as ingestion does every run, keep the index
+        version = cache.get(gate_index._version_key(self.airport.id))
+        Flight.objects.get(pk=flight.pk).save()
+        self.assertEqual(cache.get(gate_index._version_key(self.airport.id)), version)
+        changed = Flight.objects.get(pk=flight.pk)
+        changed.status = 'Delayed'
+        changed.save()
+        self.assertEqual(cache.get(gate_index._version_key(self.airport.id)), version + 1)
+
+        # A bulk update sends no signal, so the version is not bumped
+        gate_index.get_index(self.airport.id)
+        GateAssignment.objects.update(gateCode='B2')
+        self.assertIn('A1', gate_index.get_index(self.airport.id).gates)
+        with mock.patch.object(gate_index, 'MAX_AGE', 0):
+            self.assertEqual(list(gate_index.get_index(self.airport.id).gates), ['B2'])
+
+
+class BulkFlightUpdateTests(FlightTestData, TestCase):
+    def setUp(self):
+        self.make_airports()
+        self.user = User.objects.create_user(email='operator@ft1.test', role='operator', airport_id=self.airport.id)
+        self.client.force_login(self.user)
+        self.url = reverse('operator_bulk_update_flights')
+        self.flights = [self.make_flight(f"SV{950 + i}") for i in range(2)]
+        self.foreign = self.make_flight('XY950', origin=self.other_airport)
+
+    def post(self, data):
+        return self.client.post(self.url, data, content_type='application/json')
+
+    def test_status_and_gate_are_written_and_notified_once(self):
+        ids = [flight.pk for flight in self.flights]
+        gate = {'gateCode': 'B4', 'terminal': '2', 'boardingOpenTime': '2026-01-01T08:00'}
+
+        with mock.patch('flights.services.bulk_updates.enqueue_notifications') as enqueue, \
+                mock.patch('passengers.services.live_updates.publish_flight_event') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                result = apply_flight_updates(self.airport.id, ids + [self.foreign.pk], status='Delayed', gate=gate)
+
+        self.assertEqual((result['flights'], result['status_changes'], result['gate_assignments']), (2, 2, 2))
+        for flight in Flight.objects.filter(pk__in=ids).select_related('currentGate'):
+            self.assertEqual((flight.status, flight.currentGate.gateCode), ('Delayed', 'B4'))
+            self.assertTrue(flight.is_protected)
+        self.assertEqual(FlightStatusHistory.objects.filter(flight_id__in=ids).count(), 2)
+        # The other airport's flight was not touched
+        self.foreign.refresh_from_db()
+        self.assertEqual((self.foreign.status, self.foreign.currentGate_id), ('Scheduled', None))
+
+        [(updates,), _] = enqueue.call_args
+        self.assertEqual(enqueue.call_count, 1)
+        self.assertEqual(sorted(update['kind'] for update in updates), ['gate', 'gate', 'status', 'status'])
+        self.assertEqual(publish.call_count, 4)
+
+    def test_flights_of_other_airports_are_rejected(self):
+        with self.assertRaises(BulkUpdateError):
+            apply_flight_updates(self.airport.id, [self.foreign.pk], status='Delayed')
+        response = self.post({'flight_ids': [self.foreign.pk], 'status': 'Delayed'})
+        self.assertEqual(response.status_code, 400)
+        self.foreign.refresh_from_db()
+        self.assertEqual(self.foreign.status, 'Scheduled')
+
+    def test_malformed_json_bodies_are_rejected(self):
+        for body in ([self.flights[0].pk], {'flight_ids': '12', 'status': 'Delayed'},
+                     {'flight_ids': [self.flights[0].pk], 'gate': 'B4'},
+                     {'flight_ids': [self.flights[0].pk], 'status': ['Delayed']}):
+            self.assertEqual(self.post(body).status_code, 400, body)
+
+        response = self.post({'flight_ids': [self.flights[0].pk], 'status': 'Boarding'})
+        self.assertEqual((response.status_code, response.json()['status_changes']), (200, 1))
+
+
+class OperatorFlightsListTests(FlightTestData, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.make_airports()
+        self.user = User.objects.create_user(email='operator@ft1.test', role='operator', airport_id=self.airport.id)
+        self.client.force_login(self.user)
+        self.url = reverse('operator_flights_list')
+
+    def numbers(self, **params):
+        return [flight.flightNumber for flight in self.client.get(self.url, params).context['flights']]
+
+    def test_pages_split_at_page_size(self):
+        size = operator_board.PAGE_SIZE
+        for i in range(size):
+            self.make_flight(f"SV{i:04d}", hours=2 + i / 60)
+        response = self.client.get(self.url)
+        self.assertEqual((len(response.context['flights']), response.context['page_obj'].paginator.num_pages), (size, 1))
+
+        self.make_flight('SV9999', hours=2 + size)
+        self.assertEqual(len(self.numbers()), size)
+        self.assertEqual(self.numbers(page=2), ['SV9999'])
+        # Out of range pages fall back to the last one
+        self.assertEqual(self.numbers(page=3), ['SV9999'])
+
+    def test_destinations_facet_follows_new_flights(self):
+        self.make_flight('SV100')
+        facet = self.client.get(self.url).context['destinations']
+        self.assertEqual([(row['destination__code'], row['flights']) for row in facet], [('FT3', 1)])
+
+        elsewhere = Airport.objects.create(name="Elsewhere", code="FT4", city="Another City")
+        flight = self.make_flight('SV101')
+        flight.destination = elsewhere
+        flight.save()
 
-# Create your tests here.
+        facet = self.client.get(self.url).context['destinations']
+        self.assertEqual([(row['destination__code'], row['flights']) for row in facet], [('FT4', 1), ('FT3', 1)])
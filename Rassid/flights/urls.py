@@ -13,6 +13,13 @@ urlpatterns = [
     path("dashboard/", views.flights_list, name="operator_dashboard"),
     path("flights/<int:pk>/edit/", views.edit_flight, name="operator_edit_flight"),
     path("flights/fetch/", views.fetch_flights, name="operator_fetch_flights"),
+    path("flights/bulk-update/", views.bulk_update_flights, name="operator_bulk_update_flights"),
+    path("gates/plan/", views.gate_planner, name="operator_gate_planner"),
+    path("gates/availability/", views.gate_availability, name="operator_gate_availability"),
     path("flights/<int:pk>/passengers/", views.passenger_list, name="operator_passenger_list"),
+    path("flights/<int:pk>/passengers/export/", views.export_passenger_manifest, name="operator_export_manifest"),
+    path("flights/<int:pk>/passengers/import/", views.import_passenger_manifest, name="operator_import_manifest"),
+    path("flights/manifest/import/<str:job_id>/", views.manifest_import_status, name="operator_manifest_import_status"),
+    path("flights/manifest/export/", views.export_daily_manifest, name="operator_export_daily_manifest"),
     path("", include(router.urls)),
 ]
@@ -3,7 +3,9 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 
 from rest_framework.viewsets import ModelViewSet
+from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
 from .models import Flight, GateAssignment, FlightStatusHistory
 from .serializers import (
@@ -12,26 +14,124 @@ from .serializers import (
     FlightStatusHistorySerializer,
 )
 from users.permissions import IsAirportAdmin, IsOperator
+from common.api import AirportScopedMixin, ApiCursorPagination, QueryFilterBackend, parse_list, parse_when
 from airports.models import Airport
 from django.utils import timezone
 
+RECENT_TICKETS_LIMIT = 10
+MANIFEST_PAGE_SIZE = 100
 
-class FlightViewSet(ModelViewSet):
+
+class FlightViewSet(AirportScopedMixin, ModelViewSet):
     queryset = Flight.objects.all()
     serializer_class = FlightSerializer
     permission_classes = [IsAuthenticated, IsAirportAdmin]
+    pagination_class = ApiCursorPagination
+    filter_backends = [QueryFilterBackend]
+    airport_field = 'origin_id'
+    cursor_ordering = ('scheduledDeparture', 'id')
+    list_prefetch_related = ('gateassignment_set',)
+    sparse_prefetches = {'gateassignment_set': 'gate_assignments'}
+    filter_params = {
+        'status': ('status__in', parse_list),
+        'destination': 'destination__code__iexact',
+        'departure_after': ('scheduledDeparture__gte', parse_when),
+        'departure_before': ('scheduledDeparture__lt', parse_when),
+    }
+
+    def list(self, request, *args, **kwargs):
+        """
+        ?compact=1 returns {'columns': [...], 'results': [[...], ...]}: one
+        value list per flight, read without the serializer. Boards use it.
+        """
+        if request.query_params.get('compact') not in ('1', 'true'):
+            return super().list(request, *args, **kwargs)
 
+        from .services.compact import column_names, compact_values, to_rows
+        flights = self.filter_queryset(self.get_queryset())
+        values = compact_values(flights)
+        page = self.paginate_queryset(values)
+        if page is None:
+            return Response({'columns': column_names(), 'results': to_rows(values)})
+        response = self.get_paginated_response(to_rows(page))
+        response.data['columns'] = column_names()
+        return response
 
-class GateAssignmentViewSet(ModelViewSet):
+
+class GateAssignmentViewSet(AirportScopedMixin, ModelViewSet):
     queryset = GateAssignment.objects.all()
     serializer_class = GateAssignmentSerializer
     permission_classes = [IsAuthenticated, IsAirportAdmin]
+    pagination_class = ApiCursorPagination
+    filter_backends = [QueryFilterBackend]
+    airport_field = 'flight__origin_id'
+    cursor_ordering = ('-assignedAt', '-id')
+    filter_params = {
+        'flight': 'flight_id',
+        'gate': 'gateCode__iexact',
+        'assigned_after': ('assignedAt__gte', parse_when),
+        'assigned_before': ('assignedAt__lt', parse_when),
+    }
 
 
-class FlightStatusHistoryViewSet(ModelViewSet):
+class FlightStatusHistoryViewSet(AirportScopedMixin, ModelViewSet):
     queryset = FlightStatusHistory.objects.all()
     serializer_class = FlightStatusHistorySerializer
     permission_classes = [IsAuthenticated, IsOperator]
+    pagination_class = ApiCursorPagination
+    filter_backends = [QueryFilterBackend]
+    airport_field = 'flight__origin_id'
+    cursor_ordering = ('-changedAt', '-id')
+    filter_params = {
+        'flight': 'flight_id',
+        'status': ('newStatus__in', parse_list),
+        'changed_after': ('changedAt__gte', parse_when),
+        'changed_before': ('changedAt__lt', parse_when),
+    }
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def flight_changes(request):
+    """
+    Incremental feed of an airport's flight, gate and status changes.
+    ?since=<cursor> returns the flights changed after it, each once in
+    compact row form, plus deleted flight ids and the next cursor. Without
+    since, returns the current cursor to start from. ?wait=<seconds> holds
+    the request open until something changes (long-poll).
+    """
+    import math
+    from django.conf import settings
+    from .services.changes import CursorExpired, changes_since, current_cursor, wait_for_changes
+
+    user = request.user
+    airport_id = user.airport_id
+    if user.is_superuser or user.role == 'superadmin':
+        airport_id = request.query_params.get('airport_id') or airport_id
+    if not airport_id or not str(airport_id).isdigit():
+        return Response({'error': 'airport_id is required'}, status=400)
+    airport_id = int(airport_id)
+
+    since = request.query_params.get('since')
+    if since in (None, ''):
+        return Response({'cursor': str(current_cursor(airport_id)), 'more': False, 'flights': [], 'deleted': []})
+    try:
+        since = int(since)
+        wait = float(request.query_params.get('wait') or 0)
+        if not math.isfinite(wait):
+            raise ValueError(wait)
+    except ValueError:
+        return Response({'error': 'since must be a cursor and wait a number of seconds'}, status=400)
+    wait = min(max(wait, 0), settings.FLIGHT_CHANGES_MAX_WAIT)
+
+    try:
+        if wait:
+            page = wait_for_changes(airport_id, since, wait)
+        else:
+            page = changes_since(airport_id, since)
+    except CursorExpired:
+        return Response({'error': 'Cursor expired; resync from /api/flights/flights/'}, status=410)
+    return Response(page)
 
 
 @login_required
@@ -44,26 +144,16 @@ def flights_list(request):
     if request.user.role != 'operator' or not request.user.airport_id:
         return render(request, "flights/operator/flights_list.html", {"flights": []})
 
-    today = timezone.now().date()
-    
-    cutoff_time = timezone.now() - timezone.timedelta(hours=1)
-    
-    from django.db.models import Prefetch
-    
-    flights = Flight.objects.filter(
-        origin_id=request.user.airport_id, 
-        scheduledDeparture__gte=cutoff_time
-    ).exclude(status__iexact='landed').exclude(status__iexact='cancelled').prefetch_related(
-        Prefetch('gateassignment_set', queryset=GateAssignment.objects.order_by('-assignedAt'), to_attr='latest_gates')
-    ).order_by("scheduledDeparture")
-    
-    destinations = Airport.objects.filter(
-        id__in=flights.values_list('destination_id', flat=True).distinct()
-    ).order_by('city')
+    from django.core.paginator import Paginator
+    from .services.operator_board import PAGE_SIZE, destinations_facet, upcoming_departures, with_latest_gate
+
+    airport_id = request.user.airport_id
+    flights = upcoming_departures(airport_id)
 
     search_query = request.GET.get('search')
     if search_query:
-        flights = flights.filter(flightNumber__icontains=search_query)
+        from .services.search import search_flights
+        flights = search_flights(flights, search_query, columns=('flight_number',))
 
     destination_id = request.GET.get('destination')
     if destination_id:
@@ -73,19 +163,26 @@ def flights_list(request):
     if date_filter:
         flights = flights.filter(scheduledDeparture__date=date_filter)
 
+    # The gate columns are only joined in for the rows on the requested page
+    paginator = Paginator(with_latest_gate(flights).order_by('scheduledDeparture', 'id'), PAGE_SIZE)
+    page = paginator.get_page(request.GET.get('page'))
+
+    filters = request.GET.copy()
+    filters.pop('page', None)
+
     from tickets.models import Ticket
     from tickets.forms import TicketForm
     
-    my_tickets = Ticket.objects.filter(createdBy=request.user).order_by('-createdAt')
+    my_tickets = Ticket.objects.filter(createdBy=request.user).order_by('-createdAt')[:RECENT_TICKETS_LIMIT]
     ticket_form = TicketForm()
 
-    total_flights_count = flights.count()
-
     return render(request, "flights/operator/flights_list.html", {
-        "flights": flights,
-        "total_flights_count": total_flights_count,
+        "flights": page.object_list,
+        "page_obj": page,
+        "filter_query": filters.urlencode(),
+        "total_flights_count": paginator.count,
         "search_query": search_query,
-        "destinations": destinations,
+        "destinations": destinations_facet(airport_id),
         "selected_destination": int(destination_id) if destination_id else None,
         "selected_date": date_filter,
         "my_tickets": my_tickets,
@@ -108,7 +205,7 @@ def edit_flight(request, pk):
          messages.error(request, "You do not have permission to edit this flight.")
          return redirect('operator_flights_list')
 
-    gate_assignment = GateAssignment.objects.filter(flight=flight).order_by('-assignedAt').first()
+    gate_assignment = flight.currentGate
 
     if request.method == 'POST':
         old_status = flight.status
@@ -135,15 +232,28 @@ def edit_flight(request, pk):
         boarding_close = request.POST.get('boardingCloseTime')
 
         if gate_code and terminal:
+            from .services.bulk_updates import BulkUpdateError, parse_time
+            try:
+                boarding_open, boarding_close = parse_time(boarding_open), parse_time(boarding_close)
+            except BulkUpdateError as e:
+                messages.error(request, str(e))
+                return redirect('operator_edit_flight', pk=flight.pk)
+
             GateAssignment.objects.create(
                 flight=flight,
                 gateCode=gate_code,
                 terminal=terminal,
-                boardingOpenTime=boarding_open if boarding_open else None, 
-                boardingCloseTime=boarding_close if boarding_close else None
+                boardingOpenTime=boarding_open, 
+                boardingCloseTime=boarding_close
             )
 
         messages.success(request, "Flight details updated successfully.")
+
+        from .services.gate_index import describe_conflicts, flight_conflicts
+        flight.refresh_from_db()
+        conflicts = flight_conflicts(flight)
+        if conflicts:
+            messages.warning(request, describe_conflicts(flight.currentGate.gateCode, conflicts))
         return redirect('operator_flights_list')
 
     return render(request, "flights/operator/edit_flight.html", {
@@ -152,6 +262,88 @@ def edit_flight(request, pk):
     })
 
 
+@login_required
+def gate_planner(request):
+    """
+    Propose gates for the airport's unassigned departures and commit the
+    rows the operator keeps.
+    Template: flights/operator/gate_planner.html
+    """
+    if request.user.role != 'operator' or not request.user.airport_id:
+        return redirect('public_home')
+
+    from .services import gate_planner as planner
+    from .services.bulk_updates import apply_gate_plan
+
+    airport_id = request.user.airport_id
+
+    if request.method == 'POST':
+        plan = planner.load_proposal(airport_id, request.POST.get('token', ''))
+        if plan is None:
+            messages.error(request, "This proposal has expired. Review the new one before committing.")
+            return redirect('operator_gate_planner')
+
+        selected = {int(pk) for pk in request.POST.getlist('flight_ids') if pk.isdigit()}
+        rows = [row for row in plan['assignments'] if row['flight_id'] in selected]
+        if not rows:
+            messages.error(request, "Select at least one proposed assignment.")
+            return redirect('operator_gate_planner')
+
+        result = apply_gate_plan(airport_id, rows)
+        messages.success(request, f"Assigned gates to {result['gate_assignments']} flights. Passengers are being notified.")
+        if result['skipped']:
+            messages.warning(request, "Skipped because their gate changed meanwhile: " + ", ".join(result['skipped']))
+        return redirect('operator_flights_list')
+
+    try:
+        horizon = min(max(int(request.GET.get('horizon', planner.HORIZON_HOURS)), 1), 72)
+    except ValueError:
+        horizon = planner.HORIZON_HOURS
+    extra_gates = request.GET.get('gates', '')
+
+    plan = planner.plan_gates(airport_id, horizon_hours=horizon, extra_gates=extra_gates)
+
+    return render(request, "flights/operator/gate_planner.html", {
+        "plan": plan,
+        "token": planner.save_proposal(airport_id, plan),
+        "gates": planner.airport_gates(airport_id, extra_gates),
+        "horizon": horizon,
+        "extra_gates": extra_gates,
+    })
+
+@login_required
+def gate_availability(request):
+    """
+    Whether a gate is free for a boarding window, for the edit form's live check.
+    ?gate=A12&open=<datetime>&close=<datetime>&flight=<id to ignore>
+    """
+    from django.http import JsonResponse
+    from .services.bulk_updates import BulkUpdateError, parse_time
+    from .services.gate_index import boarding_window, gate_conflicts
+
+    if request.user.role != 'operator' or not request.user.airport_id:
+        return JsonResponse({'error': 'Permission denied'}, status=403)
+
+    gate_code = request.GET.get('gate', '').strip()
+    try:
+        window = boarding_window(parse_time(request.GET.get('open')), parse_time(request.GET.get('close')))
+        exclude = int(request.GET['flight']) if request.GET.get('flight') else None
+    except (BulkUpdateError, ValueError) as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    if not gate_code or window is None:
+        return JsonResponse({'error': 'A gate and a boarding open time are required'}, status=400)
+
+    conflicts = gate_conflicts(request.user.airport_id, gate_code, *window, exclude_flight=exclude)
+    return JsonResponse({
+        'gate': gate_code,
+        'free': not conflicts,
+        'conflicts': [
+            {'flight_id': flight_id, 'flightNumber': number,
+             'start': timezone.localtime(start), 'end': timezone.localtime(end)}
+            for start, end, flight_id, number in conflicts
+        ],
+    })
+
 @login_required
 def passenger_list(request, pk):
     """
@@ -163,17 +355,184 @@ def passenger_list(request, pk):
     if request.user.role != 'operator' or flight.origin_id != request.user.airport_id:
          return redirect('operator_flights_list')
 
-    try:
-        from passengers.models import PassengerFlight
-        passenger_flights = PassengerFlight.objects.filter(flight=flight).select_related('passenger')
-    except ImportError:
-        passenger_flights = []
+    from django.core.paginator import Paginator
+    from passengers.models import PassengerFlight
+
+    passenger_flights = PassengerFlight.objects.filter(flight=flight).select_related('passenger').order_by('seatNumber', 'id')
+    page = Paginator(passenger_flights, MANIFEST_PAGE_SIZE).get_page(request.GET.get('page'))
 
     return render(request, "flights/operator/passenger_list.html", {
         "flight": flight,
-        "passenger_flights": passenger_flights,
+        "passenger_flights": page.object_list,
+        "page_obj": page,
+        "import_job": request.GET.get('import_job', ''),
     })
 
+@login_required
+def import_passenger_manifest(request, pk):
+    """
+    Upsert passengers onto a flight from an uploaded CSV, JSON or JSON Lines
+    manifest, then queue their booking confirmations as one background job.
+    """
+    flight = get_object_or_404(Flight, pk=pk)
+
+    if request.user.role != 'operator' or flight.origin_id != request.user.airport_id:
+         return redirect('operator_flights_list')
+
+    if request.method != 'POST' or not request.FILES.get('manifest'):
+        messages.error(request, "Choose a manifest file to import.")
+        return redirect('operator_passenger_list', pk=flight.pk)
+
+    from django.urls import reverse
+    from passengers.services.manifest_import import ManifestImportError, enqueue_confirmations, import_manifest
+
+    try:
+        summary = import_manifest(flight, request.FILES['manifest'])
+    except ManifestImportError as e:
+        messages.error(request, str(e))
+        return redirect('operator_passenger_list', pk=flight.pk)
+
+    job_id = enqueue_confirmations(flight, summary['booking_ids'])
+    messages.success(
+        request,
+        f"Imported {summary['rows']} rows: {summary['created']} new bookings, "
+        f"{summary['updated']} updated, {summary['skipped']} skipped."
+    )
+    for error in summary['errors']:
+        messages.warning(request, error)
+
+    url = reverse('operator_passenger_list', args=[flight.pk])
+    return redirect(f"{url}?import_job={job_id}" if job_id else url)
+
+@login_required
+def manifest_import_status(request, job_id):
+    """Progress of a manifest import's confirmation emails, polled by the manifest page."""
+    from django.http import JsonResponse
+    from passengers.services.manifest_import import get_progress
+
+    progress = get_progress(job_id)
+    if request.user.role != 'operator' or not progress or progress.get('airport_id') != request.user.airport_id:
+        return JsonResponse({'error': 'Not found'}, status=404)
+
+    return JsonResponse({key: progress[key] for key in ('status', 'total', 'sent', 'failed')})
+
+def _manifest_response(queryset, export_format, filename):
+    from django.http import StreamingHttpResponse
+    from .services.manifest import stream_csv, stream_json
+
+    if export_format == 'json':
+        response = StreamingHttpResponse(stream_json(queryset), content_type='application/json')
+        filename += '.json'
+    else:
+        response = StreamingHttpResponse(stream_csv(queryset), content_type='text/csv')
+        filename += '.csv'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+@login_required
+def export_passenger_manifest(request, pk):
+    """Stream one flight's manifest as CSV (default) or JSON (?format=json)."""
+    flight = get_object_or_404(Flight, pk=pk)
+
+    if request.user.role != 'operator' or flight.origin_id != request.user.airport_id:
+         return redirect('operator_flights_list')
+
+    from .services.manifest import manifest_queryset
+
+    filename = f"manifest_{flight.flightNumber}_{flight.scheduledDeparture:%Y%m%d}"
+    return _manifest_response(manifest_queryset(flight=flight), request.GET.get('format'), filename)
+
+@login_required
+def export_daily_manifest(request):
+    """Stream every booking on the airport's departures for one day (?date=YYYY-MM-DD, default today)."""
+    if request.user.role != 'operator' or not request.user.airport_id:
+         return redirect('public_home')
+
+    from django.http import HttpResponseBadRequest
+    from django.utils.dateparse import parse_date
+    from .services.manifest import manifest_queryset
+
+    day = timezone.localdate()
+    if request.GET.get('date'):
+        try:
+            # None for a malformed value, ValueError for an impossible day like 2024-02-30
+            day = parse_date(request.GET['date'])
+        except ValueError:
+            day = None
+        if day is None:
+            return HttpResponseBadRequest("Invalid date, expected YYYY-MM-DD.")
+    airport = get_object_or_404(Airport, id=request.user.airport_id)
+    queryset = manifest_queryset(flight__origin_id=airport.id, flight__scheduledDeparture__date=day)
+
+    return _manifest_response(queryset, request.GET.get('format'), f"manifest_{airport.code}_{day:%Y%m%d}")
+
+
+@login_required
+def bulk_update_flights(request):
+    """
+    Apply one status and/or gate change to many flights at once.
+    Accepts the operator list's form POST, or a JSON body:
+    {"flight_ids": [...], "status": "...", "gate": {"gateCode": ..., "terminal": ...}}
+    """
+    import json
+    from django.http import JsonResponse
+    from .services.bulk_updates import BulkUpdateError, apply_flight_updates
+
+    if request.user.role != 'operator' or not request.user.airport_id:
+        messages.error(request, "Permission denied")
+        return redirect('public_home')
+
+    if request.method != 'POST':
+        return redirect('operator_flights_list')
+
+    wants_json = request.content_type == 'application/json'
+    if wants_json:
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return JsonResponse({'error': 'Invalid JSON body'}, status=400)
+        if not isinstance(data, dict):
+            return JsonResponse({'error': 'The JSON body must be an object'}, status=400)
+        flight_ids = data.get('flight_ids') or []
+        status = data.get('status')
+        gate = data.get('gate')
+        if (not isinstance(flight_ids, list) or not isinstance(status, (str, type(None)))
+                or not isinstance(gate, (dict, type(None)))):
+            return JsonResponse(
+                {'error': 'flight_ids must be a list, status a string and gate an object'}, status=400
+            )
+    else:
+        flight_ids = request.POST.getlist('flight_ids')
+        status = request.POST.get('status')
+        gate = None
+        if request.POST.get('gateCode') or request.POST.get('terminal'):
+            gate = {
+                'gateCode': request.POST.get('gateCode'),
+                'terminal': request.POST.get('terminal'),
+                'boardingOpenTime': request.POST.get('boardingOpenTime'),
+                'boardingCloseTime': request.POST.get('boardingCloseTime'),
+            }
+
+    try:
+        flight_ids = [int(pk) for pk in flight_ids]
+        result = apply_flight_updates(request.user.airport_id, flight_ids, status=status, gate=gate)
+    except (BulkUpdateError, ValueError, TypeError) as e:
+        if wants_json:
+            return JsonResponse({'error': str(e)}, status=400)
+        messages.error(request, str(e))
+        return redirect('operator_flights_list')
+
+    if wants_json:
+        return JsonResponse(result)
+    messages.success(
+        request,
+        f"Updated {result['flights']} flights: {result['status_changes']} status changes, "
+        f"{result['gate_assignments']} gate assignments. Passengers are being notified."
+    )
+    for warning in result['gate_conflicts']:
+        messages.warning(request, warning)
+    return redirect('operator_flights_list')
+
 @login_required
 def fetch_flights(request):
     """
@@ -0,0 +1,113 @@
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from airports.models import Airport
+from flights.models import Flight, FlightStatusHistory
+from passengers.models import Passenger, PassengerFlight
+from notifications.services.smtp_sink import SMTPSink
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a flight with N passengers, trigger the flight_status_changed "
+        "notification path against a local SMTP sink and report throughput."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--passengers', type=int, default=200)
+        parser.add_argument('--latency', type=float, default=0.0,
+                            help="Seconds the sink waits before acknowledging each message.")
+        parser.add_argument('--failure-rate', type=float, default=0.0,
+                            help="Fraction of messages the sink rejects (0..1).")
+        parser.add_argument('--rate-limit', type=float, default=None,
+                            help="Email sends per second for this run. Unlimited by default, so the "
+                                 "result is not capped by NOTIFICATION_CHANNEL_LIMITS.")
+        parser.add_argument('--keep', action='store_true',
+                            help="Keep the seeded rows instead of rolling them back.")
+
+    def handle(self, *args, **options):
+        count = options['passengers']
+        rate_limit = options['rate_limit']
+        channel_limits = dict(settings.NOTIFICATION_CHANNEL_LIMITS)
+        # rate_per_second=None turns the email limiter off for this run
+        channel_limits['email'] = dict(channel_limits['email'], rate_per_second=rate_limit or None)
+
+        with SMTPSink(latency=options['latency'], failure_rate=options['failure_rate'], seed=1) as sink:
+            mail_settings = override_settings(
+                EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+                EMAIL_HOST=sink.host,
+                EMAIL_PORT=sink.port,
+                EMAIL_USE_TLS=False,
+                EMAIL_USE_SSL=False,
+                EMAIL_HOST_USER='',
+                EMAIL_HOST_PASSWORD='',
+                DEFAULT_FROM_EMAIL='bench@rassid.local',
+                NOTIFICATION_CHANNEL_LIMITS=channel_limits,
+            )
+            with mail_settings, transaction.atomic():
+                flight = self.seed(count)
+
+                started = time.perf_counter()
+                FlightStatusHistory.objects.create(flight=flight, oldStatus='scheduled', newStatus='Delayed')
+                elapsed = time.perf_counter() - started
+
+                if not options['keep']:
+                    transaction.set_rollback(True)
+
+        latencies = [(m['finished'] - m['started']) * 1000 for m in sink.messages]
+        accepted = len(sink.accepted)
+
+        self.stdout.write(f"Passengers:        {count}")
+        self.stdout.write(f"Rate limit:        {f'{rate_limit:g} msg/s' if rate_limit else 'off'}")
+        self.stdout.write(f"Messages accepted: {accepted} / {len(sink.messages)}")
+        self.stdout.write(f"Elapsed:           {elapsed:.3f}s")
+        self.stdout.write(f"Throughput:        {len(sink.messages) / elapsed if elapsed else 0:.1f} msg/s")
+        self.stdout.write(f"Latency p50:       {percentile(latencies, 50):.2f} ms")
+        self.stdout.write(f"Latency p99:       {percentile(latencies, 99):.2f} ms")
+
+    def seed(self, count):
+        origin, _ = Airport.objects.get_or_create(code='BN1', defaults={'name': 'Benchmark Origin', 'city': 'Bench'})
+        destination, _ = Airport.objects.get_or_create(code='BN2', defaults={'name': 'Benchmark Destination', 'city': 'Bench'})
+        now = timezone.now()
+        run_id = uuid.uuid4().hex[:8]
+
+        flight = Flight.objects.create(
+            flightNumber=f"BN{run_id[:4].upper()}",
+            status='scheduled',
+            scheduledDeparture=now + timedelta(hours=3),
+            scheduledArrival=now + timedelta(hours=5),
+            airlineCode='BN',
+            origin=origin,
+            destination=destination,
+        )
+
+        passengers = Passenger.objects.bulk_create([
+            Passenger(
+                fullName=f"Bench Passenger {i}",
+                email=f"bench-{run_id}-{i}@rassid.local",
+                phone="",
+                preferredLanguage='ar' if i % 2 else 'en',
+            )
+            for i in range(count)
+        ])
+        # bulk_create skips post_save, so no booking confirmations are sent here
+        PassengerFlight.objects.bulk_create([
+            PassengerFlight(passenger=p, flight=flight, seatNumber=f"{i % 30 + 1}A", bookingRef=run_id, ticketStatus="Checked-in")
+            for i, p in enumerate(passengers)
+        ])
+        return flight
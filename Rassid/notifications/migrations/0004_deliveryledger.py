@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_alter_emaillog_id_alter_notification_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeliveryLedger',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recipient', models.CharField(max_length=254)),
+                ('channel', models.CharField(max_length=10)),
+                ('scope', models.CharField(blank=True, default='', max_length=40)),
+                ('contentHash', models.CharField(max_length=40)),
+                ('createdAt', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['recipient', 'contentHash'], name='notificatio_recipie_2acb6d_idx'), models.Index(fields=['recipient', 'createdAt'], name='notificatio_recipie_613054_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:30
+
+import django.db.models.deletion
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_daily_stats(apps, schema_editor):
+    EmailLog = apps.get_model('notifications', 'EmailLog')
+    Notification = apps.get_model('notifications', 'Notification')
+    NotificationDailyStat = apps.get_model('notifications', 'NotificationDailyStat')
+
+    counts = defaultdict(lambda: [0, 0])
+
+    # Admin emails (EmailLog) and passenger notifications are counted under
+    # separate recipient dimensions, as notifications.services.rollups does
+    def add(sent_at, recipient_dimension, recipient, airport_id, channel, status):
+        if status not in ('Sent', 'Failed'):
+            return
+        day = timezone.localdate(sent_at)
+        column = 0 if status == 'Sent' else 1
+        for dimension, key in ((recipient_dimension, recipient), ('airport', airport_id), ('channel', channel)):
+            if key not in (None, ''):
+                counts[(day, dimension, str(key))][column] += 1
+
+    for sent_at, recipient, status in EmailLog.objects.values_list('sent_at', 'recipient', 'status').iterator():
+        add(sent_at, 'email_log', recipient, None, 'email', status)
+
+    rows = Notification.objects.values_list(
+        'sentAt', 'channel', 'status', 'passengerFlight__passenger__email',
+        'passengerFlight__passenger__phone', 'passengerFlight__flight__origin_id'
+    )
+    for sent_at, channel, status, email, phone, airport_id in rows.iterator():
+        add(sent_at, 'recipient', phone if channel == 'sms' else email, airport_id, channel, status)
+
+    NotificationDailyStat.objects.bulk_create([
+        NotificationDailyStat(day=day, dimension=dimension, key=key, sent=sent, failed=failed)
+        for (day, dimension, key), (sent, failed) in counts.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airports', '0006_alter_airport_id_alter_airportsubscription_id_and_more'),
+        ('notifications', '0004_deliveryledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationDailyStat',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('dimension', models.CharField(max_length=20)),
+                ('key', models.CharField(max_length=254)),
+                ('sent', models.PositiveIntegerField(default=0)),
+                ('failed', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='emaillog',
+            name='airport',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='airports.airport'),
+        ),
+        migrations.AddIndex(
+            model_name='emaillog',
+            index=models.Index(fields=['recipient', '-sent_at'], name='notificatio_recipie_dbf31c_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='notificationdailystat',
+            constraint=models.UniqueConstraint(fields=('dimension', 'key', 'day'), name='unique_notification_daily_stat'),
+        ),
+        migrations.RunPython(backfill_daily_stats, migrations.RunPython.noop),
+    ]
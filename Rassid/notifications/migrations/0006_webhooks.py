@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:55
+
+import django.core.serializers.json
+import django.db.models.deletion
+import django.utils.timezone
+import notifications.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airports', '0006_alter_airport_id_alter_airportsubscription_id_and_more'),
+        ('notifications', '0005_notificationdailystat'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebhookSubscription',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=500)),
+                ('secret', models.CharField(default=notifications.models.webhook_secret, max_length=64)),
+                ('events', models.JSONField(default=notifications.models.all_webhook_events)),
+                ('isActive', models.BooleanField(default=True)),
+                ('lastChangeId', models.BigIntegerField(default=0)),
+                ('createdAt', models.DateTimeField(auto_now_add=True)),
+                ('airport', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='webhooks', to='airports.airport')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='WebhookDelivery',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('payload', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('firstChangeId', models.BigIntegerField()),
+                ('lastChangeId', models.BigIntegerField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('responseCode', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('nextAttemptAt', models.DateTimeField(default=django.utils.timezone.now)),
+                ('createdAt', models.DateTimeField(auto_now_add=True)),
+                ('deliveredAt', models.DateTimeField(blank=True, null=True)),
+                ('subscription', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deliveries', to='notifications.webhooksubscription')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'nextAttemptAt'], name='webhook_delivery_due_idx')],
+            },
+        ),
+    ]
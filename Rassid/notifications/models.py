@@ -1,5 +1,10 @@
+import secrets
+
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.utils import timezone
 from passengers.models import PassengerFlight
+from airports.models import Airport
 
 class Notification(models.Model):
     passengerFlight = models.ForeignKey(PassengerFlight, on_delete=models.CASCADE)
@@ -21,6 +26,108 @@ class EmailLog(models.Model):
     
     error_message = models.TextField(blank=True, null=True)
     sent_at = models.DateTimeField(auto_now_add=True)
+    airport = models.ForeignKey(Airport, on_delete=models.SET_NULL, null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['recipient', '-sent_at']),
+        ]
 
     def __str__(self):
-        return f"{self.subject} -> {self.recipient} ({self.status})"
\ No newline at end of file
+        return f"{self.subject} -> {self.recipient} ({self.status})"
+
+class DeliveryLedger(models.Model):
+    """
+    Compact record of what was sent to whom, used to drop a repeat of the
+    last message sent about the same scope (flight) and to count sends
+    inside the per-recipient rate-limit window.
+    """
+    recipient = models.CharField(max_length=254)
+    channel = models.CharField(max_length=10)
+    scope = models.CharField(max_length=40, blank=True, default='')
+    contentHash = models.CharField(max_length=40)
+    createdAt = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['recipient', 'contentHash']),
+            models.Index(fields=['recipient', 'createdAt']),
+        ]
+
+
+class NotificationDailyStat(models.Model):
+    """
+    Sent/failed counters per day, maintained incrementally whenever an
+    EmailLog or Notification is written. dimension is one of
+    'recipient' (passenger notifications), 'email_log' (admin emails),
+    'airport' or 'channel' and key is the matching value.
+    """
+    day = models.DateField()
+    dimension = models.CharField(max_length=20)
+    key = models.CharField(max_length=254)
+    sent = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['dimension', 'key', 'day'], name='unique_notification_daily_stat'),
+        ]
+
+
+def webhook_secret():
+    return secrets.token_hex(32)
+
+
+def all_webhook_events():
+    return [kind for kind, _ in WebhookSubscription.EVENT_CHOICES]
+
+
+class WebhookSubscription(models.Model):
+    """
+    An airport's endpoint for pushed flight changes. lastChangeId is the
+    FlightChange cursor up to which changes have been batched into deliveries.
+    """
+    EVENT_CHOICES = (
+        ('flight', 'Flight updated'),
+        ('status', 'Status changed'),
+        ('gate', 'Gate assigned'),
+        ('delete', 'Flight removed'),
+    )
+    airport = models.ForeignKey(Airport, on_delete=models.CASCADE, related_name='webhooks')
+    url = models.URLField(max_length=500)
+    secret = models.CharField(max_length=64, default=webhook_secret)
+    events = models.JSONField(default=all_webhook_events)
+    isActive = models.BooleanField(default=True)
+    lastChangeId = models.BigIntegerField(default=0)
+    createdAt = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.airport} -> {self.url}"
+
+
+class WebhookDelivery(models.Model):
+    """
+    One signed batch of a subscription's changes, covering change ids
+    firstChangeId..lastChangeId, and the outcome of its latest attempt.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+    subscription = models.ForeignKey(WebhookSubscription, on_delete=models.CASCADE, related_name='deliveries')
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    firstChangeId = models.BigIntegerField()
+    lastChangeId = models.BigIntegerField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    responseCode = models.PositiveSmallIntegerField(null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+    nextAttemptAt = models.DateTimeField(default=timezone.now)
+    createdAt = models.DateTimeField(auto_now_add=True)
+    deliveredAt = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'nextAttemptAt'], name='webhook_delivery_due_idx'),
+        ]
@@ -1,20 +1,38 @@
 from rest_framework import serializers
-from .models import Notification
+from common.serializers import SparseFieldsMixin
+from .models import Notification, EmailLog, WebhookSubscription, WebhookDelivery
 
 class NotificationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Notification
-        fields = "__all__"
+        fields = '__all__'
 
-from rest_framework import serializers
-from .models import Notification, EmailLog
+class EmailLogSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    class Meta:
+        model = EmailLog
+        fields = '__all__'
 
-class NotificationSerializer(serializers.ModelSerializer):
+class WebhookSubscriptionSerializer(serializers.ModelSerializer):
     class Meta:
-        model = Notification
+        model = WebhookSubscription
         fields = '__all__'
+        read_only_fields = ('secret', 'lastChangeId', 'createdAt')
+
+    def validate_events(self, value):
+        kinds = {kind for kind, _ in WebhookSubscription.EVENT_CHOICES}
+        if not isinstance(value, list) or not value or not set(value) <= kinds:
+            raise serializers.ValidationError(f"Choose one or more of: {', '.join(sorted(kinds))}.")
+        return sorted(set(value))
+
+    def validate_url(self, value):
+        from .services.webhooks import check_url
+        try:
+            check_url(value)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+        return value
 
-class EmailLogSerializer(serializers.ModelSerializer):
+class WebhookDeliverySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
-        model = EmailLog
-        fields = '__all__'
\ No newline at end of file
+        model = WebhookDelivery
+        fields = '__all__'
@@ -0,0 +1,105 @@
+import requests
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+
+
+class BaseBackend:
+    """
+    A channel backend sends one batch of OutgoingMessage objects per call
+    and returns a list of (message, error) pairs, error being None on success.
+    """
+    channel = None
+
+    def send_batch(self, messages):
+        raise NotImplementedError
+
+
+class EmailBackend(BaseBackend):
+    """
+    Sends through Django's configured EMAIL_BACKEND, reusing a single
+    connection (one SMTP session) for the whole batch.
+    """
+    channel = 'email'
+
+    def send_batch(self, messages):
+        results = []
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+            for message in messages:
+                email = EmailMultiAlternatives(
+                    message.subject,
+                    message.body,
+                    settings.DEFAULT_FROM_EMAIL,
+                    [message.recipient],
+                    connection=connection,
+                )
+                if message.html:
+                    email.attach_alternative(message.html, "text/html")
+                try:
+                    email.send()
+                    results.append((message, None))
+                except Exception as e:
+                    results.append((message, str(e)))
+        finally:
+            connection.close()
+        return results
+
+
+class LocalEmailBackend(BaseBackend):
+    """Local stand-in: keeps emails in memory instead of sending them."""
+    channel = 'email'
+    outbox = []
+
+    def send_batch(self, messages):
+        for message in messages:
+            print(f"[local email] {message.recipient}: {message.subject}")
+        self.outbox.extend(messages)
+        return [(message, None) for message in messages]
+
+
+class HttpSMSBackend(BaseBackend):
+    """
+    Generic HTTP SMS gateway. Posts the whole batch in one request to
+    SMS_API_URL and expects {"results": [{"error": null | "..."}, ...]}
+    in the same order as the submitted messages.
+    """
+    channel = 'sms'
+    session = requests.Session()
+
+    def send_batch(self, messages):
+        payload = {
+            "sender": settings.SMS_SENDER_ID,
+            "messages": [{"to": m.recipient, "body": m.body} for m in messages],
+        }
+        try:
+            response = self.session.post(
+                settings.SMS_API_URL,
+                json=payload,
+                headers={"Authorization": f"Bearer {settings.SMS_API_KEY}"},
+                timeout=10,
+            )
+            response.raise_for_status()
+            results = response.json().get("results", [])
+        except (requests.RequestException, ValueError) as e:
+            return [(message, str(e)) for message in messages]
+
+        pairs = []
+        for index, message in enumerate(messages):
+            if index < len(results):
+                pairs.append((message, results[index].get("error")))
+            else:
+                pairs.append((message, "No result returned by SMS provider"))
+        return pairs
+
+
+class LocalSMSBackend(BaseBackend):
+    """Local stand-in: keeps SMS messages in memory instead of sending them."""
+    channel = 'sms'
+    outbox = []
+
+    def send_batch(self, messages):
+        for message in messages:
+            print(f"[local sms] {message.recipient}: {message.body}")
+        self.outbox.extend(messages)
+        return [(message, None) for message in messages]
@@ -0,0 +1,117 @@
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from notifications.models import Notification
+from notifications.services.rollups import record_deliveries
+
+
+class OutgoingMessage:
+    def __init__(self, passenger_flight, channel, recipient, subject, body, html=None, airport_id=None):
+        self.passenger_flight = passenger_flight
+        self.airport_id = airport_id
+        self.channel = channel
+        self.recipient = recipient
+        self.subject = subject
+        self.body = body
+        self.html = html
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every dispatch in this process for one channel.
+    wait(n) blocks until n sends are allowed under rate_per_second.
+    """
+    def __init__(self, rate_per_second, capacity):
+        self.rate = float(rate_per_second)
+        self.capacity = float(max(capacity, 1))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self, n):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= n
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0
+        if delay > 0:
+            time.sleep(delay)
+
+
+_backends = {}
+_limiters = {}
+
+
+def get_channel_limits(channel):
+    return settings.NOTIFICATION_CHANNEL_LIMITS.get(channel, {'batch_size': 50, 'rate_per_second': 10})
+
+
+def get_backend(channel):
+    if channel not in _backends:
+        _backends[channel] = import_string(settings.NOTIFICATION_BACKENDS[channel])()
+    return _backends[channel]
+
+
+def get_rate_limiter(channel):
+    """
+    The channel's shared limiter, or None when its rate_per_second is None.
+    Limiters are kept per configured limit, so overriding
+    NOTIFICATION_CHANNEL_LIMITS takes effect on the next dispatch.
+    """
+    limits = get_channel_limits(channel)
+    if limits['rate_per_second'] is None:
+        return None
+    key = (channel, limits['rate_per_second'], limits['batch_size'])
+    if key not in _limiters:
+        _limiters[key] = RateLimiter(limits['rate_per_second'], limits['batch_size'])
+    return _limiters[key]
+
+
+def dispatch(messages):
+    """
+    Send messages through their channel backend, one provider call per batch,
+    and record every attempt as a Notification row.
+    Returns the list of created Notification objects.
+    """
+    by_channel = defaultdict(list)
+    for message in messages:
+        by_channel[message.channel].append(message)
+
+    records = []
+    attempts = []
+    for channel, channel_messages in by_channel.items():
+        backend = get_backend(channel)
+        limiter = get_rate_limiter(channel)
+        batch_size = get_channel_limits(channel)['batch_size']
+
+        for start in range(0, len(channel_messages), batch_size):
+            batch = channel_messages[start:start + batch_size]
+            if limiter:
+                limiter.wait(len(batch))
+            try:
+                results = backend.send_batch(batch)
+            except Exception as e:
+                results = [(message, str(e)) for message in batch]
+
+            for message, error in results:
+                attempts.append((None, message.recipient, message.airport_id, channel, 'Failed' if error else 'Sent'))
+                records.append(Notification(
+                    passengerFlight=message.passenger_flight,
+                    channel=channel,
+                    content=message.body,
+                    status='Failed' if error else 'Sent',
+                    errorMessage=error,
+                ))
+
+        failed = sum(1 for r in records if r.channel == channel and r.status == 'Failed')
+        print(f"Dispatched {len(channel_messages)} {channel} notifications ({failed} failed).")
+
+    if records:
+        Notification.objects.bulk_create(records)
+        record_deliveries(attempts)
+    return records
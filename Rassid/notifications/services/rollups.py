@@ -0,0 +1,78 @@
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from notifications.models import NotificationDailyStat
+
+
+def record_deliveries(entries, recipient_dimension='recipient'):
+    """
+    Fold delivery attempts into the daily rollup.
+    entries: iterable of (sent_at, recipient, airport_id, channel, status).
+    Passenger notifications count under 'recipient'; admin emails from
+    EmailLog pass recipient_dimension='email_log' so the two never mix.
+    """
+    deltas = defaultdict(lambda: [0, 0])
+    for sent_at, recipient, airport_id, channel, status in entries:
+        if status not in ('Sent', 'Failed'):
+            continue
+        day = timezone.localdate(sent_at) if sent_at else timezone.localdate()
+        column = 0 if status == 'Sent' else 1
+        for dimension, key in ((recipient_dimension, recipient), ('airport', airport_id), ('channel', channel)):
+            if key in (None, ''):
+                continue
+            deltas[(day, dimension, str(key))][column] += 1
+
+    if not deltas:
+        return
+
+    try:
+        _apply_deltas(deltas)
+    except IntegrityError:
+        # Another writer created one of the rows first; the retry will update it
+        _apply_deltas(deltas)
+
+
+def _apply_deltas(deltas):
+    days = {day for day, _, _ in deltas}
+    keys = {key for _, _, key in deltas}
+
+    with transaction.atomic():
+        existing = {
+            (row.day, row.dimension, row.key): row
+            for row in NotificationDailyStat.objects.select_for_update().filter(day__in=days, key__in=keys)
+        }
+
+        to_update, to_create = [], []
+        for (day, dimension, key), (sent, failed) in deltas.items():
+            row = existing.get((day, dimension, key))
+            if row:
+                row.sent += sent
+                row.failed += failed
+                to_update.append(row)
+            else:
+                to_create.append(NotificationDailyStat(day=day, dimension=dimension, key=key, sent=sent, failed=failed))
+
+        if to_update:
+            NotificationDailyStat.objects.bulk_update(to_update, ['sent', 'failed'])
+        if to_create:
+            NotificationDailyStat.objects.bulk_create(to_create)
+
+
+def delivery_totals(dimension, key, since=None):
+    """Return (sent, failed) for one dimension key, optionally from a start day."""
+    rows = NotificationDailyStat.objects.filter(dimension=dimension, key=str(key))
+    if since:
+        rows = rows.filter(day__gte=since)
+    totals = rows.aggregate(sent=Sum('sent'), failed=Sum('failed'))
+    return totals['sent'] or 0, totals['failed'] or 0
+
+
+def daily_series(dimension, key, start, end):
+    """Return {day: (sent, failed)} for every rollup row between start and end."""
+    rows = NotificationDailyStat.objects.filter(
+        dimension=dimension, key=str(key), day__range=(start, end)
+    ).values_list('day', 'sent', 'failed')
+    return {day: (sent, failed) for day, sent, failed in rows}
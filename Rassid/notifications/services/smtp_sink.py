@@ -0,0 +1,123 @@
+import asyncio
+import random
+import threading
+import time
+
+
+class SMTPSink:
+    """
+    In-process SMTP server that accepts and discards mail, for local runs and
+    benchmarks. Runs an asyncio loop in a background thread.
+
+    latency: seconds to wait before answering each DATA command.
+    failure_rate: fraction (0..1) of messages answered with a 451 error.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, failure_rate=0.0, seed=None):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.messages = []
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout=5)
+        return self
+
+    def stop(self):
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def accepted(self):
+        return [m for m in self.messages if m['accepted']]
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle, self.host, self.port)
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._server.close()
+            self._loop.run_until_complete(self._server.wait_closed())
+            self._loop.close()
+
+    async def _handle(self, reader, writer):
+        def reply(line):
+            writer.write(f"{line}\r\n".encode())
+
+        reply("220 rassid-sink ESMTP")
+        envelope = None
+        try:
+            while True:
+                await writer.drain()
+                raw = await reader.readline()
+                if not raw:
+                    break
+                command = raw.decode(errors='replace').strip()
+                verb = command[:4].upper()
+
+                if verb == 'EHLO':
+                    reply("250-rassid-sink")
+                    reply("250-8BITMIME")
+                    reply("250 PIPELINING")
+                elif verb == 'HELO':
+                    reply("250 rassid-sink")
+                elif verb == 'MAIL':
+                    envelope = {'mail_from': command[10:].strip(), 'rcpt_to': [], 'started': time.perf_counter()}
+                    reply("250 OK")
+                elif verb == 'RCPT':
+                    if envelope is not None:
+                        envelope['rcpt_to'].append(command[8:].strip())
+                    reply("250 OK")
+                elif verb == 'DATA':
+                    reply("354 End data with <CR><LF>.<CR><LF>")
+                    await writer.drain()
+                    size = 0
+                    while True:
+                        line = await reader.readline()
+                        if not line or line in (b".\r\n", b".\n"):
+                            break
+                        size += len(line)
+                    if self.latency:
+                        await asyncio.sleep(self.latency)
+                    accepted = self.random.random() >= self.failure_rate
+                    if envelope is not None:
+                        envelope.update(size=size, accepted=accepted, finished=time.perf_counter())
+                        self.messages.append(envelope)
+                        envelope = None
+                    reply("250 OK queued" if accepted else "451 4.3.0 Injected failure")
+                elif verb == 'RSET':
+                    envelope = None
+                    reply("250 OK")
+                elif verb == 'NOOP':
+                    reply("250 OK")
+                elif verb == 'QUIT':
+                    reply("221 Bye")
+                    await writer.drain()
+                    break
+                else:
+                    reply("502 Command not implemented")
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,127 @@
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from notifications.models import DeliveryLedger
+
+
+def content_hash(*parts):
+    return hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+
+
+def _key(prefix, channel, recipient, digest=""):
+    return f"notif:{prefix}:{channel}:{content_hash(recipient, digest)}"
+
+
+class NotificationThrottle:
+    """
+    Per-recipient dedupe and sliding-window rate limit.
+
+    A message is a duplicate only when it repeats the last content sent to
+    the same recipient and channel about the same scope (a flight), so a
+    change that is later reverted (gate A -> B -> A) is still announced.
+
+    The cache answers the hot path; the DeliveryLedger table is the durable
+    fallback when cache entries are missing (restart, eviction, another worker).
+    """
+
+    def __init__(self):
+        limits = settings.NOTIFICATION_RATE_LIMIT
+        self.dedupe_ttl = settings.NOTIFICATION_DEDUPE_TTL
+        self.max_messages = limits['max_messages']
+        self.window = limits['window_seconds']
+
+    def partition(self, candidates, digest, scope=''):
+        """
+        candidates: list of (item, channel, recipient) sharing the same content digest.
+        Returns (allowed, deferred) lists of candidates; repeats of the last
+        message about scope are dropped.
+        """
+        if not candidates:
+            return [], []
+
+        scope = str(scope)
+        now = timezone.now()
+        last_keys = {c: _key("last", c[1], c[2], scope) for c in candidates}
+        window_keys = {c: _key("window", c[1], c[2]) for c in candidates}
+
+        last_sent = cache.get_many(list(last_keys.values()))
+        windows = cache.get_many(list(window_keys.values()))
+
+        missing_recipients = {
+            c[2] for c in candidates
+            if last_keys[c] not in last_sent or window_keys[c] not in windows
+        }
+        ledger_last, ledger_times = self._load_ledger(missing_recipients, scope, now)
+
+        allowed, deferred = [], []
+        window_start = (now - timedelta(seconds=self.window)).timestamp()
+        new_last, new_windows, ledger_rows = {}, {}, []
+
+        for candidate in candidates:
+            item, channel, recipient = candidate
+            last_key, window_key = last_keys[candidate], window_keys[candidate]
+
+            if last_key in new_last:
+                previous = new_last[last_key]
+            elif last_key in last_sent:
+                previous = last_sent[last_key]
+            else:
+                previous = ledger_last.get((recipient, channel))
+            if previous == digest:
+                continue
+
+            if window_key in new_windows:
+                stamps = new_windows[window_key]
+            else:
+                stamps = windows.get(window_key, ledger_times.get((recipient, channel), []))
+            stamps = [s for s in stamps if s > window_start]
+
+            # Deferred messages go out in the digest, so they count as the last content too
+            new_last[last_key] = digest
+            if len(stamps) >= self.max_messages:
+                new_windows[window_key] = stamps
+                deferred.append(candidate)
+                continue
+
+            stamps.append(now.timestamp())
+            new_windows[window_key] = stamps
+            allowed.append(candidate)
+            ledger_rows.append(DeliveryLedger(recipient=recipient, channel=channel, scope=scope, contentHash=digest))
+
+        cache.set_many(new_last, self.dedupe_ttl)
+        cache.set_many(new_windows, self.window)
+        if ledger_rows:
+            DeliveryLedger.objects.bulk_create(ledger_rows)
+        return allowed, deferred
+
+    def _load_ledger(self, recipients, scope, now):
+        """({(recipient, channel): hash of the latest send about scope}, {(recipient, channel): send times})"""
+        last, times = {}, {}
+        if not recipients:
+            return last, times
+
+        since = now - timedelta(seconds=max(self.dedupe_ttl, self.window))
+        window_start = now - timedelta(seconds=self.window)
+        dedupe_start = now - timedelta(seconds=self.dedupe_ttl)
+        rows = DeliveryLedger.objects.filter(
+            recipient__in=recipients, createdAt__gte=since
+        ).order_by('createdAt', 'id').values_list('recipient', 'channel', 'scope', 'contentHash', 'createdAt')
+
+        for recipient, channel, row_scope, row_hash, created_at in rows:
+            if row_scope == scope and created_at >= dedupe_start:
+                last[(recipient, channel)] = row_hash
+            if created_at >= window_start:
+                times.setdefault((recipient, channel), []).append(created_at.timestamp())
+        return last, times
+
+
+def compact_ledger():
+    """Delete ledger rows that no longer affect dedupe or rate limiting."""
+    horizon = max(settings.NOTIFICATION_DEDUPE_TTL, settings.NOTIFICATION_RATE_LIMIT['window_seconds'])
+    cutoff = timezone.now() - timedelta(seconds=horizon)
+    deleted, _ = DeliveryLedger.objects.filter(createdAt__lt=cutoff).delete()
+    return deleted
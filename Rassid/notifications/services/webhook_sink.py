@@ -0,0 +1,75 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class WebhookSink:
+    """
+    Local stand-in for an airport's webhook endpoint, for tests and offline
+    development. Records every POST and the most requests it saw in flight.
+
+    statuses: response codes to answer with, in order; the last one repeats.
+    latency: seconds to wait before answering each request.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, statuses=(200,), latency=0.0):
+        self.statuses = list(statuses)
+        self.latency = latency
+        self.requests = []
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        sink = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                with sink._lock:
+                    sink._in_flight += 1
+                    sink.max_in_flight = max(sink.max_in_flight, sink._in_flight)
+                    status = sink.statuses[min(len(sink.requests), len(sink.statuses) - 1)]
+                    sink.requests.append({'path': self.path, 'headers': dict(self.headers), 'body': body, 'status': status})
+                try:
+                    if sink.latency:
+                        time.sleep(sink.latency)
+                    reply = b'ok' if status < 300 else b'unavailable'
+                    self.send_response(status)
+                    self.send_header('Content-Length', str(len(reply)))
+                    self.end_headers()
+                    self.wfile.write(reply)
+                finally:
+                    with sink._lock:
+                        sink._in_flight -= 1
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.host, self.port = self.server.server_address[:2]
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/hooks/rassid"
+
+    def payloads(self):
+        return [json.loads(r['body']) for r in self.requests if r['status'] < 300]
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
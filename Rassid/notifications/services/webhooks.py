@@ -0,0 +1,261 @@
+import hashlib
+import hmac
+import ipaddress
+import json
+import socket
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import F, Min
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+
+from flights.services.changes import CursorExpired, changes_since, current_cursor
+from notifications.models import WebhookDelivery, WebhookSubscription
+
+SIGNATURE_HEADER = 'X-Rassid-Signature'
+# Batches collected for one subscription per run, so a large backlog is
+# spread over several runs instead of one long transaction
+MAX_BATCHES_PER_RUN = 20
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _config():
+    return settings.WEBHOOKS
+
+
+def get_session():
+    """One pooled HTTP session for webhook endpoints, shared by the delivery workers."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                size = _config()['workers']
+                session = requests.Session()
+                session.mount('https://', HTTPAdapter(pool_connections=size, pool_maxsize=size))
+                session.mount('http://', HTTPAdapter(pool_connections=size, pool_maxsize=size))
+                _session = session
+    return _session
+
+
+def check_url(url):
+    """
+    Raise ValueError unless url is https and every address its host resolves
+    to is public, so subscriptions cannot reach internal services.
+    WEBHOOKS['allow_private_targets'] lifts both rules for local development.
+    """
+    parts = urlsplit(url)
+    if _config().get('allow_private_targets'):
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ValueError("Enter an http or https URL.")
+        return
+    if parts.scheme != 'https' or not parts.hostname:
+        raise ValueError("Webhook URLs must use https.")
+    try:
+        infos = socket.getaddrinfo(parts.hostname, parts.port or 443, proto=socket.IPPROTO_TCP)
+    except (socket.gaierror, UnicodeError):
+        raise ValueError(f"Could not resolve {parts.hostname}.")
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split('%')[0])
+        if address.version == 6 and address.ipv4_mapped:
+            address = address.ipv4_mapped
+        if not address.is_global or address.is_multicast:
+            raise ValueError(f"{parts.hostname} resolves to a private or reserved address.")
+
+
+def sign(secret, timestamp, body):
+    """
+    Signature header value for body: t=<unix time>,v1=<hex HMAC-SHA256 of
+    "<t>.<body>" keyed with the subscription secret>.
+    """
+    digest = hmac.new(secret.encode(), f"{timestamp}.".encode() + body, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={digest}"
+
+
+def verify(secret, header, body, tolerance=300):
+    """Receiver-side check of a signature header, rejecting stale timestamps."""
+    try:
+        parts = dict(item.split('=', 1) for item in header.split(','))
+        timestamp = int(parts['t'])
+    except (KeyError, ValueError):
+        return False
+    if abs(time.time() - timestamp) > tolerance:
+        return False
+    return hmac.compare_digest(sign(secret, timestamp, body), header)
+
+
+def collect(subscription_id):
+    """
+    Turn the subscription's new changes into pending deliveries, one per
+    batch of up to batch_size changes, and advance its cursor.
+    Returns the number of deliveries created.
+    """
+    created = 0
+    with transaction.atomic():
+        subscription = WebhookSubscription.objects.select_for_update().get(pk=subscription_id)
+        if not subscription.isActive:
+            return 0
+        since = subscription.lastChangeId
+        for _ in range(MAX_BATCHES_PER_RUN):
+            try:
+                page = changes_since(
+                    subscription.airport_id, since, limit=_config()['batch_size'], kinds=subscription.events
+                )
+            except CursorExpired:
+                # The endpoint fell further behind than the feed keeps; skip to now
+                print(f"Webhook {subscription.pk}: changes after {since} were pruned, resuming from the latest")
+                since = current_cursor(subscription.airport_id)
+                break
+
+            cursor = int(page['cursor'])
+            if page['flights'] or page['deleted']:
+                WebhookDelivery.objects.create(
+                    subscription=subscription,
+                    firstChangeId=since + 1,
+                    lastChangeId=cursor,
+                    payload={
+                        'event': 'flights.changed',
+                        'airport': subscription.airport_id,
+                        'cursor': page['cursor'],
+                        'columns': page['columns'],
+                        'flights': page['flights'],
+                        'deleted': page['deleted'],
+                    },
+                )
+                created += 1
+            if cursor == since:
+                break
+            since = cursor
+            if not page['more']:
+                break
+
+        if since != subscription.lastChangeId:
+            WebhookSubscription.objects.filter(pk=subscription.pk).update(lastChangeId=since)
+    return created
+
+
+def _claim(delivery, lease):
+    """Take a due delivery for this run; False if another run got it first."""
+    return WebhookDelivery.objects.filter(
+        pk=delivery.pk, status='pending', attempts=delivery.attempts
+    ).update(attempts=F('attempts') + 1, nextAttemptAt=timezone.now() + lease) == 1
+
+
+def _post(url, secret, delivery_id, body, timeout):
+    """Runs in a worker thread: HTTP only, no database access."""
+    # Checked again at send time: the host's DNS may have changed since it was saved
+    try:
+        check_url(url)
+    except ValueError as e:
+        return None, str(e)
+    headers = {
+        'Content-Type': 'application/json',
+        'X-Rassid-Delivery': str(delivery_id),
+        SIGNATURE_HEADER: sign(secret, int(time.time()), body),
+    }
+    try:
+        response = get_session().post(url, data=body, headers=headers, timeout=timeout)
+    except requests.RequestException as e:
+        return None, str(e)
+    if 200 <= response.status_code < 300:
+        return response.status_code, None
+    return response.status_code, response.text[:500] or f"HTTP {response.status_code}"
+
+
+def _record(delivery, code, error):
+    config = _config()
+    now = timezone.now()
+    attempts = delivery.attempts + 1
+    if error is None:
+        changes = {'status': 'sent', 'deliveredAt': now, 'error': None}
+    elif attempts >= config['max_attempts']:
+        changes = {'status': 'failed', 'error': error}
+    else:
+        delay = config['backoff_seconds'] * 2 ** (attempts - 1)
+        changes = {'error': error, 'nextAttemptAt': now + timedelta(seconds=delay)}
+    WebhookDelivery.objects.filter(pk=delivery.pk).update(responseCode=code, **changes)
+    return changes.get('status', 'retry')
+
+
+def deliver_pending(limit=None):
+    """
+    Send due deliveries on a pool of worker threads, in parallel across
+    endpoints but strictly in order for each one: a subscription has at most
+    one request in flight, and while its oldest pending batch waits for a
+    retry the later ones are held back, so a receiver never applies older
+    flight state over newer. Failures are retried with exponential backoff
+    until max_attempts, then marked failed and the next batch goes out.
+    Returns {'sent': n, 'retry': n, 'failed': n}.
+    """
+    config = _config()
+    limit = limit or config['workers'] * 25
+    lease = timedelta(seconds=config['timeout'] * 2 + 30)
+
+    due = list(WebhookDelivery.objects.filter(
+        status='pending', nextAttemptAt__lte=timezone.now(), subscription__isActive=True
+    ).select_related('subscription').order_by('id')[:limit])
+
+    # Only a subscription whose oldest pending batch is due may send
+    oldest = dict(
+        WebhookDelivery.objects.filter(status='pending', subscription_id__in={d.subscription_id for d in due})
+        .values('subscription_id').annotate(first=Min('id')).values_list('subscription_id', 'first')
+    )
+    queues = defaultdict(deque)
+    for delivery in due:
+        queue = queues[delivery.subscription_id]
+        if queue or oldest.get(delivery.subscription_id) == delivery.pk:
+            queue.append(delivery)
+
+    totals = {'sent': 0, 'retry': 0, 'failed': 0}
+    in_flight = {}
+    busy = set()
+
+    with ThreadPoolExecutor(max_workers=config['workers'], thread_name_prefix='webhook') as pool:
+        def fill():
+            for subscription_id, queue in queues.items():
+                if not queue or subscription_id in busy:
+                    continue
+                delivery = queue.popleft()
+                if not _claim(delivery, lease):
+                    # Another run is sending this batch; leave the rest to it
+                    queue.clear()
+                    continue
+                subscription = delivery.subscription
+                body = json.dumps(delivery.payload, cls=DjangoJSONEncoder, separators=(',', ':')).encode()
+                future = pool.submit(_post, subscription.url, subscription.secret, delivery.pk, body, config['timeout'])
+                in_flight[future] = delivery
+                busy.add(subscription_id)
+
+        fill()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                delivery = in_flight.pop(future)
+                busy.discard(delivery.subscription_id)
+                code, error = future.result()
+                outcome = _record(delivery, code, error)
+                totals[outcome] += 1
+                if outcome == 'retry':
+                    queues[delivery.subscription_id].clear()
+            fill()
+    return totals
+
+
+def run():
+    """Collect new changes for every active subscription, then send what is due."""
+    created = 0
+    for subscription_id in WebhookSubscription.objects.filter(isActive=True).values_list('pk', flat=True):
+        created += collect(subscription_id)
+    totals = deliver_pending()
+    totals['created'] = created
+    return totals
@@ -0,0 +1,19 @@
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+from notifications.models import EmailLog, WebhookSubscription
+from notifications.services.rollups import record_deliveries
+
+@receiver(post_save, sender=EmailLog)
+def email_logged(sender, instance, created, **kwargs):
+    if created:
+        record_deliveries([
+            (instance.sent_at, instance.recipient, instance.airport_id, 'email', instance.status)
+        ], recipient_dimension='email_log')
+
+
+@receiver(pre_save, sender=WebhookSubscription)
+def start_webhook_at_head(sender, instance, **kwargs):
+    # A new endpoint receives changes from now on, not the airport's whole history
+    if instance.pk is None and not instance.lastChangeId:
+        from flights.services.changes import current_cursor
+        instance.lastChangeId = current_cursor(instance.airport_id)
@@ -0,0 +1,69 @@
+from celery import shared_task
+
+
+@shared_task
+def flush_notification_digests():
+    """
+    Send one digest per booking and channel for every update that was
+    deferred by the per-recipient rate limit, then compact the ledger.
+    """
+    from collections import defaultdict
+    from .models import Notification
+    from .services.dispatcher import dispatch
+    from .services.throttle import compact_ledger
+    from passengers.signals import build_update_message
+
+    pending = Notification.objects.filter(status='Deferred').select_related(
+        'passengerFlight__passenger', 'passengerFlight__flight'
+    ).order_by('sentAt')
+
+    grouped = defaultdict(list)
+    for notification in pending:
+        grouped[(notification.passengerFlight_id, notification.channel)].append(notification)
+
+    outgoing = []
+    for (_, channel), items in grouped.items():
+        booking = items[0].passengerFlight
+        if booking.passenger.preferredLanguage == 'ar':
+            title = "ملخص تحديثات الرحلة"
+        else:
+            title = "Flight Updates Summary"
+        description = " | ".join(item.content for item in items)
+        outgoing.append(build_update_message(booking, channel, booking.flight, title, description))
+
+    records = dispatch(outgoing)
+    # Only digests that went out; failed ones stay Deferred for the next flush
+    sent = {(r.passengerFlight_id, r.channel) for r in records if r.status == 'Sent'}
+    Notification.objects.filter(
+        id__in=[n.id for key, items in grouped.items() if key in sent for n in items]
+    ).update(status='Digested')
+
+    compact_ledger()
+
+
+@shared_task(ignore_result=True)
+def send_flight_update_batch(updates):
+    """
+    Notify passengers about a batch of bulk status and gate changes.
+    updates: [{'kind': 'status', 'history_id': id} | {'kind': 'gate', 'assignment_id': id}]
+    """
+    from flights.models import FlightStatusHistory, GateAssignment
+    from passengers.signals import gate_update_text, send_update_email_to_passengers, status_update_text
+
+    history_ids = [u['history_id'] for u in updates if u['kind'] == 'status']
+    assignment_ids = [u['assignment_id'] for u in updates if u['kind'] == 'gate']
+
+    for h in FlightStatusHistory.objects.filter(pk__in=history_ids).select_related('flight'):
+        send_update_email_to_passengers(h.flight, *status_update_text(h.flight, h.newStatus))
+
+    for g in GateAssignment.objects.filter(pk__in=assignment_ids).select_related('flight'):
+        send_update_email_to_passengers(g.flight, *gate_update_text(g), channels=('email', 'sms'))
+
+
+@shared_task(ignore_result=True)
+def deliver_webhooks():
+    """Batch new flight changes for each webhook subscription and send what is due."""
+    from .services.webhooks import run
+    totals = run()
+    if any(totals.values()):
+        print(f"Webhooks: {totals}")
@@ -1,3 +1,278 @@
-from django.test import TestCase
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from airports.models import Airport
+from flights.models import Flight, FlightChange
+from passengers.models import Passenger, PassengerFlight
+from notifications.models import EmailLog, Notification, WebhookDelivery, WebhookSubscription
+from notifications.services import dispatcher, webhooks
+from notifications.services.rollups import delivery_totals, record_deliveries
+from notifications.services.throttle import NotificationThrottle
+from notifications.tasks import flush_notification_digests
+from notifications.services.webhook_sink import WebhookSink
+
+WEBHOOKS = {
+    'workers': 4, 'timeout': 5, 'batch_size': 2, 'max_attempts': 3, 'backoff_seconds': 30,
+    # The local sink listens on http://127.0.0.1
+    'allow_private_targets': True,
+}
+
+
+@override_settings(WEBHOOKS=WEBHOOKS)
+class WebhookDeliveryTests(TestCase):
+    def setUp(self):
+        self.airport = Airport.objects.create(name="Origin", code="WH1", city="City")
+        self.destination = Airport.objects.create(name="Destination", code="WH2", city="City")
+
+    def start_sink(self, **kwargs):
+        sink = WebhookSink(**kwargs).start()
+        self.addCleanup(sink.stop)
+        return sink
+
+    def add_flights(self, count):
+        now = timezone.now()
+        for i in range(count):
+            Flight.objects.create(
+                flightNumber=f"WH{i}", status='Scheduled', airlineCode='WH',
+                scheduledDeparture=now + timedelta(hours=2), scheduledArrival=now + timedelta(hours=4),
+                origin=self.airport, destination=self.destination,
+            )
+
+    def test_new_subscription_starts_at_head(self):
+        self.add_flights(2)
+        subscription = WebhookSubscription.objects.create(airport=self.airport, url='http://127.0.0.1:9/')
+
+        self.assertEqual(webhooks.collect(subscription.pk), 0)
+
+    def test_changes_are_batched_and_signed(self):
+        sink = self.start_sink()
+        subscription = WebhookSubscription.objects.create(airport=self.airport, url=sink.url)
+        self.add_flights(5)
+
+        totals = webhooks.run()
+
+        self.assertEqual(totals['created'], 3)
+        self.assertEqual(totals['sent'], 3)
+        flights = [row[1] for payload in sink.payloads() for row in payload['flights']]
+        self.assertEqual(sorted(flights), [f"WH{i}" for i in range(5)])
+        for request in sink.requests:
+            self.assertTrue(webhooks.verify(subscription.secret, request['headers']['X-Rassid-Signature'], request['body']))
+        self.assertFalse(webhooks.verify('other-secret', sink.requests[0]['headers']['X-Rassid-Signature'], sink.requests[0]['body']))
+
+        subscription.refresh_from_db()
+        self.assertEqual(subscription.lastChangeId, FlightChange.objects.order_by('-id').first().id)
+        self.assertEqual(webhooks.run()['created'], 0)
+
+    def test_failures_back_off_then_fail(self):
+        sink = self.start_sink(statuses=(503,))
+        WebhookSubscription.objects.create(airport=self.airport, url=sink.url)
+        self.add_flights(1)
+
+        self.assertEqual(webhooks.run()['retry'], 1)
+        delivery = WebhookDelivery.objects.get()
+        self.assertEqual((delivery.status, delivery.attempts, delivery.responseCode), ('pending', 1, 503))
+        self.assertGreater(delivery.nextAttemptAt, timezone.now() + timedelta(seconds=25))
+
+        # Not due yet
+        self.assertEqual(webhooks.deliver_pending()['retry'], 0)
+
+        for attempt in range(2):
+            WebhookDelivery.objects.update(nextAttemptAt=timezone.now())
+            webhooks.deliver_pending()
+        delivery.refresh_from_db()
+        self.assertEqual((delivery.status, delivery.attempts), ('failed', 3))
+        self.assertEqual(len(sink.requests), 3)
+
+    def test_retry_succeeds(self):
+        sink = self.start_sink(statuses=(500, 200))
+        WebhookSubscription.objects.create(airport=self.airport, url=sink.url)
+        self.add_flights(1)
+
+        webhooks.run()
+        WebhookDelivery.objects.update(nextAttemptAt=timezone.now())
+        self.assertEqual(webhooks.deliver_pending()['sent'], 1)
+
+        delivery = WebhookDelivery.objects.get()
+        self.assertEqual((delivery.status, delivery.attempts), ('sent', 2))
+        self.assertIsNotNone(delivery.deliveredAt)
+
+    def test_batches_wait_for_an_earlier_retry(self):
+        sink = self.start_sink(statuses=(503, 200))
+        WebhookSubscription.objects.create(airport=self.airport, url=sink.url)
+        self.add_flights(4)
+
+        totals = webhooks.run()
+        self.assertEqual((totals['created'], totals['retry'], totals['sent']), (2, 1, 0))
+        self.assertEqual(len(sink.requests), 1)
+
+        # Still held back while the first batch is backing off
+        WebhookDelivery.objects.filter(attempts=0).update(nextAttemptAt=timezone.now())
+        self.assertEqual(webhooks.deliver_pending()['sent'], 0)
+
+        WebhookDelivery.objects.update(nextAttemptAt=timezone.now())
+        self.assertEqual(webhooks.deliver_pending()['sent'], 2)
+        cursors = [int(payload['cursor']) for payload in sink.payloads()]
+        self.assertEqual(cursors, sorted(cursors))
+
+    def test_one_request_per_endpoint_in_parallel_across_endpoints(self):
+        sinks = [self.start_sink(latency=0.1) for _ in range(3)]
+        for sink in sinks:
+            WebhookSubscription.objects.create(airport=self.airport, url=sink.url)
+        self.add_flights(6)
+
+        started = time.monotonic()
+        totals = webhooks.run()
+
+        self.assertEqual(totals['sent'], 9)
+        self.assertEqual([sink.max_in_flight for sink in sinks], [1, 1, 1])
+        # Three endpoints side by side: about three requests' latency, not nine
+        self.assertLess(time.monotonic() - started, 0.8)
+
+    def test_events_filter(self):
+        sink = self.start_sink()
+        WebhookSubscription.objects.create(airport=self.airport, url=sink.url, events=['delete'])
+        self.add_flights(2)
+        self.assertEqual(webhooks.run()['created'], 0)
+
+        Flight.objects.filter(flightNumber='WH0').first().delete()
+        webhooks.run()
+
+        [payload] = sink.payloads()
+        self.assertEqual(payload['flights'], [])
+        self.assertEqual(len(payload['deleted']), 1)
+
+
+class WebhookUrlTests(TestCase):
+    def test_private_and_plain_http_targets_are_rejected(self):
+        from notifications.serializers import WebhookSubscriptionSerializer
+
+        airport = Airport.objects.create(name="Origin", code="WU1", city="City")
+        for url in ('http://example.com/hook', 'https://127.0.0.1/hook', 'https://169.254.169.254/latest',
+                    'https://10.0.0.5/hook', 'https://localhost/hook', 'https://[::ffff:127.0.0.1]/hook'):
+            serializer = WebhookSubscriptionSerializer(data={'airport': airport.id, 'url': url})
+            self.assertFalse(serializer.is_valid(), url)
+            self.assertIn('url', serializer.errors)
+
+        with mock.patch('socket.getaddrinfo', return_value=[(2, 1, 6, '', ('93.184.216.34', 443))]):
+            serializer = WebhookSubscriptionSerializer(data={'airport': airport.id, 'url': 'https://example.com/hook'})
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+
+
+class NotificationThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def send(self, digest, scope=1, recipient='p@rassid.test'):
+        allowed, deferred = NotificationThrottle().partition([('item', 'email', recipient)], digest, scope=scope)
+        return bool(allowed or deferred)
+
+    def test_only_a_repeat_of_the_last_message_is_dropped(self):
+        self.assertTrue(self.send('gate-a'))
+        self.assertFalse(self.send('gate-a'))
+        self.assertTrue(self.send('gate-b'))
+        # Back to the first gate: different from the last message, so announced
+        self.assertTrue(self.send('gate-a'))
+
+    def test_scopes_are_independent(self):
+        self.assertTrue(self.send('boarding', scope=1))
+        self.assertTrue(self.send('boarding', scope=2))
+        self.assertFalse(self.send('boarding', scope=1))
+
+    def test_ledger_remembers_the_last_message_without_the_cache(self):
+        self.send('gate-a')
+        self.send('gate-b')
+        cache.clear()
+
+        self.assertFalse(self.send('gate-b'))
+        cache.clear()
+        self.assertTrue(self.send('gate-a'))
+
+
+class DigestFlushTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        origin = Airport.objects.create(name="Origin", code="DG1", city="City")
+        destination = Airport.objects.create(name="Destination", code="DG2", city="City")
+        flight = Flight.objects.create(
+            flightNumber='DG1', status='Scheduled', airlineCode='DG', origin=origin, destination=destination,
+            scheduledDeparture=now + timedelta(hours=2), scheduledArrival=now + timedelta(hours=4),
+        )
+        self.bookings = []
+        for i in range(2):
+            passenger = Passenger.objects.create(fullName=f"P{i}", email=f"p{i}@dg.test", phone='')
+            self.bookings.append(PassengerFlight.objects.create(
+                passenger=passenger, flight=flight, seatNumber='1A', bookingRef='DG', ticketStatus='Booked'
+            ))
+        for booking in self.bookings:
+            Notification.objects.create(passengerFlight=booking, channel='email', content='Delayed', status='Deferred')
+
+    def test_failed_digests_stay_deferred(self):
+        def dispatch(messages):
+            return [
+                Notification(passengerFlight=m.passenger_flight, channel=m.channel, content=m.body,
+                             status='Sent' if m.passenger_flight == self.bookings[0] else 'Failed')
+                for m in messages
+            ]
+
+        with mock.patch('notifications.services.dispatcher.dispatch', dispatch):
+            flush_notification_digests()
+
+        statuses = dict(Notification.objects.values_list('passengerFlight_id', 'status'))
+        self.assertEqual(statuses, {self.bookings[0].pk: 'Digested', self.bookings[1].pk: 'Deferred'})
+
+
+class EmailLogApiTests(TestCase):
+    url = '/api/notifications/email-logs/'
+
+    def setUp(self):
+        self.airports = [Airport.objects.create(name=f"Airport {code}", code=code, city="City") for code in ('EL1', 'EL2')]
+        for airport in self.airports:
+            EmailLog.objects.create(recipient=f"admin@{airport.code.lower()}.test", subject="Report", airport=airport)
+
+    def recipients(self, **params):
+        return sorted(row['recipient'] for row in self.client.get(self.url, params).json()['results'])
+
+    def test_superadmin_sees_every_airport_and_can_narrow(self):
+        self.client.force_login(get_user_model().objects.create_superuser(email='root@rassid.test', password='x'))
+
+        self.assertEqual(self.recipients(), ['admin@el1.test', 'admin@el2.test'])
+        self.assertEqual(self.recipients(airport_id=self.airports[1].pk), ['admin@el2.test'])
+        self.assertEqual(self.client.get(self.url, {'airport_id': 'all'}).status_code, 400)
+
+    def test_staff_of_one_airport_only_see_it(self):
+        user = get_user_model().objects.create_user(
+            email='staff@el1.test', role='airport_admin', airport_id=self.airports[0].pk, is_staff=True
+        )
+        self.client.force_login(user)
+
+        self.assertEqual(self.recipients(airport_id=self.airports[1].pk), ['admin@el1.test'])
+
+
+class DeliveryRollupTests(TestCase):
+    def test_admin_emails_and_passenger_notifications_are_counted_apart(self):
+        airport = Airport.objects.create(name="Origin", code="RU1", city="City")
+        EmailLog.objects.create(recipient='shared@ru.test', subject="Report", airport=airport)
+        EmailLog.objects.create(recipient='shared@ru.test', subject="Report", airport=airport, status='Failed')
+        record_deliveries([(timezone.now(), 'shared@ru.test', airport.id, 'email', 'Sent')])
+
+        self.assertEqual(delivery_totals('email_log', 'shared@ru.test'), (1, 1))
+        self.assertEqual(delivery_totals('recipient', 'shared@ru.test'), (1, 0))
+        self.assertEqual(delivery_totals('airport', airport.id), (2, 1))
+
+
+class RateLimiterSettingsTests(TestCase):
+    def test_limits_follow_the_settings(self):
+        configured = dispatcher.get_rate_limiter('email')
+        self.assertIs(dispatcher.get_rate_limiter('email'), configured)
+
+        with override_settings(NOTIFICATION_CHANNEL_LIMITS={'email': {'batch_size': 50, 'rate_per_second': None}}):
+            self.assertIsNone(dispatcher.get_rate_limiter('email'))
+        with override_settings(NOTIFICATION_CHANNEL_LIMITS={'email': {'batch_size': 50, 'rate_per_second': 500}}):
+            self.assertEqual(dispatcher.get_rate_limiter('email').rate, 500)
+        self.assertIs(dispatcher.get_rate_limiter('email'), configured)
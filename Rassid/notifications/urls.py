@@ -1,10 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import NotificationViewSet, EmailLogViewSet
+from .views import NotificationViewSet, EmailLogViewSet, WebhookSubscriptionViewSet, WebhookDeliveryViewSet
 
 router = DefaultRouter()
 router.register(r'list', NotificationViewSet)
 router.register(r'email-logs', EmailLogViewSet)
+router.register(r'webhooks', WebhookSubscriptionViewSet)
+router.register(r'webhook-deliveries', WebhookDeliveryViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
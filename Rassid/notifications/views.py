@@ -1,14 +1,53 @@
 from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
-from .models import Notification, EmailLog
-from .serializers import NotificationSerializer, EmailLogSerializer
+from common.api import AirportScopedMixin, ApiCursorPagination, QueryFilterBackend, parse_when
+from users.permissions import IsAirportAdmin
+from .models import Notification, EmailLog, WebhookSubscription, WebhookDelivery
+from .serializers import (
+    NotificationSerializer,
+    EmailLogSerializer,
+    WebhookSubscriptionSerializer,
+    WebhookDeliverySerializer,
+)
 
 class NotificationViewSet(ModelViewSet):
     queryset = Notification.objects.all()
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
 
-class EmailLogViewSet(ReadOnlyModelViewSet):
-    queryset = EmailLog.objects.all().order_by('-sent_at')
+class EmailLogViewSet(AirportScopedMixin, ReadOnlyModelViewSet):
+    queryset = EmailLog.objects.all()
     serializer_class = EmailLogSerializer
-    permission_classes = [IsAuthenticated, IsAdminUser]
\ No newline at end of file
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    pagination_class = ApiCursorPagination
+    filter_backends = [QueryFilterBackend]
+    airport_field = 'airport_id'
+    cursor_ordering = ('-sent_at', '-id')
+    filter_params = {
+        'status': 'status',
+        'recipient': 'recipient__iexact',
+        'sent_after': ('sent_at__gte', parse_when),
+        'sent_before': ('sent_at__lt', parse_when),
+    }
+
+class WebhookSubscriptionViewSet(AirportScopedMixin, ModelViewSet):
+    queryset = WebhookSubscription.objects.all()
+    serializer_class = WebhookSubscriptionSerializer
+    permission_classes = [IsAuthenticated, IsAirportAdmin]
+    airport_field = 'airport_id'
+
+class WebhookDeliveryViewSet(AirportScopedMixin, ReadOnlyModelViewSet):
+    """Delivery log: one row per batch sent, or still to be sent, to a subscription."""
+    queryset = WebhookDelivery.objects.all()
+    serializer_class = WebhookDeliverySerializer
+    permission_classes = [IsAuthenticated, IsAirportAdmin]
+    pagination_class = ApiCursorPagination
+    filter_backends = [QueryFilterBackend]
+    airport_field = 'subscription__airport_id'
+    cursor_ordering = ('-id',)
+    filter_params = {
+        'subscription': 'subscription_id',
+        'status': 'status',
+        'created_after': ('createdAt__gte', parse_when),
+        'created_before': ('createdAt__lt', parse_when),
+    }
@@ -21,3 +21,23 @@ class PassengerFlight(models.Model):
     ticketStatus = models.CharField(max_length=20)
     access_token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
 
+
+
+class ManifestImportJob(models.Model):
+    """
+    Progress of the confirmation emails queued by one manifest import. Kept
+    in the database so the Celery worker and the polling page see the same row.
+    """
+    STATUS_CHOICES = (
+        ('queued', 'Queued'),
+        ('sending', 'Sending'),
+        ('done', 'Done'),
+    )
+    jobId = models.CharField(max_length=32, unique=True)
+    flight = models.ForeignKey(Flight, on_delete=models.CASCADE, related_name='manifest_imports')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    total = models.PositiveIntegerField(default=0)
+    sent = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    createdAt = models.DateTimeField(auto_now_add=True)
+    updatedAt = models.DateTimeField(auto_now=True)
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from common.serializers import SparseFieldsMixin
 from .models import Passenger, PassengerFlight
 
 class PassengerSerializer(serializers.ModelSerializer):
@@ -6,7 +7,7 @@ class PassengerSerializer(serializers.ModelSerializer):
         model = Passenger
         fields = "__all__"
 
-class PassengerFlightSerializer(serializers.ModelSerializer):
+class PassengerFlightSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     passenger = PassengerSerializer(read_only=True)
 
     class Meta:
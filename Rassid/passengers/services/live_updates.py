@@ -0,0 +1,206 @@
+import asyncio
+import json
+import queue
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+# Events a slow subscriber may fall behind by before new ones are dropped
+SUBSCRIBER_BUFFER = 100
+HEARTBEAT_SECONDS = 15
+RECONNECT_MS = 3000
+
+
+class InMemoryBroker:
+    """
+    Process-local pub/sub. Only reaches streams served by the same process, so
+    it suits runserver and single-worker deployments. Use RedisBroker when
+    Celery workers or several web processes write flight updates.
+    """
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, flight_id, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(flight_id, ()))
+        for deliver in subscribers:
+            deliver(message)
+
+    def _add(self, flight_id, deliver):
+        with self._lock:
+            self._subscribers[flight_id].add(deliver)
+
+    def _remove(self, flight_id, deliver):
+        with self._lock:
+            self._subscribers[flight_id].discard(deliver)
+            if not self._subscribers[flight_id]:
+                del self._subscribers[flight_id]
+
+    def subscribe(self, flight_id):
+        return _InMemorySubscription(self, flight_id)
+
+    def subscribe_async(self, flight_id):
+        return _InMemoryAsyncSubscription(self, flight_id)
+
+
+class _InMemorySubscription:
+    def __init__(self, broker, flight_id):
+        self.broker = broker
+        self.flight_id = flight_id
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_BUFFER)
+        broker._add(flight_id, self._deliver)
+
+    def _deliver(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except queue.Full:
+            pass
+
+    def get(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker._remove(self.flight_id, self._deliver)
+
+
+class _InMemoryAsyncSubscription:
+    def __init__(self, broker, flight_id):
+        self.broker = broker
+        self.flight_id = flight_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_BUFFER)
+        broker._add(flight_id, self._deliver)
+
+    def _deliver(self, message):
+        # Publishers run in request or worker threads, never on this loop
+        self.loop.call_soon_threadsafe(self._put, message)
+
+    def _put(self, message):
+        if not self.queue.full():
+            self.queue.put_nowait(message)
+
+    async def get(self, timeout):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self):
+        self.broker._remove(self.flight_id, self._deliver)
+
+
+class RedisBroker:
+    """Pub/sub over Redis channels, shared by every web process and Celery worker."""
+
+    def __init__(self):
+        import redis
+        self.url = settings.LIVE_UPDATES_REDIS_URL
+        self.client = redis.Redis.from_url(self.url)
+
+    @staticmethod
+    def channel(flight_id):
+        return f"flight_updates:{flight_id}"
+
+    def publish(self, flight_id, message):
+        self.client.publish(self.channel(flight_id), message)
+
+    def subscribe(self, flight_id):
+        return _RedisSubscription(self.client.pubsub(ignore_subscribe_messages=True), self.channel(flight_id))
+
+    def subscribe_async(self, flight_id):
+        import redis.asyncio
+        client = redis.asyncio.Redis.from_url(self.url)
+        return _RedisAsyncSubscription(client, self.channel(flight_id))
+
+
+class _RedisSubscription:
+    def __init__(self, pubsub, channel):
+        self.pubsub = pubsub
+        self.pubsub.subscribe(channel)
+
+    def get(self, timeout):
+        message = self.pubsub.get_message(timeout=timeout)
+        return message['data'].decode() if message else None
+
+    def close(self):
+        self.pubsub.close()
+
+
+class _RedisAsyncSubscription:
+    def __init__(self, client, channel):
+        self.client = client
+        self.channel = channel
+        self.pubsub = None
+
+    async def get(self, timeout):
+        if self.pubsub is None:
+            self.pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            await self.pubsub.subscribe(self.channel)
+        message = await self.pubsub.get_message(timeout=timeout)
+        return message['data'].decode() if message else None
+
+    async def close(self):
+        if self.pubsub is not None:
+            await self.pubsub.aclose()
+        await self.client.aclose()
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(settings.LIVE_UPDATES_BROKER)()
+    return _broker
+
+
+def publish_flight_event(flight_id, event):
+    """Send one timeline event to every open stream for the flight."""
+    try:
+        get_broker().publish(flight_id, json.dumps(event, cls=DjangoJSONEncoder))
+    except Exception as e:
+        # Live updates are best effort; the page still shows the event on reload
+        print(f"Live update publish failed for flight {flight_id}: {e}")
+
+
+def format_sse(message, event='update'):
+    return f"event: {event}\ndata: {message}\n\n"
+
+
+def event_stream(flight_id):
+    """Blocking SSE generator, one worker thread per client. Used under WSGI."""
+    subscription = get_broker().subscribe(flight_id)
+    deadline = time.monotonic() + settings.LIVE_UPDATES_MAX_SECONDS
+    try:
+        yield f"retry: {RECONNECT_MS}\n\n"
+        while time.monotonic() < deadline:
+            message = subscription.get(HEARTBEAT_SECONDS)
+            yield format_sse(message) if message else ": keep-alive\n\n"
+    finally:
+        subscription.close()
+
+
+async def async_event_stream(flight_id):
+    """SSE generator served on the event loop, so idle clients hold no thread. Used under ASGI."""
+    subscription = get_broker().subscribe_async(flight_id)
+    deadline = time.monotonic() + settings.LIVE_UPDATES_MAX_SECONDS
+    try:
+        yield f"retry: {RECONNECT_MS}\n\n"
+        while time.monotonic() < deadline:
+            message = await subscription.get(HEARTBEAT_SECONDS)
+            yield format_sse(message) if message else ": keep-alive\n\n"
+    finally:
+        await subscription.close()
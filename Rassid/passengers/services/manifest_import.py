@@ -0,0 +1,222 @@
+import csv
+import io
+import json
+import uuid
+
+from django.db import transaction
+
+from passengers.models import ManifestImportJob, Passenger, PassengerFlight
+
+BATCH_SIZE = 500
+MAX_ERRORS = 50
+
+# Header aliases, so a file produced by the manifest export can be imported back
+FIELD_ALIASES = {
+    'fullName': ('passenger', 'fullname', 'full_name', 'name'),
+    'email': ('email',),
+    'phone': ('phone',),
+    'preferredLanguage': ('language', 'preferredlanguage', 'preferred_language'),
+    'seatNumber': ('seat', 'seatnumber', 'seat_number'),
+    'bookingRef': ('booking_ref', 'bookingref'),
+    'ticketStatus': ('ticket_status', 'ticketstatus'),
+}
+PASSENGER_FIELDS = ['fullName', 'phone', 'preferredLanguage']
+BOOKING_FIELDS = ['seatNumber', 'bookingRef', 'ticketStatus']
+
+
+class ManifestImportError(Exception):
+    pass
+
+
+def get_progress(job_id):
+    job = ManifestImportJob.objects.filter(jobId=job_id).values(
+        'flight_id', 'flight__origin_id', 'status', 'total', 'sent', 'failed'
+    ).first()
+    if job is not None:
+        job['airport_id'] = job.pop('flight__origin_id')
+    return job
+
+
+def set_progress(job_id, **values):
+    ManifestImportJob.objects.filter(jobId=job_id).update(**values)
+
+
+def _normalize(raw):
+    lowered = {str(k).strip().lower(): v for k, v in raw.items() if k is not None}
+    row = {}
+    for field, aliases in FIELD_ALIASES.items():
+        for alias in aliases:
+            value = lowered.get(alias)
+            if value not in (None, ''):
+                row[field] = str(value).strip()
+                break
+    return row
+
+
+def read_rows(upload):
+    """
+    Yield (line_number, row dict) from an uploaded CSV, JSON Lines or JSON
+    array file. CSV and JSON Lines are read one line at a time; a JSON array
+    has to be loaded whole.
+    """
+    name = (upload.name or '').lower()
+    upload.seek(0)
+    text = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+    try:
+        if name.endswith('.csv'):
+            for line, raw in enumerate(csv.DictReader(text), start=2):
+                yield line, _normalize(raw)
+        elif name.endswith(('.jsonl', '.ndjson')):
+            for line, raw in enumerate(text, start=1):
+                if not raw.strip():
+                    continue
+                try:
+                    yield line, _normalize(json.loads(raw))
+                except (ValueError, AttributeError):
+                    yield line, None
+        elif name.endswith('.json'):
+            try:
+                data = json.load(text)
+            except ValueError:
+                raise ManifestImportError("The JSON file could not be parsed.")
+            if not isinstance(data, list):
+                raise ManifestImportError("A JSON manifest must be a list of passengers.")
+            for line, raw in enumerate(data, start=1):
+                yield line, _normalize(raw) if isinstance(raw, dict) else None
+        else:
+            raise ManifestImportError("Upload a .csv, .json or .jsonl file.")
+    except UnicodeDecodeError:
+        raise ManifestImportError("The file is not UTF-8 encoded. Save it as UTF-8 and upload it again.")
+    finally:
+        text.detach()
+
+
+def _upsert_batch(flight, rows):
+    """
+    Upsert one batch of rows keyed by email. Returns (ids of new bookings,
+    number of bookings updated).
+
+    An existing passenger's name and phone are only updated when all of
+    their bookings are on flights from this flight's airport; a passenger
+    also booked elsewhere keeps the details other airports rely on.
+    """
+    rows = {row['email']: row for row in rows}
+
+    passengers = {}
+    for p in Passenger.objects.filter(email__in=rows).order_by('-id'):
+        passengers[p.email] = p  # oldest row wins when an email repeats
+    booked_elsewhere = set(
+        PassengerFlight.objects.filter(passenger__in=passengers.values())
+        .exclude(flight__origin_id=flight.origin_id)
+        .values_list('passenger_id', flat=True)
+    )
+
+    changed = []
+    new_passengers = []
+    for email, row in rows.items():
+        p = passengers.get(email)
+        if p is None:
+            new_passengers.append(Passenger(
+                fullName=row['fullName'], email=email, phone=row.get('phone', ''),
+                preferredLanguage=row.get('preferredLanguage', 'en'),
+            ))
+            continue
+        if p.pk in booked_elsewhere:
+            continue
+        values = {f: row[f] for f in PASSENGER_FIELDS if f in row}
+        if any(getattr(p, f) != v for f, v in values.items()):
+            for f, v in values.items():
+                setattr(p, f, v)
+            changed.append(p)
+
+    if changed:
+        Passenger.objects.bulk_update(changed, PASSENGER_FIELDS)
+    for p in Passenger.objects.bulk_create(new_passengers):
+        passengers[p.email] = p
+
+    by_passenger = {
+        b.passenger_id: b
+        for b in PassengerFlight.objects.filter(flight=flight, passenger__in=passengers.values())
+    }
+
+    updated = []
+    new_bookings = []
+    for email, row in rows.items():
+        p = passengers[email]
+        booking = by_passenger.get(p.pk)
+        if booking is None:
+            new_bookings.append(PassengerFlight(
+                passenger=p, flight=flight,
+                seatNumber=row.get('seatNumber', ''), bookingRef=row.get('bookingRef', ''),
+                ticketStatus=row.get('ticketStatus', 'Booked'),
+            ))
+            continue
+        values = {f: row[f] for f in BOOKING_FIELDS if f in row}
+        if any(getattr(booking, f) != v for f, v in values.items()):
+            for f, v in values.items():
+                setattr(booking, f, v)
+            updated.append(booking)
+
+    if updated:
+        PassengerFlight.objects.bulk_update(updated, BOOKING_FIELDS)
+    # bulk_create skips post_save: confirmations go out afterwards as one batched job
+    created = PassengerFlight.objects.bulk_create(new_bookings)
+    return [b.pk for b in created], len(updated)
+
+
+def import_manifest(flight, upload):
+    """
+    Upsert the passengers in an uploaded manifest onto flight, BATCH_SIZE rows
+    per transaction. Returns a summary with the ids of the new bookings.
+    """
+    summary = {'rows': 0, 'created': 0, 'updated': 0, 'skipped': 0, 'errors': [], 'booking_ids': []}
+
+    def flush(batch):
+        with transaction.atomic():
+            created, updated = _upsert_batch(flight, batch)
+        summary['booking_ids'].extend(created)
+        summary['created'] += len(created)
+        summary['updated'] += updated
+
+    batch = []
+    line = 0
+    try:
+        for line, row in read_rows(upload):
+            summary['rows'] += 1
+            if not row or not row.get('email') or not row.get('fullName'):
+                summary['skipped'] += 1
+                if len(summary['errors']) < MAX_ERRORS:
+                    summary['errors'].append(f"Line {line}: a passenger name and email are required.")
+                continue
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                flush(batch)
+                batch = []
+    except ManifestImportError as e:
+        # Earlier batches are already saved; keep them and report where reading stopped
+        if not summary['rows']:
+            raise
+        summary['errors'].append(f"Stopped after line {line}: {e}")
+    if batch:
+        flush(batch)
+
+    return summary
+
+
+def enqueue_confirmations(flight, booking_ids):
+    """
+    Queue one job that sends the booking confirmations for booking_ids.
+    Returns the job id used for progress reporting, or None if nothing to send.
+    """
+    from passengers.tasks import send_booking_confirmations
+
+    if not booking_ids:
+        return None
+    job_id = uuid.uuid4().hex
+    ManifestImportJob.objects.create(jobId=job_id, flight=flight, total=len(booking_ids))
+    try:
+        send_booking_confirmations.apply_async((job_id, booking_ids), retry=False)
+    except Exception as e:
+        print(f"Could not enqueue {len(booking_ids)} booking confirmations ({e}); sending inline.")
+        send_booking_confirmations(job_id, booking_ids)
+    return job_id
@@ -0,0 +1,161 @@
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+
+
+# Ids become part of file names; anything else never touches the disk
+SAFE_ID = re.compile(r'^[0-9]+$')
+
+
+class MapUpstreamError(Exception):
+    pass
+
+
+_session = None
+_session_lock = threading.Lock()
+_inflight = {}
+_inflight_lock = threading.Lock()
+_revalidator = ThreadPoolExecutor(max_workers=2, thread_name_prefix='map-poi-revalidate')
+
+
+def get_session():
+    """One pooled HTTP session for the map API, shared by every request thread."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16))
+                session.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=16))
+                _session = session
+    return _session
+
+
+def _config():
+    return settings.MAP_POI_CACHE
+
+
+def _key(building_id, floor_id):
+    return f"map_pois:{building_id}:{floor_id}"
+
+
+def _disk_path(building_id, floor_id):
+    directory = _config().get('disk_path')
+    if not directory or not SAFE_ID.match(str(building_id)) or not SAFE_ID.match(str(floor_id)):
+        return None
+    return os.path.join(directory, f"pois_{building_id}_{floor_id}.json")
+
+
+def _load(building_id, floor_id):
+    entry = cache.get(_key(building_id, floor_id))
+    if entry is not None:
+        return entry
+
+    path = _disk_path(building_id, floor_id)
+    if path and os.path.exists(path):
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # Warm the shared cache so the next hit skips the disk
+        cache.set(_key(building_id, floor_id), entry, _config()['ttl'] + _config()['stale_ttl'])
+        return entry
+    return None
+
+
+def _store(building_id, floor_id, entry):
+    cache.set(_key(building_id, floor_id), entry, _config()['ttl'] + _config()['stale_ttl'])
+
+    path = _disk_path(building_id, floor_id)
+    if path:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+
+def fetch_pois(building_id, floor_id):
+    url = f"{settings.MAP_API_URL}/{building_id}/floors/{floor_id}/pois"
+    try:
+        response = get_session().get(url, timeout=_config()['timeout'])
+        response.raise_for_status()
+        data = response.json()
+    except (requests.RequestException, ValueError) as e:
+        raise MapUpstreamError(str(e))
+
+    entry = {'data': data, 'fetched_at': time.time()}
+    _store(building_id, floor_id, entry)
+    return entry
+
+
+def _coalesced_fetch(building_id, floor_id):
+    """
+    Fetch once per key no matter how many threads miss at the same time.
+    The first caller does the request; the others wait on its result.
+    """
+    key = _key(building_id, floor_id)
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _inflight[key] = Future()
+
+    if not leader:
+        return future.result(timeout=_config()['timeout'] * 2)
+
+    try:
+        future.set_result(fetch_pois(building_id, floor_id))
+    except Exception as e:
+        future.set_exception(e)
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+    return future.result()
+
+
+def _revalidate(building_id, floor_id):
+    try:
+        _coalesced_fetch(building_id, floor_id)
+    except Exception as e:
+        print(f"Map POI revalidation failed for {building_id}/{floor_id}: {e}")
+
+
+def get_pois_entry(building_id, floor_id):
+    """
+    Cache entry for one floor: {'data': <POI payload>, 'fetched_at': <epoch>}.
+
+    Fresh entries (younger than ttl) are returned as is. Stale entries
+    (up to ttl + stale_ttl) are returned immediately while one background
+    refresh runs. Misses block on a single coalesced upstream request, and
+    a failed refresh falls back to whatever stale copy exists.
+    """
+    entry = _load(building_id, floor_id)
+    if entry is not None:
+        age = time.time() - entry['fetched_at']
+        if age < _config()['ttl']:
+            return entry
+        if age < _config()['ttl'] + _config()['stale_ttl']:
+            if _key(building_id, floor_id) not in _inflight:
+                _revalidator.submit(_revalidate, building_id, floor_id)
+            return entry
+
+    try:
+        return _coalesced_fetch(building_id, floor_id)
+    except MapUpstreamError:
+        if entry is not None:
+            return entry
+        raise
+
+
+def get_pois(building_id, floor_id):
+    return get_pois_entry(building_id, floor_id)['data']
@@ -0,0 +1,85 @@
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+POI_PATH = re.compile(r'^/api/public/v1/buildings/(?P<building>[^/]+)/floors/(?P<floor>[^/]+)/pois/?$')
+
+
+def sample_pois(building_id, floor_id):
+    """
+    A small terminal floor: one security checkpoint, a corridor of junctions
+    and gates off it, plus a few amenities. Coordinates are in metres.
+    """
+    pois = [
+        {'id': f"{building_id}-sec-1", 'name': 'Security Checkpoint', 'category': 'security', 'x': 0, 'y': 0},
+        {'id': f"{building_id}-pass-1", 'name': 'Passport Control', 'category': 'checkpoint', 'x': 40, 'y': 0},
+        {'id': f"{building_id}-cafe-1", 'name': 'Cafe', 'category': 'food', 'x': 60, 'y': 15},
+        {'id': f"{building_id}-wc-1", 'name': 'Restrooms', 'category': 'restroom', 'x': 100, 'y': -15},
+    ]
+    for i in range(1, 9):
+        x = 40 + i * 30
+        pois.append({'id': f"{building_id}-j-{i}", 'name': f"Junction {i}", 'category': 'junction', 'x': x, 'y': 0})
+        pois.append({
+            'id': f"{building_id}-gate-{i}", 'name': f"Gate A{i}",
+            'category': 'gate', 'gate_code': f"A{i}", 'x': x, 'y': 25 if i % 2 else -25,
+        })
+    return pois
+
+
+class StubMapServer:
+    """
+    Local stand-in for the KKIA maps API, for tests and offline development.
+    Serves sample_pois() for any building and floor and counts requests.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, fail=False):
+        self.latency = latency
+        self.fail = fail
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests.append(self.path)
+                if stub.latency:
+                    time.sleep(stub.latency)
+                match = POI_PATH.match(self.path)
+                if stub.fail or not match:
+                    self.send_response(503 if stub.fail else 404)
+                    self.end_headers()
+                    return
+                body = json.dumps(sample_pois(match['building'], match['floor'])).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.host, self.port = self.server.server_address[:2]
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}/api/public/v1/buildings"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
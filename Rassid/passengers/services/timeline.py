@@ -0,0 +1,89 @@
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from flights.models import Flight, FlightStatusHistory, GateAssignment
+
+SNAPSHOT_TTL = 60 * 60 * 24
+
+
+def status_entry(history):
+    return {
+        'type': 'status',
+        'timestamp': history.changedAt,
+        'title': f"Status Changed to {history.newStatus}",
+        'description': f"Flight status updated from {history.oldStatus} to {history.newStatus}",
+        'status': history.newStatus,
+    }
+
+
+def gate_entry(assignment):
+    boarding = assignment.boardingOpenTime.strftime('%H:%M') if assignment.boardingOpenTime else '--'
+    return {
+        'type': 'gate',
+        'timestamp': assignment.assignedAt,
+        'title': f"Gate Assigned: {assignment.gateCode}",
+        'description': f"Terminal {assignment.terminal}. Boarding: {boarding}",
+        'gateCode': assignment.gateCode,
+        'terminal': assignment.terminal,
+        'boardingOpenTime': assignment.boardingOpenTime,
+        'boardingCloseTime': assignment.boardingCloseTime,
+    }
+
+
+def _snapshot_key(flight_id):
+    return f"tracker_snapshot:{flight_id}"
+
+
+def build_snapshot(flight_id):
+    """
+    Everything the tracker page shows about a flight, shared by all of its
+    passengers: the flight header, the latest gate and the merged timeline.
+    """
+    flight = Flight.objects.select_related('origin', 'destination').get(pk=flight_id)
+    statuses = [status_entry(h) for h in FlightStatusHistory.objects.filter(flight_id=flight_id).order_by('changedAt')]
+    gates = [gate_entry(g) for g in GateAssignment.objects.filter(flight_id=flight_id).order_by('assignedAt')]
+
+    timeline = statuses + gates
+    timeline.sort(key=lambda x: x['timestamp'], reverse=True)
+
+    snapshot = {
+        'flight': {
+            'id': flight.pk,
+            'flightNumber': flight.flightNumber,
+            'status': flight.status,
+            'scheduledDeparture': flight.scheduledDeparture,
+            'origin': {'code': flight.origin.code},
+            'destination': {'code': flight.destination.code},
+        },
+        'gate': gates[-1] if gates else None,
+        'timeline': timeline,
+    }
+    encoded = json.dumps(snapshot, cls=DjangoJSONEncoder, sort_keys=True)
+    snapshot['etag'] = hashlib.sha1(encoded.encode()).hexdigest()
+    snapshot['builtAt'] = timezone.now()
+    return snapshot
+
+
+def refresh_snapshot(flight_id):
+    try:
+        snapshot = build_snapshot(flight_id)
+    except Flight.DoesNotExist:
+        cache.delete(_snapshot_key(flight_id))
+        return None
+    cache.set(_snapshot_key(flight_id), snapshot, SNAPSHOT_TTL)
+    return snapshot
+
+
+def get_snapshot(flight_id):
+    snapshot = cache.get(_snapshot_key(flight_id))
+    if snapshot is None:
+        snapshot = refresh_snapshot(flight_id)
+    return snapshot
+
+
+def invalidate_snapshot(flight_id):
+    cache.delete(_snapshot_key(flight_id))
@@ -0,0 +1,181 @@
+import heapq
+import math
+import re
+
+from django.core.cache import cache
+
+from passengers.services.map_cache import get_pois_entry
+
+# Categories a passenger starts walking from once airside
+START_CATEGORIES = ('security', 'checkpoint')
+NEIGHBOURS = 4
+WALKING_SPEED_MPS = 1.3
+INDEX_TTL = 60 * 60 * 24
+
+GATE_NAME = re.compile(r'\bgate\s+([A-Z]?\d+[A-Z]?)\b', re.IGNORECASE)
+
+
+def _first(raw, *names):
+    for name in names:
+        if raw.get(name) not in (None, ''):
+            return raw[name]
+    return None
+
+
+def normalize_poi(raw):
+    """
+    Reduce one upstream POI to {id, name, category, gate_code, x, y}.
+    Returns None when the POI has no usable position.
+    """
+    name = _first(raw, 'name', 'title', 'label') or ''
+    category = str(_first(raw, 'category', 'type', 'poi_type') or '').lower()
+
+    x, y = _first(raw, 'x'), _first(raw, 'y')
+    lng, lat = _first(raw, 'longitude', 'lng', 'lon'), _first(raw, 'latitude', 'lat')
+    coordinates = (raw.get('geometry') or {}).get('coordinates')
+    if x is None and lng is None and coordinates:
+        lng, lat = coordinates[:2]
+
+    gate_code = _first(raw, 'gate_code', 'gateCode', 'gate')
+    if not gate_code and category == 'gate':
+        match = GATE_NAME.search(name)
+        gate_code = match.group(1) if match else None
+
+    poi = {
+        'id': str(_first(raw, 'id', 'poi_id', 'uuid') or name),
+        'name': name,
+        'category': category,
+        'gate_code': str(gate_code).upper() if gate_code else None,
+    }
+    if x is not None and y is not None:
+        poi.update(x=float(x), y=float(y), geo=False)
+    elif lng is not None and lat is not None:
+        poi.update(x=float(lng), y=float(lat), geo=True)
+    else:
+        return None
+    return poi
+
+
+def _to_metres(pois):
+    """Project lng/lat POIs onto a local plane in metres; planar ones are already metres."""
+    geo = [p for p in pois if p['geo']]
+    if not geo:
+        return
+    lat0 = sum(p['y'] for p in geo) / len(geo)
+    lng0 = sum(p['x'] for p in geo) / len(geo)
+    scale = 111320.0
+    for p in geo:
+        p['lng'], p['lat'] = p['x'], p['y']
+        p['x'] = (p['lng'] - lng0) * scale * math.cos(math.radians(lat0))
+        p['y'] = (p['lat'] - lat0) * scale
+
+
+def _distance(a, b):
+    return math.hypot(a['x'] - b['x'], a['y'] - b['y'])
+
+
+def build_graph(pois, k=NEIGHBOURS):
+    """Undirected walking graph joining every POI to its k nearest neighbours."""
+    graph = {p['id']: {} for p in pois}
+    for a in pois:
+        nearest = heapq.nsmallest(k, (p for p in pois if p['id'] != a['id']), key=lambda p: _distance(a, p))
+        for b in nearest:
+            d = _distance(a, b)
+            graph[a['id']][b['id']] = d
+            graph[b['id']][a['id']] = d
+    return graph
+
+
+def shortest_paths(graph, sources):
+    """Multi-source Dijkstra. Returns (distance, previous, origin) keyed by POI id."""
+    distance, previous, origin = {}, {}, {}
+    heap = []
+    for source in sources:
+        distance[source] = 0.0
+        origin[source] = source
+        heap.append((0.0, source))
+    heapq.heapify(heap)
+
+    while heap:
+        d, node = heapq.heappop(heap)
+        if d > distance.get(node, math.inf):
+            continue
+        for neighbour, weight in graph[node].items():
+            nd = d + weight
+            if nd < distance.get(neighbour, math.inf):
+                distance[neighbour] = nd
+                previous[neighbour] = node
+                origin[neighbour] = origin[node]
+                heapq.heappush(heap, (nd, neighbour))
+    return distance, previous, origin
+
+
+def build_index(raw_pois):
+    """
+    Index one floor: POIs by gate code and by category, plus the shortest
+    walk to every gate from the nearest security or checkpoint POI.
+    """
+    if isinstance(raw_pois, dict):
+        raw_pois = raw_pois.get('data') or raw_pois.get('pois') or []
+    pois = [p for p in (normalize_poi(raw) for raw in raw_pois or [] if isinstance(raw, dict)) if p]
+    _to_metres(pois)
+    by_id = {p['id']: p for p in pois}
+
+    by_category = {}
+    for p in pois:
+        by_category.setdefault(p['category'], []).append(p['id'])
+    gates = {p['gate_code']: p for p in pois if p['category'] == 'gate' and p['gate_code']}
+
+    graph = build_graph(pois)
+    sources = [p['id'] for p in pois if p['category'] in START_CATEGORIES]
+    distance, previous, origin = shortest_paths(graph, sources)
+
+    routes = {}
+    for code, gate in gates.items():
+        if gate['id'] not in distance:
+            continue
+        path = [gate['id']]
+        while path[-1] in previous:
+            path.append(previous[path[-1]])
+        path.reverse()
+        metres = distance[gate['id']]
+        routes[code] = {
+            'from': by_id[origin[gate['id']]]['name'],
+            'distance_m': round(metres),
+            'walk_minutes': max(1, round(metres / WALKING_SPEED_MPS / 60)),
+            'path': [_point(by_id[node]) for node in path],
+        }
+
+    return {
+        'gates': {code: _point(p) for code, p in gates.items()},
+        'by_category': by_category,
+        'routes': routes,
+    }
+
+
+def _point(poi):
+    point = {'name': poi['name'], 'x': round(poi['x'], 1), 'y': round(poi['y'], 1)}
+    if poi['geo']:
+        point.update(lng=poi['lng'], lat=poi['lat'])
+    return point
+
+
+def get_floor_index(building_id, floor_id):
+    """Index for one floor, rebuilt only when the cached POI data changes."""
+    entry = get_pois_entry(building_id, floor_id)
+    key = f"wayfinding:{building_id}:{floor_id}:{entry['fetched_at']}"
+    index = cache.get(key)
+    if index is None:
+        index = build_index(entry['data'])
+        cache.set(key, index, INDEX_TTL)
+    return index
+
+
+def gate_route(building_id, floor_id, gate_code):
+    """Compact payload for one gate: its position and the walk to it, or None if not mapped."""
+    index = get_floor_index(building_id, floor_id)
+    code = str(gate_code).upper()
+    gate = index['gates'].get(code)
+    if gate is None:
+        return None
+    return {'gate': dict(gate, code=code), 'route': index['routes'].get(code)}
@@ -1,166 +1,202 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from django.core.mail import send_mail
 from django.template.loader import render_to_string
-from django.conf import settings
 from django.utils.html import strip_tags
-from flights.models import FlightStatusHistory, GateAssignment
+from flights.models import Flight, FlightStatusHistory, GateAssignment
 from passengers.models import PassengerFlight
+from notifications.models import Notification
+from notifications.services.dispatcher import OutgoingMessage, dispatch
+from notifications.services.throttle import NotificationThrottle, content_hash
+from passengers.services.live_updates import publish_flight_event
+from passengers.services.timeline import gate_entry, invalidate_snapshot, refresh_snapshot, status_entry
 
-def send_update_email_to_passengers(flight, title_en, desc_en, title_ar, desc_ar):
+def build_update_message(booking, channel, flight, update_title, update_description):
+    passenger = booking.passenger
+    token = booking.access_token
+    # Hardcoding domain for now as we don't have request object in signal
+    # Ideally use sites framework or settings.SITE_URL
+    tracking_url = f"http://127.0.0.1:8000/passengers/track/booking/{token}/"
+
+    if passenger.preferredLanguage == 'ar':
+        subject = f"تحديث الرحلة {flight.flightNumber}"
+        template = 'emails/flight_update_ar.html'
+    else:
+        subject = f"Flight Update {flight.flightNumber}"
+        template = 'emails/flight_update_en.html'
+
+    if channel == 'sms':
+        sms_body = f"{flight.flightNumber}: {update_title}. {update_description} {tracking_url}"
+        return OutgoingMessage(booking, 'sms', passenger.phone, subject, sms_body, airport_id=flight.origin_id)
+
+    context = {
+        'passenger_name': passenger.fullName,
+        'flight_number': flight.flightNumber,
+        'update_title': update_title,
+        'update_description': update_description,
+        'tracking_url': tracking_url
+    }
+    html_message = render_to_string(template, context)
+    return OutgoingMessage(
+        booking, 'email', passenger.email, subject, strip_tags(html_message),
+        html=html_message, airport_id=flight.origin_id
+    )
+
+def send_update_email_to_passengers(flight, title_en, desc_en, title_ar, desc_ar, channels=('email',)):
     bookings = PassengerFlight.objects.filter(flight=flight).select_related('passenger')
-    
+
+    candidates = []
     for booking in bookings:
         passenger = booking.passenger
-        lang = passenger.preferredLanguage
-        
-        token = booking.access_token
-        # Hardcoding domain for now as we don't have request object in signal
-        # Ideally use sites framework or settings.SITE_URL
-        tracking_url = f"http://127.0.0.1:8000/passengers/track/booking/{token}/"
-        
-        if lang == 'ar':
-            subject = f"تحديث الرحلة {flight.flightNumber}"
-            template = 'emails/flight_update_ar.html'
-            context = {
-                'passenger_name': passenger.fullName,
-                'flight_number': flight.flightNumber,
-                'update_title': title_ar,
-                'update_description': desc_ar,
-                'tracking_url': tracking_url
-            }
+        if 'email' in channels and passenger.email:
+            candidates.append((booking, 'email', passenger.email))
+        if 'sms' in channels and passenger.phone:
+            candidates.append((booking, 'sms', passenger.phone))
+
+    # Drop repeats of the last update about this flight and hold back
+    # over-limit recipients before rendering anything
+    digest = content_hash(flight.pk, title_en, desc_en)
+    allowed, deferred = NotificationThrottle().partition(candidates, digest, scope=flight.pk)
+
+    outgoing = []
+    for booking, channel, recipient in allowed:
+        if booking.passenger.preferredLanguage == 'ar':
+            outgoing.append(build_update_message(booking, channel, flight, title_ar, desc_ar))
         else:
-            subject = f"Flight Update {flight.flightNumber}"
-            template = 'emails/flight_update_en.html'
-            context = {
-                'passenger_name': passenger.fullName,
-                'flight_number': flight.flightNumber,
-                'update_title': title_en,
-                'update_description': desc_en,
-                'tracking_url': tracking_url
-            }
-
-        html_message = render_to_string(template, context)
-        plain_message = strip_tags(html_message)
-        
-        try:
-            print(f"Sending email to {passenger.email}...")
-            send_mail(
-                subject,
-                plain_message,
-                settings.DEFAULT_FROM_EMAIL,
-                [passenger.email],
-                html_message=html_message,
-                fail_silently=False
+            outgoing.append(build_update_message(booking, channel, flight, title_en, desc_en))
+    dispatch(outgoing)
+
+    if deferred:
+        Notification.objects.bulk_create([
+            Notification(
+                passengerFlight=booking,
+                channel=channel,
+                content=f"{title_ar}: {desc_ar}" if booking.passenger.preferredLanguage == 'ar' else f"{title_en}: {desc_en}",
+                status='Deferred',
             )
-            print("Email sent.")
-        except Exception as e:
-            print(f"Failed to send email to {passenger.email}: {e}")
+            for booking, channel, recipient in deferred
+        ])
+        print(f"Deferred {len(deferred)} notifications for {flight.flightNumber} into the next digest.")
+
+def status_update_text(flight, new_status):
+    """(title_en, desc_en, title_ar, desc_ar) for a status change."""
+    # Example Statuses: scheduled, boarding, departed, delayed, cancelled
+    status = new_status.lower()
+
+    if status == 'boarding':
+        return (
+            "Boarding Now Open",
+            f"Boarding for flight {flight.flightNumber} is now open. Please proceed to your gate.",
+            "بدء صعود الطائرة",
+            f"بدأ صعود الطائرة للرحلة {flight.flightNumber}. يرجى التوجه إلى البوابة.",
+        )
+    elif status == 'cancelled':
+        return (
+            "Flight Cancelled",
+            f"We regret to inform you that flight {flight.flightNumber} has been cancelled. Please contact support.",
+            "تم إلغاء الرحلة",
+            f"نأسف لإبلاغكم بإلغاء الرحلة {flight.flightNumber}. يرجى التواصل مع الدعم.",
+        )
+    # Generic Update
+    return (
+        f"Status Changed to {new_status}",
+        f"The flight status has been updated to {new_status}.",
+        f"تغيرت الحالة إلى {new_status}",
+        f"تم تحديث حالة الرحلة إلى {new_status}.",
+    )
+
+def gate_update_text(assignment):
+    """(title_en, desc_en, title_ar, desc_ar) for a gate assignment."""
+    boarding_time = assignment.boardingOpenTime
+    if hasattr(boarding_time, 'strftime'):
+        boarding_time_str = boarding_time.strftime('%H:%M')
+    else:
+        boarding_time_str = str(boarding_time).split('T')[-1][:5]
+
+    return (
+        "Gate Information Updated",
+        f"Gate: {assignment.gateCode}, Terminal: {assignment.terminal}. Boarding at {boarding_time_str}.",
+        "تحديث معلومات البوابة",
+        f"البوابة: {assignment.gateCode}، الصالة: {assignment.terminal}. الصعود في {boarding_time_str}.",
+    )
 
 @receiver(post_save, sender=FlightStatusHistory)
 def flight_status_changed(sender, instance, created, **kwargs):
     if created:
         flight = instance.flight
-        # Example Statuses: scheduled, boarding, departed, delayed, cancelled
-        
-        new_status = instance.newStatus.lower()
-        
-        if new_status == 'boarding':
-            send_update_email_to_passengers(
-                flight,
-                title_en="Boarding Now Open",
-                desc_en=f"Boarding for flight {flight.flightNumber} is now open. Please proceed to your gate.",
-                title_ar="بدء صعود الطائرة",
-                desc_ar=f"بدأ صعود الطائرة للرحلة {flight.flightNumber}. يرجى التوجه إلى البوابة."
-            )
-        elif new_status == 'cancelled':
-             send_update_email_to_passengers(
-                flight,
-                title_en="Flight Cancelled",
-                desc_en=f"We regret to inform you that flight {flight.flightNumber} has been cancelled. Please contact support.",
-                title_ar="تم إلغاء الرحلة",
-                desc_ar=f"نأسف لإبلاغكم بإلغاء الرحلة {flight.flightNumber}. يرجى التواصل مع الدعم."
-            )
-        else:
-            # Generic Update
-            send_update_email_to_passengers(
-                flight,
-                title_en=f"Status Changed to {instance.newStatus}",
-                desc_en=f"The flight status has been updated to {instance.newStatus}.",
-                title_ar=f"تغيرت الحالة إلى {instance.newStatus}",
-                desc_ar=f"تم تحديث حالة الرحلة إلى {instance.newStatus}."
-            )
+        title_en, desc_en, title_ar, desc_ar = status_update_text(flight, instance.newStatus)
+        send_update_email_to_passengers(flight, title_en, desc_en, title_ar, desc_ar)
 
 @receiver(post_save, sender=GateAssignment)
 def gate_assigned(sender, instance, created, **kwargs):
     # This signal triggers on create OR update (save)
-    flight = instance.flight
+    title_en, desc_en, title_ar, desc_ar = gate_update_text(instance)
+    send_update_email_to_passengers(
+        instance.flight, title_en, desc_en, title_ar, desc_ar,
+        channels=('email', 'sms')
+    )
+
+@receiver(post_save, sender=FlightStatusHistory)
+def publish_status_event(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: publish_flight_event(instance.flight_id, status_entry(instance)))
+
+@receiver(post_save, sender=GateAssignment)
+def publish_gate_event(sender, instance, created, **kwargs):
+    # Later saves only release the assignment; the new gate is its own event
+    if created:
+        transaction.on_commit(lambda: publish_flight_event(instance.flight_id, gate_entry(instance)))
+
+@receiver(post_save, sender=FlightStatusHistory)
+@receiver(post_save, sender=GateAssignment)
+def rebuild_tracker_snapshot(sender, instance, **kwargs):
+    transaction.on_commit(lambda: refresh_snapshot(instance.flight_id))
+
+@receiver(post_delete, sender=FlightStatusHistory)
+@receiver(post_delete, sender=GateAssignment)
+def drop_tracker_snapshot(sender, instance, **kwargs):
+    invalidate_snapshot(instance.flight_id)
+
+@receiver(post_save, sender=Flight)
+def flight_saved(sender, instance, **kwargs):
+    # Ingestion saves every flight each run; rebuild lazily on the next tracker view
+    invalidate_snapshot(instance.pk)
+
+def build_booking_confirmation(booking):
+    passenger = booking.passenger
+    flight = booking.flight
+    lang = passenger.preferredLanguage
     
-    boarding_time = instance.boardingOpenTime
-    if hasattr(boarding_time, 'strftime'):
-        boarding_time_str = boarding_time.strftime('%H:%M')
+    token = booking.access_token
+    tracking_link = f"http://127.0.0.1:8000/passengers/track/booking/{token}/"
+    
+    try:
+        boarding_time = flight.scheduledDeparture.strftime('%H:%M')
+    except:
+        boarding_time = str(flight.scheduledDeparture)
+
+    if lang == 'ar':
+        subject = "تأكيد الحجز - راصد"
+        template = 'emails/booking_confirmation_ar.html'
     else:
-        boarding_time_str = str(boarding_time).split('T')[-1][:5]
+        subject = "Booking Confirmation - Rassid"
+        template = 'emails/booking_confirmation_en.html'
+    context = {
+        'passenger_name': passenger.fullName,
+        'flight_number': flight.flightNumber,
+        'origin': flight.origin.code,
+        'destination': flight.destination.code,
+        'departure_time': boarding_time,
+        'tracking_link': tracking_link
+    }
 
-    send_update_email_to_passengers(
-        flight,
-        title_en=f"Gate Information Updated",
-        desc_en=f"Gate: {instance.gateCode}, Terminal: {instance.terminal}. Boarding at {boarding_time_str}.",
-        title_ar=f"تحديث معلومات البوابة",
-        desc_ar=f"البوابة: {instance.gateCode}، الصالة: {instance.terminal}. الصعود في {boarding_time_str}."
+    html_message = render_to_string(template, context)
+    return OutgoingMessage(
+        booking, 'email', passenger.email, subject, strip_tags(html_message),
+        html=html_message, airport_id=flight.origin_id
     )
 
 @receiver(post_save, sender=PassengerFlight)
 def booking_created(sender, instance, created, **kwargs):
     if created:
-        passenger = instance.passenger
-        flight = instance.flight
-        lang = passenger.preferredLanguage
-        
-        token = instance.access_token
-        tracking_link = f"http://127.0.0.1:8000/passengers/track/booking/{token}/"
-        
-        try:
-            boarding_time = flight.scheduledDeparture.strftime('%H:%M')
-        except:
-            boarding_time = str(flight.scheduledDeparture)
-
-        if lang == 'ar':
-            subject = "تأكيد الحجز - راصد"
-            template = 'emails/booking_confirmation_ar.html'
-            context = {
-                'passenger_name': passenger.fullName,
-                'flight_number': flight.flightNumber,
-                'origin': flight.origin.code,
-                'destination': flight.destination.code,
-                'departure_time': boarding_time,
-                'tracking_link': tracking_link
-            }
-        else:
-            subject = "Booking Confirmation - Rassid"
-            template = 'emails/booking_confirmation_en.html'
-            context = {
-                'passenger_name': passenger.fullName,
-                'flight_number': flight.flightNumber,
-                'origin': flight.origin.code,
-                'destination': flight.destination.code,
-                'departure_time': boarding_time,
-                'tracking_link': tracking_link
-            }
-
-        html_message = render_to_string(template, context)
-        plain_message = strip_tags(html_message)
-        
-        try:
-            print(f"Sending booking confirmation to {passenger.email}...")
-            send_mail(
-                subject,
-                plain_message,
-                settings.DEFAULT_FROM_EMAIL,
-                [passenger.email],
-                html_message=html_message,
-                fail_silently=False
-            )
-            print("Booking email sent.")
-        except Exception as e:
-            print(f"Failed to send booking email to {passenger.email}: {e}")
+        dispatch([build_booking_confirmation(instance)])
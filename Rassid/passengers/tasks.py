@@ -0,0 +1,29 @@
+from celery import shared_task
+
+CONFIRMATION_BATCH = 200
+
+
+@shared_task(ignore_result=True)
+def send_booking_confirmations(job_id, booking_ids):
+    """
+    Send the confirmation email for every booking created by a manifest
+    import, CONFIRMATION_BATCH at a time, recording progress under job_id.
+    """
+    from notifications.services.dispatcher import dispatch
+    from .models import PassengerFlight
+    from .services.manifest_import import set_progress
+    from .signals import build_booking_confirmation
+
+    sent = failed = 0
+    set_progress(job_id, status='sending')
+    for start in range(0, len(booking_ids), CONFIRMATION_BATCH):
+        chunk = booking_ids[start:start + CONFIRMATION_BATCH]
+        bookings = PassengerFlight.objects.filter(pk__in=chunk).select_related(
+            'passenger', 'flight__origin', 'flight__destination'
+        )
+        records = dispatch([build_booking_confirmation(b) for b in bookings])
+        batch_failed = sum(1 for r in records if r.status == 'Failed')
+        sent += len(records) - batch_failed
+        failed += batch_failed
+        set_progress(job_id, sent=sent, failed=failed)
+    set_progress(job_id, status='done')
@@ -1,3 +1,214 @@
-from django.test import TestCase
+import math
+import os
+import tempfile
+import threading
+import time
+import uuid
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from passengers.models import ManifestImportJob, Passenger, PassengerFlight
+from passengers.services import map_cache
+from passengers.services.manifest_import import ManifestImportError, get_progress, import_manifest
+from passengers.services.map_stub import StubMapServer
+from passengers.services.wayfinding import build_index
+from passengers.tasks import send_booking_confirmations
+
+
+class MapPOICacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.stub = StubMapServer(latency=0.05).start()
+        self.addCleanup(self.stub.stop)
+        self.settings_override = override_settings(
+            MAP_API_URL=self.stub.base_url,
+            MAP_POI_CACHE={'ttl': 60, 'stale_ttl': 600, 'timeout': 5, 'disk_path': None},
+        )
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+    def test_hit_skips_upstream(self):
+        first = map_cache.get_pois('201', '1')
+        second = map_cache.get_pois('201', '1')
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.stub.requests), 1)
+
+    def test_concurrent_misses_are_coalesced(self):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(map_cache.get_pois('202', '1'))) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(results), 8)
+        self.assertEqual(len(self.stub.requests), 1)
+
+    def test_stale_entry_is_served_and_revalidated(self):
+        stale = {'data': ['stale'], 'fetched_at': time.time() - 120}
+        cache.set(map_cache._key('203', '1'), stale, 600)
+
+        self.assertEqual(map_cache.get_pois('203', '1'), ['stale'])
+        deadline = time.time() + 5
+        while cache.get(map_cache._key('203', '1'))['data'] == ['stale'] and time.time() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(len(self.stub.requests), 1)
+        self.assertNotEqual(map_cache.get_pois('203', '1'), ['stale'])
+
+    def test_upstream_failure_falls_back_to_stale_copy(self):
+        data = map_cache.get_pois('204', '1')
+        self.stub.fail = True
+        cache.set(map_cache._key('204', '1'), {'data': data, 'fetched_at': time.time() - 10000}, 60)
+
+        self.assertEqual(map_cache.get_pois('204', '1'), data)
+
+    def test_miss_without_copy_raises(self):
+        self.stub.fail = True
+        with self.assertRaises(map_cache.MapUpstreamError):
+            map_cache.get_pois('205', '1')
+
+    def test_disk_store_survives_cache_loss(self):
+        with tempfile.TemporaryDirectory() as directory:
+            config = {'ttl': 60, 'stale_ttl': 600, 'timeout': 5, 'disk_path': directory}
+            with override_settings(MAP_POI_CACHE=config):
+                data = map_cache.get_pois('206', '1')
+                cache.clear()
+                self.assertEqual(map_cache.get_pois('206', '1'), data)
+
+        self.assertEqual(len(self.stub.requests), 1)
+
+    def test_proxy_rejects_unknown_ids(self):
+        with tempfile.TemporaryDirectory() as directory:
+            config = {'ttl': 60, 'stale_ttl': 600, 'timeout': 5, 'disk_path': directory}
+            with override_settings(MAP_POI_CACHE=config):
+                for params in ({'building_id': '../../etc', 'floor_id': '1'},
+                               {'building_id': '201', 'floor_id': '1/../../x'},
+                               {'building_id': '999', 'floor_id': '1'}):
+                    response = self.client.get(reverse('map_proxy'), params)
+                    self.assertEqual(response.status_code, 400)
+                self.assertEqual(self.client.get(reverse('map_proxy'), {'building_id': '201', 'floor_id': '1'}).status_code, 200)
+                self.assertEqual(os.listdir(directory), ['pois_201_1.json'])
+
+        self.assertEqual(len(self.stub.requests), 1)
+
+
+class GateWayfindingTests(SimpleTestCase):
+    def setUp(self):
+        from passengers.services.map_stub import sample_pois
+        self.pois = sample_pois('201', '1')
+
+    def test_index_keys_gates_and_categories(self):
+        index = build_index(self.pois)
+
+        self.assertEqual(set(index['gates']), {f"A{i}" for i in range(1, 9)})
+        self.assertEqual(len(index['by_category']['gate']), 8)
+        self.assertIn('security', index['by_category'])
+
+    def test_routes_start_at_a_checkpoint_and_end_at_the_gate(self):
+        index = build_index(self.pois)
+        near, far = index['routes']['A1'], index['routes']['A8']
+
+        self.assertEqual(near['path'][-1]['name'], 'Gate A1')
+        self.assertIn(near['from'], ('Security Checkpoint', 'Passport Control'))
+        self.assertLess(near['distance_m'], far['distance_m'])
+        # Never shorter than the straight line from the checkpoint
+        self.assertGreaterEqual(far['distance_m'], round(math.hypot(280 - 40, 25)) - 1)
+
+    def test_geographic_coordinates_are_projected(self):
+        pois = [
+            {'id': 's', 'name': 'Security', 'type': 'security', 'longitude': 46.70, 'latitude': 24.95},
+            {'id': 'g', 'name': 'Gate B12', 'type': 'gate', 'longitude': 46.701, 'latitude': 24.95},
+        ]
+        route = build_index(pois)['routes']['B12']
+
+        self.assertAlmostEqual(route['distance_m'], 101, delta=2)
+
+
+class ManifestImportTests(TestCase):
+    def setUp(self):
+        from airports.models import Airport
+        from flights.models import Flight
+
+        now = timezone.now()
+        self.airport = Airport.objects.create(name="Origin", code="MI1", city="City")
+        self.other_airport = Airport.objects.create(name="Other", code="MI2", city="City")
+        destination = Airport.objects.create(name="Destination", code="MI3", city="City")
+
+        def flight(number, origin):
+            return Flight.objects.create(
+                flightNumber=number, status='Scheduled', airlineCode='MI', origin=origin, destination=destination,
+                scheduledDeparture=now + timedelta(hours=3), scheduledArrival=now + timedelta(hours=5),
+            )
+        self.flight = flight('MI100', self.airport)
+        self.other_flight = flight('MI200', self.other_airport)
+
+    def upload(self, content, name='manifest.csv'):
+        return SimpleUploadedFile(name, content)
+
+    def test_passengers_booked_at_other_airports_keep_their_details(self):
+        shared = Passenger.objects.create(fullName="Shared", email='shared@mi.test', phone='111')
+        local = Passenger.objects.create(fullName="Local", email='local@mi.test', phone='222')
+        PassengerFlight.objects.bulk_create([
+            PassengerFlight(passenger=shared, flight=self.other_flight, seatNumber='1A', bookingRef='X', ticketStatus='Booked'),
+            PassengerFlight(passenger=local, flight=self.flight, seatNumber='2A', bookingRef='Y', ticketStatus='Booked'),
+        ])
+
+        summary = import_manifest(self.flight, self.upload(
+            b"passenger,email,phone\nChanged,shared@mi.test,999\nRenamed,local@mi.test,888\n"
+        ))
+
+        shared.refresh_from_db()
+        local.refresh_from_db()
+        self.assertEqual((shared.fullName, shared.phone), ("Shared", '111'))
+        self.assertEqual((local.fullName, local.phone), ("Renamed", '888'))
+        # The shared passenger is still booked onto the importing flight
+        self.assertEqual(summary['created'], 1)
+        self.assertTrue(PassengerFlight.objects.filter(passenger=shared, flight=self.flight).exists())
+
+    def test_non_utf8_file_is_a_file_error(self):
+        with self.assertRaises(ManifestImportError):
+            import_manifest(self.flight, self.upload("passenger,email\nJosé,jose@mi.test\n".encode('latin-1')))
+
+    def test_progress_is_shared_through_the_database(self):
+        summary = import_manifest(self.flight, self.upload(b"passenger,email\nA,a@mi.test\nB,b@mi.test\n"))
+        job_id = uuid.uuid4().hex
+        ManifestImportJob.objects.create(jobId=job_id, flight=self.flight, total=len(summary['booking_ids']))
+        self.assertEqual(get_progress(job_id)['status'], 'queued')
+
+        send_booking_confirmations(job_id, summary['booking_ids'])
+
+        progress = get_progress(job_id)
+        self.assertEqual((progress['status'], progress['sent'] + progress['failed']), ('done', 2))
+        self.assertEqual(progress['airport_id'], self.airport.id)
+
+
+class LiveUpdateSignalTests(TestCase):
+    def test_gate_event_is_published_once_per_assignment(self):
+        from airports.models import Airport
+        from flights.models import Flight, GateAssignment
+
+        now = timezone.now()
+        origin = Airport.objects.create(name="Origin", code="LU1", city="City")
+        destination = Airport.objects.create(name="Destination", code="LU2", city="City")
+        flight = Flight.objects.create(
+            flightNumber='LU100', status='Scheduled', airlineCode='LU', origin=origin, destination=destination,
+            scheduledDeparture=now + timedelta(hours=3), scheduledArrival=now + timedelta(hours=5),
+        )
+
+        with mock.patch('passengers.signals.publish_flight_event') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                assignment = GateAssignment.objects.create(flight=flight, gateCode='A1', terminal='1')
+            with self.captureOnCommitCallbacks(execute=True):
+                assignment.releasedAt = timezone.now()
+                assignment.save()
+
+        self.assertEqual(publish.call_count, 1)
+        self.assertEqual(publish.call_args.args[0], flight.pk)
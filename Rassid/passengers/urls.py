@@ -11,5 +11,7 @@ urlpatterns = [
     path("", include(router.urls)),
     path("tracking/", views.tracking, name="passengers_tracking"),
     path("track/booking/<uuid:booking_token>/", views.flight_tracker, name="flight_tracker"),
+    path("track/booking/<uuid:booking_token>/events/", views.flight_updates_stream, name="flight_updates_stream"),
+    path("track/booking/<uuid:booking_token>/wayfinding/", views.gate_wayfinding, name="gate_wayfinding"),
     path("api/map-proxy/", views.map_proxy, name="map_proxy"),
 ]
@@ -4,12 +4,15 @@ from rest_framework.permissions import IsAuthenticated
 from .models import Passenger, PassengerFlight
 from .serializers import PassengerSerializer, PassengerFlightSerializer
 from users.permissions import IsAirportAdmin, IsOperator
+from common.api import AirportScopedMixin, ApiCursorPagination, QueryFilterBackend, parse_list
 from django.utils import timezone
-from flights.models import FlightStatusHistory, GateAssignment
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+import hashlib
 import os
-import requests
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.views.decorators.http import require_GET
+from .services.timeline import get_snapshot
 
 # Placeholder mapping: User must verify Building/Floor IDs for KKIA.
 # Structure: Terminal Code -> {'building_id': X, 'default_floor_id': Y}
@@ -26,17 +29,34 @@ TERMINAL_API_MAP = {
     'T5': {'building_id': '205', 'default_floor_id': '1'},
 }
 
-BASE_MAP_API_URL = "https://mapsapi.kkia.sa/api/public/v1/buildings"
+MAP_BUILDING_IDS = {mapping['building_id'] for mapping in TERMINAL_API_MAP.values()}
+
+def map_floor_for_terminal(terminal_code):
+    """Return (terminal_key, building_id, floor_id) for a gate's terminal, defaulting to T5."""
+    # Clean terminal code (remove 'Terminal ' prefix if exists)
+    terminal_key = str(terminal_code or "5").replace('Terminal ', '').strip()
+    mapping = TERMINAL_API_MAP.get(terminal_key, TERMINAL_API_MAP['5']) # Default to T5
+    return terminal_key, mapping['building_id'], mapping['default_floor_id']
 
 class PassengerViewSet(ModelViewSet):
     queryset = Passenger.objects.all()
     serializer_class = PassengerSerializer
     permission_classes = [IsAuthenticated, IsOperator]
 
-class PassengerFlightViewSet(ModelViewSet):
+class PassengerFlightViewSet(AirportScopedMixin, ModelViewSet):
     queryset = PassengerFlight.objects.all()
     serializer_class = PassengerFlightSerializer
     permission_classes = [IsAuthenticated, IsOperator]
+    pagination_class = ApiCursorPagination
+    filter_backends = [QueryFilterBackend]
+    airport_field = 'flight__origin_id'
+    cursor_ordering = ('id',)
+    list_select_related = ('passenger',)
+    filter_params = {
+        'flight': 'flight_id',
+        'ticket_status': ('ticketStatus__in', parse_list),
+        'booking_ref': 'bookingRef__iexact',
+    }
 
 def tracking(request):
     return render(request, "passengers/tracking.html")
@@ -47,43 +67,24 @@ def flight_tracker(request, booking_token):
     Accessible via secure Booking UUID (PassengerFlight.access_token).
     """
     # Strict Access: Fetch proper reservation or 404
-    p_flight = get_object_or_404(PassengerFlight, access_token=booking_token)
+    p_flight = get_object_or_404(PassengerFlight.objects.select_related('passenger'), access_token=booking_token)
     
     passenger = p_flight.passenger
-    flight = p_flight.flight
-    
-    timeline = []
-    
-    status_history = FlightStatusHistory.objects.filter(flight=flight).order_by('changedAt')
-    for h in status_history:
-        timeline.append({
-            'type': 'status',
-            'timestamp': h.changedAt,
-            'title': f"Status Changed to {h.newStatus}",
-            'description': f"Flight status updated from {h.oldStatus} to {h.newStatus}"
-        })
-        
-    gate_history = GateAssignment.objects.filter(flight=flight).order_by('assignedAt')
-    for g in gate_history:
-        timeline.append({
-            'type': 'gate',
-            'timestamp': g.assignedAt,
-            'title': f"Gate Assigned: {g.gateCode}",
-            'description': f"Terminal {g.terminal}. Boarding: {g.boardingOpenTime.strftime('%H:%M')}"
-        })
-        
-    timeline.sort(key=lambda x: x['timestamp'], reverse=True)
-    
-    current_gate = gate_history.last()
+
+    # Flight header, gate and timeline are shared by every passenger on the flight
+    snapshot = get_snapshot(p_flight.flight_id)
+    flight = snapshot['flight']
+    timeline = snapshot['timeline']
+    current_gate = snapshot['gate']
     
     total_seconds_open = 0
     total_seconds_close = 0
     phase = "unknown"
     
-    if current_gate and current_gate.boardingOpenTime and current_gate.boardingCloseTime:
+    if current_gate and current_gate['boardingOpenTime'] and current_gate['boardingCloseTime']:
         now = timezone.now()
-        open_time = current_gate.boardingOpenTime
-        close_time = current_gate.boardingCloseTime
+        open_time = current_gate['boardingOpenTime']
+        close_time = current_gate['boardingCloseTime']
         
         if now < open_time:
             phase = "pre_open"
@@ -105,25 +106,32 @@ def flight_tracker(request, booking_token):
     mapbox_token = os.getenv('MAPBOX_ACCESS_TOKEN', '')
     
     # Determine Building and Floor IDs based on Terminal
-    terminal_code = str(current_gate.terminal) if (current_gate and current_gate.terminal) else "5" # Default to T5
+    terminal_code = str(current_gate['terminal']) if (current_gate and current_gate['terminal']) else "5" # Default to T5
     
     # fallback for raw terminal string if not in GateAssignment
-    if not terminal_code and flight and flight.origin.code == 'RUH': 
+    if not terminal_code and flight and flight['origin']['code'] == 'RUH': 
         # Logic to guess terminal from gate code if needed, but for now rely on GateAssignment
         pass
 
-    # Clean terminal code (remove 'Terminal ' prefix if exists)
-    terminal_key = terminal_code.replace('Terminal ', '').strip()
-    
-    mapping = TERMINAL_API_MAP.get(terminal_key, TERMINAL_API_MAP['5']) # Default to T5
-    
-    building_id = mapping['building_id']
-    floor_id = mapping['default_floor_id']
+    terminal_key, building_id, floor_id = map_floor_for_terminal(terminal_code)
     
     # Start URL for correct floor
     # We will pass the IDs to the frontend so it can construct the Proxy URL
     
-    return render(request, "passengers/tracker.html", {
+    formatted_open = format_time(total_seconds_open)
+    formatted_close = format_time(total_seconds_close)
+
+    # The countdown is rendered server-side, so it is part of the validator
+    etag = hashlib.sha1(
+        f"{snapshot['etag']}:{passenger.preferredLanguage}:{phase}:{formatted_open}:{formatted_close}".encode()
+    ).hexdigest()
+    last_modified = int(snapshot['builtAt'].timestamp())
+    not_modified = get_conditional_response(request, etag=quote_etag(etag), last_modified=last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    response = render(request, "passengers/tracker.html", {
+        "booking_token": booking_token,
         "passenger": passenger,
         "flight": flight,
         "timeline": timeline,
@@ -132,31 +140,91 @@ def flight_tracker(request, booking_token):
         "phase": phase,
         "seconds_to_open": total_seconds_open,
         "seconds_to_close": total_seconds_close,
-        "formatted_open": format_time(total_seconds_open),
-        "formatted_close": format_time(total_seconds_close),
+        "formatted_open": formatted_open,
+        "formatted_close": formatted_close,
         "mapbox_access_token": mapbox_token,
         "map_building_id": building_id,
         "map_floor_id": floor_id,
         "map_terminal_key": terminal_key,
     })
+    response['ETag'] = quote_etag(etag)
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+@require_GET
+def flight_updates_stream(request, booking_token):
+    """
+    Server-Sent Events stream of status and gate changes for a booking's flight.
+    Under ASGI idle clients cost no thread; under WSGI each holds one until
+    LIVE_UPDATES_MAX_SECONDS, after which the browser reconnects, so
+    production should route this view through the ASGI app.
+    """
+    from django.core.handlers.asgi import ASGIRequest
+    from .services.live_updates import async_event_stream, event_stream
+
+    flight_id = PassengerFlight.objects.filter(access_token=booking_token).values_list('flight_id', flat=True).first()
+    if flight_id is None:
+        raise Http404("Booking not found")
+
+    if isinstance(request, ASGIRequest):
+        stream = async_event_stream(flight_id)
+    else:
+        stream = event_stream(flight_id)
+
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 @require_GET
 def map_proxy(request):
     """
     Proxy request to KKIA Maps API to avoid CORS.
     Expects 'building_id' and 'floor_id' query params.
+    Served from the POI cache; see passengers.services.map_cache.
     """
+    from .services.map_cache import MapUpstreamError, get_pois
+
     building_id = request.GET.get('building_id')
     floor_id = request.GET.get('floor_id')
     
     if not building_id or not floor_id:
         return JsonResponse({'error': 'Missing parameters'}, status=400)
-        
-    url = f"{BASE_MAP_API_URL}/{building_id}/floors/{floor_id}/pois"
-    
+    # Only the terminals' buildings, so ids never reach the cache keys, disk
+    # paths or upstream URLs unchecked
+    if building_id not in MAP_BUILDING_IDS or not floor_id.isdigit() or not floor_id.isascii():
+        return JsonResponse({'error': 'Unknown building or floor'}, status=400)
+
+    try:
+        return JsonResponse(get_pois(building_id, floor_id), safe=False)
+    except MapUpstreamError as e:
+        return JsonResponse({'error': str(e)}, status=502)
+
+@require_GET
+def gate_wayfinding(request, booking_token):
+    """
+    The passenger's gate and the precomputed walk to it from security, instead
+    of the whole floor POI list. See passengers.services.wayfinding.
+    """
+    from .services.map_cache import MapUpstreamError
+    from .services.wayfinding import gate_route
+
+    flight_id = PassengerFlight.objects.filter(access_token=booking_token).values_list('flight_id', flat=True).first()
+    if flight_id is None:
+        raise Http404("Booking not found")
+
+    gate = get_snapshot(flight_id)['gate']
+    if not gate:
+        return JsonResponse({'error': 'No gate assigned yet'}, status=404)
+
+    terminal_key, building_id, floor_id = map_floor_for_terminal(gate['terminal'])
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        return JsonResponse(response.json(), safe=False)
-    except requests.RequestException as e:
+        payload = gate_route(building_id, floor_id, gate['gateCode'])
+    except MapUpstreamError as e:
         return JsonResponse({'error': str(e)}, status=502)
+    if payload is None:
+        return JsonResponse({'error': f"Gate {gate['gateCode']} is not on the terminal map"}, status=404)
+
+    payload.update(terminal=terminal_key, building_id=building_id, floor_id=floor_id)
+    return JsonResponse(payload)
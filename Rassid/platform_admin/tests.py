@@ -1,3 +1,79 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from airports.models import Airport, AirportSubscription, SubscriptionRequest
+
+User = get_user_model()
+
+
+class AdminDashboardQueryCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.superuser = User.objects.create_superuser(email='root@rassid.test')
+        self.client.force_login(self.superuser)
+        self.url = reverse('platform_dashboard')
+
+    def add_airports(self, count, offset=0):
+        now = timezone.now()
+        for i in range(offset, offset + count):
+            airport = Airport.objects.create(name=f"Airport {i}", code=f"T{i:02d}", city="City")
+            AirportSubscription.objects.create(
+                airport=airport, plan_type='1 Year License',
+                start_at=now, expire_at=now + timedelta(days=400), status='active'
+            )
+            for j in range(2):
+                User.objects.create_user(
+                    email=f"admin{j}@t{i}.test",
+                    role='airport_admin', airport_id=airport.id
+                )
+
+    def count_queries(self):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_tenants(self):
+        self.add_airports(1)
+        few = self.count_queries()
+
+        self.add_airports(6, offset=1)
+        many = self.count_queries()
+
+        self.assertEqual(few, many)
+
+    def test_latest_airports_are_annotated(self):
+        self.add_airports(2)
+        response = self.client.get(self.url)
+
+        airports = response.context['latest_airports']
+        self.assertEqual(len(airports), 2)
+        for airport in airports:
+            self.assertEqual(airport.admins_count, 2)
+            self.assertEqual(airport.status, 'active')
+
+    def test_payload_is_cached_between_requests(self):
+        self.add_airports(2)
+        cold = self.count_queries()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url)
+
+        self.assertLess(len(queries), cold)
+
+    def test_pending_requests_count_is_not_frozen_in_the_cache(self):
+        self.assertEqual(self.client.get(self.url).context['pending_requests_count'], 0)
 
-# Create your tests here.
+        SubscriptionRequest.objects.create(
+            airport_name="New", airport_code='NW1', country="SA", city="City",
+            admin_email='admin@nw1.test', admin_phone='1', official_license='docs/license.pdf',
+        )
+        self.assertEqual(self.client.get(self.url).context['pending_requests_count'], 1)
@@ -33,12 +33,15 @@ from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 from django.urls import reverse
 
-from django.db.models import Count, Q
+from django.core.cache import cache
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from airports.models import Airport, AirportSubscription, SubscriptionRequest
 from flights.models import Flight
 from tickets.models import Ticket
 from passengers.models import PassengerFlight
 from notifications.models import EmailLog
+from common.services import counters
 
 User = get_user_model()
 
@@ -53,18 +56,49 @@ def redirect_back(request, fallback='platform_dashboard', anchor=''):
         return redirect(f"{referer}#{anchor}")
     return redirect(referer)
 
-@login_required
-def admin_dashboard(request):
-    if not is_super_admin(request.user):
-        return redirect('public_home')
+DASHBOARD_CACHE_KEY = 'platform_admin_dashboard'
+DASHBOARD_CACHE_TTL = 60
 
-    last_24h = timezone.now() - timedelta(hours=24)
-    emails_sent_count = EmailLog.objects.filter(status='Sent', sent_at__gte=last_24h).count()
-    emails_failed_count = EmailLog.objects.filter(status='Failed', sent_at__gte=last_24h).count()
+def remaining_time_str(expire_at):
+    if not expire_at:
+        return "-"
+    if timezone.is_aware(expire_at):
+        now = timezone.now()
+    else:
+        now = datetime.now()
+
+    total_days = (expire_at - now).days
+    if total_days <= 0:
+        return "Expired"
+
+    years = total_days // 365
+    days = total_days % 365
+
+    parts = []
+    if years > 0:
+        parts.append(f"{years} {'Year' if years == 1 else 'Years'}")
+    if days > 0:
+        parts.append(f"{days} {'Day' if days == 1 else 'Days'}")
+    return ", ".join(parts) if parts else "Expires Today"
+
+def build_dashboard_payload():
+    now = timezone.now()
+    last_24h = now - timedelta(hours=24)
+
+    email_stats = EmailLog.objects.filter(sent_at__gte=last_24h).aggregate(
+        sent=Count('id', filter=Q(status='Sent')),
+        failed=Count('id', filter=Q(status='Failed')),
+    )
+    emails_sent_count = email_stats['sent']
+    emails_failed_count = email_stats['failed']
+
+    subscription_stats = AirportSubscription.objects.aggregate(
+        total=Count('id'),
+        active_airports=Count('airport', filter=Q(status='active', expire_at__gt=now), distinct=True),
+    )
 
-    today = timezone.now().date()
     passengers_today = PassengerFlight.objects.filter(
-        flight__scheduledDeparture__date=today
+        flight__scheduledDeparture__date=timezone.localdate()
     ).count()
 
     total_ops = emails_sent_count + emails_failed_count
@@ -75,8 +109,8 @@ def admin_dashboard(request):
         system_uptime = "100%"
 
     stats = {
-        "airports_count": AirportSubscription.objects.count(),
-        "active_subscriptions": AirportSubscription.objects.filter(status='active', expire_at__gt=timezone.now()).values('airport').distinct().count(),
+        "airports_count": subscription_stats['total'],
+        "active_subscriptions": subscription_stats['active_airports'],
         "employees_count": User.objects.filter(role__in=['airport_admin', 'airport_staff']).count(),
         "passengers_today": passengers_today,
         "emails_delivered": emails_sent_count,
@@ -84,48 +118,47 @@ def admin_dashboard(request):
         "system_uptime": system_uptime,
     }
 
-    latest_airports_qs = Airport.objects.filter(airportsubscription__status='active').order_by('-created_at')[:5]
-    latest_airports = list(latest_airports_qs)
+    admins_count = User.objects.filter(
+        airport_id=OuterRef('pk'), role='airport_admin'
+    ).order_by().values('airport_id').annotate(n=Count('id')).values('n')
+    latest_sub = AirportSubscription.objects.filter(airport_id=OuterRef('pk')).order_by('-expire_at')
 
-    for airport in latest_airports:
-        airport.admins_count = User.objects.filter(airport_id=airport.id, role='airport_admin').count()
-        sub = AirportSubscription.objects.filter(airport_id=airport.id).order_by('-expire_at').first()
-        airport.status = sub.status if sub else 'inactive'
-        
-        airport.remaining_time_str = "-"
-        if sub and sub.expire_at:
-            if timezone.is_aware(sub.expire_at):
-                now = timezone.now()
-            else:
-                now = datetime.now()
-            
-            delta = sub.expire_at - now
-            total_days = delta.days
+    latest_airports = list(
+        Airport.objects.filter(airportsubscription__status='active').annotate(
+            admins_count=Coalesce(Subquery(admins_count), 0),
+            sub_status=Subquery(latest_sub.values('status')[:1]),
+            sub_expire_at=Subquery(latest_sub.values('expire_at')[:1]),
+        ).order_by('-created_at')[:5]
+    )
 
-            if total_days > 0:
-                years = total_days // 365
-                days = total_days % 365
-                
-                parts = []
-                if years > 0:
-                    parts.append(f"{years} {'Year' if years == 1 else 'Years'}")
-                if days > 0:
-                    parts.append(f"{days} {'Day' if days == 1 else 'Days'}")
-                
-                airport.remaining_time_str = ", ".join(parts) if parts else "Expires Today"
-            else:
-                airport.remaining_time_str = "Expired"
+    for airport in latest_airports:
+        airport.status = airport.sub_status or 'inactive'
+        airport.remaining_time_str = remaining_time_str(airport.sub_expire_at)
 
-    tickets = Ticket.objects.filter(status__in=['Open', 'Escalated', 'In Progress']).order_by('-createdAt')[:5]
+    tickets = list(
+        Ticket.objects.filter(status__in=['Open', 'Escalated', 'In Progress'])
+        .select_related('airport', 'assignedTo')
+        .order_by('-createdAt')[:5]
+    )
 
-    from airports.models import SubscriptionRequest
-    pending_requests_count = SubscriptionRequest.objects.filter(status='pending').count()
-    context = {
+    return {
         "stats": stats,
         "latest_airports": latest_airports,
         "tickets": tickets,
-        "pending_requests_count": pending_requests_count
     }
+
+@login_required
+def admin_dashboard(request):
+    if not is_super_admin(request.user):
+        return redirect('public_home')
+
+    context = cache.get(DASHBOARD_CACHE_KEY)
+    if context is None:
+        context = build_dashboard_payload()
+        cache.set(DASHBOARD_CACHE_KEY, context, DASHBOARD_CACHE_TTL)
+    # Kept out of the cached payload: the counter is invalidated by signals
+    # and should not wait for DASHBOARD_CACHE_TTL
+    context = dict(context, pending_requests_count=counters.get('pending_requests'))
     return render(request, "platform_admin/dashboard.html", context)
 
 @login_required
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class PublicConfig(AppConfig):
     name = 'public'
+
+    def ready(self):
+        import public.signals
@@ -0,0 +1,176 @@
+import base64
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import F, Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from flights.models import Flight
+from flights.services.search import search_flights
+
+PAGE_SIZE = 50
+BOARD_CACHE_TTL = 60
+MANAGED_AIRPORTS_KEY = 'public:managed_airport_ids'
+BOARD_FIRST_PAGE_KEY = 'public:departures_board:first_page'
+NEXT_DEPARTURES_KEY = 'public:next_departures'
+NEXT_DEPARTURES_LIMIT = 6
+# Outlives the one-minute ingestion cadence, so with a shared cache (CACHE_URL)
+# the worker's refresh normally replaces the fragment before it expires
+NEXT_DEPARTURES_TTL = 120
+
+
+def managed_airport_ids():
+    """Airports with at least one airport admin. Cached until an admin user changes."""
+    ids = cache.get(MANAGED_AIRPORTS_KEY)
+    if ids is None:
+        User = get_user_model()
+        ids = set(
+            User.objects.filter(role='airport_admin', airport_id__isnull=False)
+            .values_list('airport_id', flat=True)
+        )
+        cache.set(MANAGED_AIRPORTS_KEY, ids, None)
+    return ids
+
+
+def invalidate_managed_airports():
+    cache.delete_many([MANAGED_AIRPORTS_KEY, BOARD_FIRST_PAGE_KEY, NEXT_DEPARTURES_KEY])
+
+
+def encode_cursor(flight):
+    return encode_position(flight.scheduledDeparture, flight.pk)
+
+
+def encode_position(departure, pk):
+    raw = f"{departure.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Return (scheduledDeparture, id) or None when the cursor is missing or malformed."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        departure, pk = raw.rsplit('|', 1)
+        return datetime.fromisoformat(departure), int(pk)
+    except (ValueError, UnicodeError):
+        return None
+
+
+def board_queryset(search=None):
+    cutoff_time = timezone.now() - timedelta(hours=1)
+
+    flights = Flight.objects.filter(
+        origin_id__in=managed_airport_ids()
+    ).filter(
+        Q(status__iexact='active') |
+        (
+            Q(scheduledDeparture__gte=cutoff_time) &
+            ~Q(status__iexact='landed') &
+            ~Q(status__iexact='cancelled')
+        )
+    ).select_related('origin', 'destination').annotate(
+        gate_code=F('currentGate__gateCode'),
+        gate_terminal=F('currentGate__terminal'),
+    ).order_by('scheduledDeparture', 'id')
+
+    if search:
+        flights = search_flights(flights, search)
+    return flights
+
+
+def after_cursor(flights, cursor):
+    position = decode_cursor(cursor)
+    if position:
+        departure, pk = position
+        flights = flights.filter(
+            Q(scheduledDeparture__gt=departure) |
+            Q(scheduledDeparture=departure, id__gt=pk)
+        )
+    return flights
+
+
+def departures_page(search=None, cursor=None, limit=PAGE_SIZE):
+    """
+    One page of the departures board, keyset-paginated on (scheduledDeparture, id).
+    Returns (flights, next_cursor); next_cursor is None on the last page.
+    """
+    flights = after_cursor(board_queryset(search), cursor)
+    rows = list(flights[:limit + 1])
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def departures_rows(search=None, cursor=None, limit=PAGE_SIZE):
+    """
+    The same page in compact form for boards and displays that render
+    client-side: {'columns': [...], 'rows': [[...], ...], 'next_cursor': ...}.
+    """
+    from flights.services.compact import BOARD_COLUMNS, column_names, compact_values, to_rows
+
+    values = list(compact_values(after_cursor(board_queryset(search), cursor), BOARD_COLUMNS)[:limit + 1])
+    next_cursor = None
+    if len(values) > limit:
+        last = values[limit - 1]
+        next_cursor = encode_position(last['scheduledDeparture'], last['id'])
+    return {
+        'columns': column_names(BOARD_COLUMNS),
+        'rows': to_rows(values[:limit], BOARD_COLUMNS),
+        'next_cursor': next_cursor,
+    }
+
+
+def render_departures(search=None, cursor=None):
+    """Return (rows_html, next_cursor) for one page of the board."""
+    flights, next_cursor = departures_page(search, cursor)
+    rows_html = render_to_string('public/partials/departures_rows.html', {'flights': flights})
+    return rows_html, next_cursor
+
+
+def refresh_departures_board():
+    """Re-render the unfiltered first page and store it for every visitor."""
+    page = render_departures()
+    cache.set(BOARD_FIRST_PAGE_KEY, page, BOARD_CACHE_TTL)
+    return page
+
+
+def get_departures_board(search=None, cursor=None):
+    if search or cursor:
+        return render_departures(search, cursor)
+    page = cache.get(BOARD_FIRST_PAGE_KEY)
+    if page is None:
+        page = refresh_departures_board()
+    return page
+
+
+def next_departures(limit=NEXT_DEPARTURES_LIMIT):
+    """The next flights to leave managed airports, served by the keyset index."""
+    return list(
+        Flight.objects.filter(
+            origin_id__in=managed_airport_ids(),
+            scheduledDeparture__gte=timezone.now(),
+        ).exclude(
+            Q(status__iexact='landed') | Q(status__iexact='cancelled') | Q(status__iexact='departed')
+        ).select_related('origin', 'destination').order_by('scheduledDeparture', 'id')[:limit]
+    )
+
+
+def refresh_next_departures():
+    html = render_to_string('public/partials/next_departures.html', {'flights': next_departures()})
+    cache.set(NEXT_DEPARTURES_KEY, html, NEXT_DEPARTURES_TTL)
+    return html
+
+
+def get_next_departures():
+    html = cache.get(NEXT_DEPARTURES_KEY)
+    if html is None:
+        html = refresh_next_departures()
+    return html
+
+
+def refresh_public_departures():
+    """Rebuild every cached public departures fragment after an ingestion run."""
+    refresh_departures_board()
+    refresh_next_departures()
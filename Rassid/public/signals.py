@@ -0,0 +1,14 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from public.services.departures import invalidate_managed_airports
+
+User = get_user_model()
+
+@receiver([post_save, post_delete], sender=User)
+def airport_admin_changed(sender, instance, **kwargs):
+    # Logins only touch last_login and cannot change which airports are managed
+    update_fields = kwargs.get('update_fields')
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    invalidate_managed_airports()
@@ -6,6 +6,7 @@ urlpatterns = [
     path("about/", views.about, name="public_about"),
     path("airports/", views.airports_list, name="public_airports_list"),
     path("flights/", views.flights_list, name="public_flights_list"),
+    path("flights/rows/", views.departures_rows, name="public_departures_rows"),
     path('pricing/', views.pricing_view, name='pricing'),
     path("contact/", views.contact, name="public_contact"),
 ]
\ No newline at end of file
@@ -3,8 +3,11 @@ from airports.models import Airport
 from flights.models import Flight, GateAssignment
 
 def home(request):
+    from django.utils.safestring import mark_safe
+    from public.services.departures import get_next_departures
+
     return render(request, "public/home.html", {
-        "flights": Flight.objects.all()[:20]
+        "next_departures_html": mark_safe(get_next_departures())
     })
 
 def about(request):
@@ -18,46 +21,29 @@ def airports_list(request):
     return render(request, "public/airports_list.html", {"airports": airports})
 
 def flights_list(request):
-    from users.models import User
-    from django.db.models import Q
-    from flights.models import GateAssignment
-
-    managed_airport_ids = User.objects.filter(role='airport_admin').values_list('airport_id', flat=True).distinct()
-    
-    from django.utils import timezone
-    from django.db.models import Q
-    
-    cutoff_time = timezone.now() - timezone.timedelta(hours=1)
-    
-    
-    from django.db.models import Prefetch, Q
-    
-    flights = Flight.objects.filter(
-        origin_id__in=managed_airport_ids
-    ).filter(
-        Q(status__iexact='active') |
-        (
-            Q(scheduledDeparture__gte=cutoff_time) & 
-            ~Q(status__iexact='landed') & 
-            ~Q(status__iexact='cancelled')
-        )
-    ).select_related('origin', 'destination').prefetch_related(
-        Prefetch('gateassignment_set', queryset=GateAssignment.objects.order_by('-assignedAt'), to_attr='latest_gates')
-    ).order_by("scheduledDeparture")
+    from django.utils.safestring import mark_safe
+    from public.services.departures import get_departures_board
 
     search_query = request.GET.get('search')
-    if search_query:
-        flights = flights.filter(
-            Q(flightNumber__icontains=search_query) |
-            Q(destination__city__icontains=search_query) |
-            Q(destination__code__icontains=search_query)
-        )
+    cursor = request.GET.get('cursor')
+    rows_html, next_cursor = get_departures_board(search_query, cursor)
 
     return render(request, "public/flights_list.html", {
-        "flights": flights,
+        "rows_html": mark_safe(rows_html),
+        "next_cursor": next_cursor,
+        "cursor": cursor,
         "search_query": search_query
     })
 
+def departures_rows(request):
+    """JSON rows of the departures board, same search and cursor as flights_list."""
+    from django.http import HttpResponse
+    from common.renderers import dumps
+    from public.services.departures import departures_rows as board_rows
+
+    page = board_rows(request.GET.get('search'), request.GET.get('cursor'))
+    return HttpResponse(dumps(page), content_type='application/json')
+
 def pricing_view(request):
     return render(request, 'public/pricing.html')
 